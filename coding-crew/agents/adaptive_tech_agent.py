@@ -1,18 +1,191 @@
 """Adaptive agent system for handling new technologies."""
 
 from crewai import Agent, Task, Crew
-from langchain_community.llms import Ollama
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
+import asyncio
 import json
-import requests
+from collections import Counter
 from pathlib import Path
 import logging
+import os
+import re
+import threading
+import time
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Discovered profiles are reused for a day before the LLM is consulted again
+DISCOVERY_CACHE_TTL = 24 * 60 * 60
+
+# Common spellings that refer to the same technology
+TECH_ALIASES = {
+    "node": "nodejs",
+    "js": "javascript",
+    "ts": "typescript",
+    "golang": "go",
+    "py": "python",
+    "python3": "python",
+    "reactjs": "react",
+    "vuejs": "vue",
+    "postgres": "postgresql",
+    "k8s": "kubernetes",
+}
+
+
+def normalize_tech_name(tech_name: str) -> str:
+    """Normalize a technology name so spelling variants share one cache key."""
+    key = re.sub(r'[^a-z0-9+#]', '', tech_name.lower().strip())
+    return TECH_ALIASES.get(key, key)
+
+
+def _is_fresh(profile: Dict) -> bool:
+    """Check a discovered profile is within DISCOVERY_CACHE_TTL; curated ones carry no timestamp."""
+    discovered_at = profile.get("discovered_at")
+    return discovered_at is None or time.time() - discovered_at < DISCOVERY_CACHE_TTL
+
+
+def _fallback_profile(tech_name: str) -> Dict:
+    """Empty profile used when discovery yields no usable JSON."""
+    return {
+        "name": tech_name,
+        "category": "unknown",
+        "patterns": [],
+        "structure": {},
+        "dependencies": {"core": [], "dev": []},
+        "commands": {},
+        "file_extensions": [],
+        "best_practices": [],
+        "security": [],
+        "performance": []
+    }
+
+
+def _extract_first_json_object(text: str, start: int = 0) -> Optional[str]:
+    """Return the first balanced {...} block at or after start, if any.
+    
+    Scans once, tracking brace depth and skipping braces inside quoted
+    strings, so long research text cannot trigger regex backtracking.
+    """
+    begin = text.find('{', start)
+    if begin == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(begin, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[begin:index + 1]
+    return None
+
+
+def _load_json_object(text: str) -> Optional[Dict]:
+    """Extract the JSON object embedded in LLM output, if any."""
+    start = text.find('{')
+    while start != -1:
+        candidate = _extract_first_json_object(text, start)
+        if candidate is not None:
+            try:
+                return json.loads(candidate)
+            except ValueError:
+                pass
+        start = text.find('{', start + 1)
+    return None
+
+
+def _read_json(path: Path) -> Dict:
+    """Read a JSON file, using orjson when it is installed."""
+    data = path.read_bytes()
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+def _write_json(path: Path, data: Dict):
+    """Write a JSON file atomically with two-space indentation.
+    
+    The payload goes to a sibling temp file first and is moved into place
+    with os.replace, so a crash mid-write never leaves a truncated store.
+    """
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=2).encode()
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, path)
+
+
+# JSON store path -> (mtime_ns, data), shared by every agent in the process
+_json_cache: Dict[Path, tuple] = {}
+
+# Knowledge base path -> tech names it holds, so unknown techs skip the file check.
+# Rebuilt whenever the store is re-read or saved, so it always matches the cached
+# data; techs added by other processes show up once the file is next loaded.
+_known_techs: Dict[Path, Set[str]] = {}
+
+
+def _load_cached_json(path: Path) -> Dict:
+    """Load a JSON store, re-reading the file only when it changed."""
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return {}
+    
+    cached = _json_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    try:
+        data = _read_json(path)
+    except Exception:
+        data = {}
+    _json_cache[path] = (mtime, data)
+    _known_techs[path] = set(data)
+    return data
+
+
+def _save_cached_json(path: Path, data: Dict):
+    """Write a JSON store and refresh the in-memory copy."""
+    _write_json(path, data)
+    _json_cache[path] = (path.stat().st_mtime_ns, data)
+    _known_techs[path] = set(data)
+
+
+def _is_known_tech(path: Path, tech_key: str) -> bool:
+    """Check whether the knowledge base holds a tech without touching the file."""
+    if path not in _known_techs:
+        _load_cached_json(path)
+    return tech_key in _known_techs.get(path, ())
+
+
 class TechnologyDiscoveryAgent:
     """Agent that discovers and learns new technologies."""
     
+    # Normalized tech name -> (discovered_at, profile), shared by all instances
+    _discovery_cache: Dict[str, tuple] = {}
+    _save_lock = threading.Lock()
+    
     def __init__(self):
         from core.llm_config import get_analysis_llm
         self.llm = get_analysis_llm()
@@ -21,6 +194,15 @@ class TechnologyDiscoveryAgent:
     def discover_technology(self, tech_name: str) -> Dict:
         """Discover and learn about a new technology."""
         
+        cache_key = normalize_tech_name(tech_name)
+        cached = self._discovery_cache.get(cache_key)
+        if cached and time.time() - cached[0] < DISCOVERY_CACHE_TTL:
+            logger.info(f"Using cached technology profile for {tech_name}")
+            return cached[1]
+        
+        # CrewAI's step-by-step console output is only worth its cost when debugging
+        verbose = logger.isEnabledFor(logging.DEBUG)
+        
         # Create discovery agent
         discovery_agent = Agent(
             role="Technology Research Specialist",
@@ -29,13 +211,13 @@ class TechnologyDiscoveryAgent:
             programming languages, frameworks, and tools. Your task is to understand 
             {tech_name} and extract key information for code generation.""",
             llm=self.llm,
-            verbose=True
+            verbose=verbose
         )
         
         # Research task
         research_task = Task(
             description=f"""
-            Research {tech_name} technology and provide comprehensive information:
+            Research {tech_name} technology and cover:
             
             1. TECHNOLOGY OVERVIEW:
                - What is {tech_name}?
@@ -70,48 +252,7 @@ class TechnologyDiscoveryAgent:
                - Optimization techniques
                - Monitoring approaches
                
-            Format as structured information that can be used for code generation.
-            """,
-            agent=discovery_agent,
-            expected_output="Comprehensive technology profile with actionable development guidance"
-        )
-        
-        # Execute research
-        crew = Crew(
-            agents=[discovery_agent],
-            tasks=[research_task],
-            verbose=True
-        )
-        
-        result = crew.kickoff()
-        
-        # Parse and structure the result
-        tech_profile = self._parse_research_result(str(result), tech_name)
-        
-        # Save to knowledge base
-        self._save_tech_profile(tech_name, tech_profile)
-        
-        return tech_profile
-    
-    def _parse_research_result(self, research_result: str, tech_name: str) -> Dict:
-        """Parse research result into structured format."""
-        
-        # Create parsing agent
-        parsing_agent = Agent(
-            role="Information Structuring Specialist",
-            goal="Convert research text into structured JSON format",
-            backstory="You excel at extracting and organizing information into structured formats.",
-            llm=self.llm,
-            verbose=True
-        )
-        
-        parsing_task = Task(
-            description=f"""
-            Convert this research about {tech_name} into structured JSON format:
-            
-            {research_result}
-            
-            Required JSON structure:
+            Respond with ONLY a JSON object in this structure, no prose:
             {{
               "name": "{tech_name}",
               "category": "language|framework|library|tool",
@@ -136,68 +277,73 @@ class TechnologyDiscoveryAgent:
               "performance": ["perf-tip1", "perf-tip2"]
             }}
             
-            Extract only factual information from the research.
+            Include only factual information.
             """,
-            agent=parsing_agent,
-            expected_output="Valid JSON structure with technology information"
+            agent=discovery_agent,
+            expected_output="Valid JSON technology profile with actionable development guidance"
         )
         
+        # Execute research
         crew = Crew(
-            agents=[parsing_agent],
-            tasks=[parsing_task],
-            verbose=True
+            agents=[discovery_agent],
+            tasks=[research_task],
+            verbose=verbose
         )
         
         result = crew.kickoff()
         
-        try:
-            # Extract JSON from result
-            import re
-            json_match = re.search(r'\{.*\}', str(result), re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-        except Exception as e:
-            logger.warning(f"Failed to parse JSON result: {e}")
+        # Validate the structured result; a failed parse is not cached or saved so the
+        # next request retries discovery instead of serving an empty profile for a day
+        tech_profile = self._parse_research_result(str(result), tech_name)
+        if tech_profile is None:
+            return _fallback_profile(tech_name)
+        tech_profile["discovered_at"] = time.time()
+        self._discovery_cache[cache_key] = (tech_profile["discovered_at"], tech_profile)
         
-        # Fallback structure
-        return {
-            "name": tech_name,
-            "category": "unknown",
-            "patterns": [],
-            "structure": {},
-            "dependencies": {"core": [], "dev": []},
-            "commands": {},
-            "file_extensions": [],
-            "best_practices": [],
-            "security": [],
-            "performance": []
-        }
+        # Save to knowledge base
+        self._save_tech_profile(tech_name, tech_profile)
+        
+        return tech_profile
+    
+    async def discover_technology_async(self, tech_name: str) -> Dict:
+        """Discover a technology without blocking the event loop.
+        
+        The crew runs in a worker thread so several discoveries can be in
+        flight at once; set OLLAMA_NUM_PARALLEL on the Ollama server to let
+        it serve them concurrently instead of queueing.
+        """
+        return await asyncio.to_thread(self.discover_technology, tech_name)
+    
+    def _parse_research_result(self, research_result: str, tech_name: str) -> Optional[Dict]:
+        """Validate the JSON profile returned by the research task, or None if there is none."""
+        
+        profile = _load_json_object(research_result)
+        if profile is None:
+            logger.warning(f"Failed to parse JSON result for {tech_name}")
+        return profile
     
     def _save_tech_profile(self, tech_name: str, profile: Dict):
         """Save technology profile to knowledge base."""
         
-        # Load existing knowledge
-        knowledge = {}
-        if self.knowledge_base.exists():
-            try:
-                with open(self.knowledge_base, 'r') as f:
-                    knowledge = json.load(f)
-            except Exception:
-                pass
+        tech_key = normalize_tech_name(tech_name)
         
-        # Add new technology
-        knowledge[tech_name.lower()] = profile
-        
-        # Save updated knowledge
-        self.knowledge_base.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.knowledge_base, 'w') as f:
-            json.dump(knowledge, f, indent=2)
+        # Concurrent discoveries must not interleave the read-modify-write below
+        with self._save_lock:
+            knowledge = _load_cached_json(self.knowledge_base)
+            if knowledge.get(tech_key) == profile:
+                logger.debug(f"Technology profile for {tech_name} unchanged, skipping write")
+                return
+            knowledge = {**knowledge, tech_key: profile}
+            _save_cached_json(self.knowledge_base, knowledge)
         
         logger.info(f"Saved technology profile for {tech_name}")
 
 class AdaptiveTechAgentFactory:
     """Factory that creates agents for any technology, including new ones."""
     
+    # Normalized tech name -> (profile, rendered backstory), shared by all factories
+    _backstory_cache: Dict[str, tuple] = {}
+    
     def __init__(self):
         from core.llm_config import get_coding_llm
         self.llm = get_coding_llm()
@@ -217,31 +363,60 @@ class AdaptiveTechAgentFactory:
         # Create specialized agent based on profile
         return self._create_specialized_agent(tech_profile)
     
-    def _get_tech_profile(self, tech_name: str) -> Optional[Dict]:
-        """Get existing technology profile."""
-        if not self.knowledge_base.exists():
-            return None
+    async def create_agents_for_techs(self, tech_names: List[str]) -> Dict[str, Agent]:
+        """Create agents for several technologies, discovering unknown ones concurrently."""
         
-        try:
-            with open(self.knowledge_base, 'r') as f:
-                knowledge = json.load(f)
-            return knowledge.get(tech_name.lower())
-        except Exception:
+        profiles = {tech_name: self._get_tech_profile(tech_name) for tech_name in tech_names}
+        unknown = [tech_name for tech_name, profile in profiles.items() if not profile]
+        
+        if unknown:
+            logger.info(f"Unknown technologies {unknown}, initiating concurrent discovery...")
+            discovered = await asyncio.gather(
+                *(self.discovery_agent.discover_technology_async(tech_name) for tech_name in unknown)
+            )
+            profiles.update(zip(unknown, discovered))
+        
+        return {
+            tech_name: self._create_specialized_agent(profile)
+            for tech_name, profile in profiles.items()
+        }
+    
+    def _get_tech_profile(self, tech_name: str) -> Optional[Dict]:
+        """Get existing technology profile, treating expired discoveries as unknown."""
+        tech_key = normalize_tech_name(tech_name)
+        if not _is_known_tech(self.knowledge_base, tech_key):
             return None
+        profile = _load_cached_json(self.knowledge_base).get(tech_key)
+        return profile if profile and _is_fresh(profile) else None
     
     def _create_specialized_agent(self, tech_profile: Dict) -> Agent:
         """Create agent specialized for the technology."""
         
         tech_name = tech_profile.get("name", "Unknown")
+        
+        return Agent(
+            role=f"{tech_name} Specialist Developer",
+            goal=f"Generate high-quality {tech_name} code following established patterns",
+            backstory=self._render_backstory(tech_profile),
+            llm=self.llm,
+            verbose=True
+        )
+    
+    def _render_backstory(self, tech_profile: Dict) -> str:
+        """Render the specialist backstory, reusing it while the profile is unchanged."""
+        
+        tech_name = tech_profile.get("name", "Unknown")
+        tech_key = normalize_tech_name(tech_name)
+        cached = self._backstory_cache.get(tech_key)
+        if cached and cached[0] is tech_profile:
+            return cached[1]
+        
         patterns = tech_profile.get("patterns", [])
         best_practices = tech_profile.get("best_practices", [])
         structure = tech_profile.get("structure", {})
         commands = tech_profile.get("commands", {})
         
-        return Agent(
-            role=f"{tech_name} Specialist Developer",
-            goal=f"Generate high-quality {tech_name} code following established patterns",
-            backstory=f"""You are a {tech_name} expert with deep knowledge of:
+        backstory = f"""You are a {tech_name} expert with deep knowledge of:
             
             CODING PATTERNS:
             {chr(10).join(f"- {pattern}" for pattern in patterns)}
@@ -256,10 +431,11 @@ class AdaptiveTechAgentFactory:
             {chr(10).join(f"- {key}: {value}" for key, value in commands.items())}
             
             Always follow these established patterns and generate production-ready code.
-            """,
-            llm=self.llm,
-            verbose=True
-        )
+            """
+        
+        # Profiles come from the shared knowledge cache, so identity means unchanged
+        self._backstory_cache[tech_key] = (tech_profile, backstory)
+        return backstory
 
 class BestPracticesEvolution:
     """System that evolves best practices based on successful projects."""
@@ -272,61 +448,56 @@ class BestPracticesEvolution:
                              success_metrics: Dict):
         """Record successful project patterns for learning."""
         
+        if not tech_stack:
+            return
+        
         # Load existing metrics
         metrics = self._load_success_metrics()
+        pattern_counts = Counter(patterns_used)
         
         for tech in tech_stack:
-            tech_key = tech.lower()
-            
-            if tech_key not in metrics:
-                metrics[tech_key] = {"successful_patterns": {}, "total_projects": 0}
-            
-            metrics[tech_key]["total_projects"] += 1
+            tech_metrics = metrics.setdefault(
+                tech.lower(), {"successful_patterns": {}, "total_projects": 0}
+            )
+            tech_metrics["total_projects"] += 1
             
             # Track pattern success
-            for pattern in patterns_used:
-                if pattern not in metrics[tech_key]["successful_patterns"]:
-                    metrics[tech_key]["successful_patterns"][pattern] = 0
-                metrics[tech_key]["successful_patterns"][pattern] += 1
+            successful_patterns = Counter(tech_metrics["successful_patterns"])
+            successful_patterns.update(pattern_counts)
+            tech_metrics["successful_patterns"] = successful_patterns
         
         # Save updated metrics
         self._save_success_metrics(metrics)
         
-        # Update best practices based on success rates
-        self._update_best_practices(metrics)
+        # Update best practices for the technologies this project touched
+        self._update_best_practices(metrics, {tech.lower() for tech in tech_stack})
     
     def _load_success_metrics(self) -> Dict:
         """Load success metrics."""
         if self.success_metrics_file.exists():
             try:
-                with open(self.success_metrics_file, 'r') as f:
-                    return json.load(f)
+                return _read_json(self.success_metrics_file)
             except Exception:
                 pass
         return {}
     
     def _save_success_metrics(self, metrics: Dict):
         """Save success metrics."""
-        self.success_metrics_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.success_metrics_file, 'w') as f:
-            json.dump(metrics, f, indent=2)
+        _write_json(self.success_metrics_file, metrics)
     
-    def _update_best_practices(self, metrics: Dict):
-        """Update best practices based on success patterns."""
+    def _update_best_practices(self, metrics: Dict, changed_techs: Set[str]):
+        """Update best practices for the technologies whose metrics changed."""
         
-        # Load current practices
-        practices = {}
-        if self.practices_file.exists():
-            try:
-                with open(self.practices_file, 'r') as f:
-                    practices = json.load(f)
-            except Exception:
-                pass
+        # Current practices stay in memory until the file changes on disk; the cached
+        # dict is shared, so changes go into copies and only reach it via the save
+        practices = dict(_load_cached_json(self.practices_file))
         
         # Update practices based on successful patterns
-        for tech, tech_metrics in metrics.items():
-            if tech not in practices:
-                practices[tech] = {"patterns": [], "evolved_practices": []}
+        changed = False
+        for tech in changed_techs:
+            tech_metrics = metrics.get(tech, {})
+            current = practices.get(tech) or {"patterns": [], "evolved_practices": []}
+            evolved = list(current["evolved_practices"])
             
             # Promote patterns with high success rates
             successful_patterns = tech_metrics.get("successful_patterns", {})
@@ -336,14 +507,19 @@ class BestPracticesEvolution:
                 success_rate = success_count / total_projects
                 
                 # If pattern succeeds in >70% of projects, promote to best practice
-                if success_rate > 0.7 and pattern not in practices[tech]["patterns"]:
-                    practices[tech]["evolved_practices"].append({
+                if success_rate > 0.7 and pattern not in current["patterns"]:
+                    evolved.append({
                         "pattern": pattern,
                         "success_rate": success_rate,
                         "projects": success_count
                     })
+            
+            if tech not in practices or len(evolved) != len(current["evolved_practices"]):
+                practices[tech] = {**current, "evolved_practices": evolved}
+                changed = True
+        
+        if not changed:
+            return
         
         # Save updated practices
-        self.practices_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.practices_file, 'w') as f:
-            json.dump(practices, f, indent=2)
\ No newline at end of file
+        _save_cached_json(self.practices_file, practices)
\ No newline at end of file
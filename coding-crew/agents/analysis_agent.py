@@ -1,14 +1,19 @@
 """Analysis agent for parsing requirements and generating workload analysis."""
 
+import re
+from functools import lru_cache
 from typing import Dict, Any
 from core.base_agent import BaseAgent
-from core.diagram_generator import DiagramGenerator
+from core.diagram_generator import DrawIODiagramGenerator
 from loguru import logger
 
 
 class AnalysisAgent(BaseAgent):
     """Agent responsible for analyzing requirements and creating system diagrams."""
     
+    # Diagram generation is stateless, so one generator serves every agent
+    _diagram_gen = DrawIODiagramGenerator()
+    
     def __init__(self, config: Dict[str, Any] = None):
         super().__init__("analysis", config)
     
@@ -62,9 +67,7 @@ class AnalysisAgent(BaseAgent):
     
     async def _create_system_diagrams(self, parsed_requirements: Dict[str, Any]) -> Dict[str, Any]:
         """Create aesthetic draw.io XML diagrams."""
-        from core.drawio_generator import DrawIODiagramGenerator
-        
-        diagram_gen = DrawIODiagramGenerator()
+        diagram_gen = self._diagram_gen
         
         # Extract components for diagram generation
         components = self._extract_components(parsed_requirements)
@@ -90,49 +93,25 @@ class AnalysisAgent(BaseAgent):
         if "components" in parsed_requirements:
             return parsed_requirements["components"]
         
-        # Generate components based on requirements complexity
-        complexity = parsed_requirements.get("complexity", "medium")
+        # The cached defaults are shared, so callers get their own copy of each component
         component_count = parsed_requirements.get("estimated_components", 3)
-        
-        # Dynamic component generation based on analysis
-        base_components = [
-            {"name": "User Interface", "type": "ui"},
-            {"name": "Application Logic", "type": "service"},
-            {"name": "Data Storage", "type": "storage"}
-        ]
-        
-        if component_count > 3:
-            base_components.extend([
-                {"name": "API Gateway", "type": "service"},
-                {"name": "External Services", "type": "external"}
-            ])
-        
-        return base_components[:component_count]
+        return [dict(component) for component in _default_components(component_count)]
     
     def _get_workflow_stages(self, parsed_requirements: Dict[str, Any]) -> list:
         """Get workflow stages based on project requirements."""
         complexity = parsed_requirements.get("complexity", "medium")
-        
-        # Base workflow stages
-        stages = ["Requirements Analysis", "Architecture Design", "Implementation"]
-        
-        # Add stages based on complexity
-        if complexity in ["medium", "high"]:
-            stages.extend(["Code Review", "Testing"])
-        
-        if complexity == "high":
-            stages.extend(["Integration Testing", "Documentation"])
-        
-        return stages
+        return list(_workflow_stages(complexity))
     
     def _validate_diagram_quality(self, system_diagram: str, workflow_diagram: str) -> Dict[str, bool]:
         """Validate diagram quality dynamically."""
+        system_tokens = _find_diagram_tokens(system_diagram)
+        workflow_tokens = _find_diagram_tokens(workflow_diagram)
         return {
-            "proper_xml_format": "<mxfile>" in system_diagram and "<mxfile>" in workflow_diagram,
-            "has_components": "mxCell" in system_diagram,
-            "has_workflow_stages": "mxCell" in workflow_diagram,
-            "valid_structure": "<root>" in system_diagram and "<root>" in workflow_diagram,
-            "aesthetic_styling": "fillColor=" in system_diagram
+            "proper_xml_format": "<mxfile>" in system_tokens and "<mxfile>" in workflow_tokens,
+            "has_components": "mxCell" in system_tokens,
+            "has_workflow_stages": "mxCell" in workflow_tokens,
+            "valid_structure": "<root>" in system_tokens and "<root>" in workflow_tokens,
+            "aesthetic_styling": "fillColor=" in system_tokens
         }
     
     def chat_about_analysis(self, message: str, context: Dict[str, Any]) -> str:
@@ -142,36 +121,122 @@ class AnalysisAgent(BaseAgent):
         timeline = context.get('estimated_timeline', '2-4 weeks')
         project_name = context.get('project_requirements', {}).get('name', 'this project')
         
-        if any(word in message_lower for word in ['implement', 'code', 'develop', 'build']):
-            return f"As the architect for {project_name}, I've designed the system to be implemented by our specialized coding agents using {', '.join(tech_stack)}. They'll follow my architectural specifications exactly - proper layering, clean interfaces, and the patterns I've defined. The coding agents handle implementation while I ensure architectural integrity."
-        
-        elif any(word in message_lower for word in ['react', 'angular']) and 'react' in message_lower and 'angular' in message_lower:
-            return f"I included both React and Angular in the stack because they serve different architectural layers. React handles the dynamic UI components with optimal performance, while Angular provides the enterprise framework structure. For {project_name}, this hybrid approach gives us both flexibility and robustness."
-        
-        elif 'react' in message_lower:
-            return f"I chose React for {project_name} because of its component-based architecture and virtual DOM performance. It aligns perfectly with the modular design I've specified - each UI component maps to a clear architectural boundary."
-        
-        elif 'angular' in message_lower:
-            return f"Angular is in my architecture for {project_name} because it provides the enterprise-grade structure needed for complex business logic. Its dependency injection and TypeScript integration support the scalable patterns I've designed."
-        
-        elif any(word in message_lower for word in ['tech', 'technology', 'stack']):
-            return f"I selected {', '.join(tech_stack)} after analyzing {project_name}'s requirements. Each technology serves a specific architectural purpose in my design - this combination provides optimal performance, maintainability, and allows our coding agents to implement clean, scalable code."
+        for intent, pattern in _INTENT_PATTERNS:
+            if pattern.search(message_lower):
+                return _CHAT_HANDLERS[intent](project_name, tech_stack, timeline, context)
         
-        elif any(word in message_lower for word in ['timeline', 'time', 'estimate']):
-            return f"My {timeline} estimate for {project_name} is based on architectural complexity analysis. This accounts for the coding agents implementing my design, iterative testing cycles, and deployment validation. The modular architecture I've created allows for parallel development streams."
-        
-        elif any(word in message_lower for word in ['architecture', 'design', 'structure']):
-            return f"I've architected {project_name} with modern patterns - clean separation of concerns, scalable data flows, and maintainable component boundaries. The coding agents will implement exactly what I've specified in the technical design, following the architectural principles I've established."
-        
-        elif any(word in message_lower for word in ['test', 'testing']):
-            test_plan = context.get('test_plan', '')
-            if test_plan:
-                return f"I've designed a comprehensive testing strategy for {project_name}. The test plan covers unit tests for each architectural component, integration tests for data flows, and end-to-end validation. Our testing agents will implement these tests following my specifications."
-            else:
-                return f"Testing for {project_name} will follow the architectural boundaries I've defined - unit tests for each component, integration tests for service interactions, and system tests for the complete workflow."
-        
-        elif any(word in message_lower for word in ['diagram', 'visual']):
-            return f"I've created system diagrams that visualize the architecture for {project_name}. These show component relationships, data flows, and deployment structure. The diagrams serve as blueprints for our coding agents during implementation."
-        
-        else:
-            return f"I'm the AI architect who analyzed and designed {project_name}. I can explain my technology choices, architectural decisions, timeline estimates, or how our coding agents will implement my design. What specific aspect of the architecture interests you?"
\ No newline at end of file
+        return f"I'm the AI architect who analyzed and designed {project_name}. I can explain my technology choices, architectural decisions, timeline estimates, or how our coding agents will implement my design. What specific aspect of the architecture interests you?"
+
+
+@lru_cache(maxsize=32)
+def _default_components(component_count: int) -> tuple:
+    """Dynamic default components for a requirements estimate."""
+    base_components = [
+        {"name": "User Interface", "type": "ui"},
+        {"name": "Application Logic", "type": "service"},
+        {"name": "Data Storage", "type": "storage"}
+    ]
+    
+    if component_count > 3:
+        base_components.extend([
+            {"name": "API Gateway", "type": "service"},
+            {"name": "External Services", "type": "external"}
+        ])
+    
+    return tuple(base_components[:component_count])
+
+
+@lru_cache(maxsize=32)
+def _workflow_stages(complexity: str) -> tuple:
+    """Workflow stages for a project complexity level."""
+    # Base workflow stages
+    stages = ["Requirements Analysis", "Architecture Design", "Implementation"]
+    
+    # Add stages based on complexity
+    if complexity in ["medium", "high"]:
+        stages.extend(["Code Review", "Testing"])
+    
+    if complexity == "high":
+        stages.extend(["Integration Testing", "Documentation"])
+    
+    return tuple(stages)
+
+
+# Markers checked by _validate_diagram_quality
+_DIAGRAM_TOKENS = re.compile(r"<mxfile>|mxCell|<root>|fillColor=")
+_DIAGRAM_TOKEN_COUNT = 4
+
+
+def _find_diagram_tokens(diagram: str) -> set:
+    """Collect the quality markers present in a diagram in a single pass."""
+    found = set()
+    for match in _DIAGRAM_TOKENS.finditer(diagram):
+        found.add(match.group())
+        if len(found) == _DIAGRAM_TOKEN_COUNT:
+            break
+    return found
+
+
+# Chat intents in priority order; keywords match anywhere in the message
+_INTENT_PATTERNS = (
+    ("implement", re.compile(r"implement|code|develop|build")),
+    ("react_angular", re.compile(r"\A(?=.*react)(?=.*angular)", re.DOTALL)),
+    ("react", re.compile(r"react")),
+    ("angular", re.compile(r"angular")),
+    ("tech", re.compile(r"tech|stack")),
+    ("timeline", re.compile(r"time|estimate")),
+    ("architecture", re.compile(r"architecture|design|structure")),
+    ("test", re.compile(r"test")),
+    ("diagram", re.compile(r"diagram|visual")),
+)
+
+
+def _implement_response(project_name: str, tech_stack: list, timeline: str, context: Dict[str, Any]) -> str:
+    return f"As the architect for {project_name}, I've designed the system to be implemented by our specialized coding agents using {', '.join(tech_stack)}. They'll follow my architectural specifications exactly - proper layering, clean interfaces, and the patterns I've defined. The coding agents handle implementation while I ensure architectural integrity."
+
+
+def _react_angular_response(project_name: str, tech_stack: list, timeline: str, context: Dict[str, Any]) -> str:
+    return f"I included both React and Angular in the stack because they serve different architectural layers. React handles the dynamic UI components with optimal performance, while Angular provides the enterprise framework structure. For {project_name}, this hybrid approach gives us both flexibility and robustness."
+
+
+def _react_response(project_name: str, tech_stack: list, timeline: str, context: Dict[str, Any]) -> str:
+    return f"I chose React for {project_name} because of its component-based architecture and virtual DOM performance. It aligns perfectly with the modular design I've specified - each UI component maps to a clear architectural boundary."
+
+
+def _angular_response(project_name: str, tech_stack: list, timeline: str, context: Dict[str, Any]) -> str:
+    return f"Angular is in my architecture for {project_name} because it provides the enterprise-grade structure needed for complex business logic. Its dependency injection and TypeScript integration support the scalable patterns I've designed."
+
+
+def _tech_response(project_name: str, tech_stack: list, timeline: str, context: Dict[str, Any]) -> str:
+    return f"I selected {', '.join(tech_stack)} after analyzing {project_name}'s requirements. Each technology serves a specific architectural purpose in my design - this combination provides optimal performance, maintainability, and allows our coding agents to implement clean, scalable code."
+
+
+def _timeline_response(project_name: str, tech_stack: list, timeline: str, context: Dict[str, Any]) -> str:
+    return f"My {timeline} estimate for {project_name} is based on architectural complexity analysis. This accounts for the coding agents implementing my design, iterative testing cycles, and deployment validation. The modular architecture I've created allows for parallel development streams."
+
+
+def _architecture_response(project_name: str, tech_stack: list, timeline: str, context: Dict[str, Any]) -> str:
+    return f"I've architected {project_name} with modern patterns - clean separation of concerns, scalable data flows, and maintainable component boundaries. The coding agents will implement exactly what I've specified in the technical design, following the architectural principles I've established."
+
+
+def _test_response(project_name: str, tech_stack: list, timeline: str, context: Dict[str, Any]) -> str:
+    if context.get('test_plan', ''):
+        return f"I've designed a comprehensive testing strategy for {project_name}. The test plan covers unit tests for each architectural component, integration tests for data flows, and end-to-end validation. Our testing agents will implement these tests following my specifications."
+    return f"Testing for {project_name} will follow the architectural boundaries I've defined - unit tests for each component, integration tests for service interactions, and system tests for the complete workflow."
+
+
+def _diagram_response(project_name: str, tech_stack: list, timeline: str, context: Dict[str, Any]) -> str:
+    return f"I've created system diagrams that visualize the architecture for {project_name}. These show component relationships, data flows, and deployment structure. The diagrams serve as blueprints for our coding agents during implementation."
+
+
+_CHAT_HANDLERS = {
+    "implement": _implement_response,
+    "react_angular": _react_angular_response,
+    "react": _react_response,
+    "angular": _angular_response,
+    "tech": _tech_response,
+    "timeline": _timeline_response,
+    "architecture": _architecture_response,
+    "test": _test_response,
+    "diagram": _diagram_response,
+}
@@ -2,83 +2,160 @@
 
 from crewai import Agent, Task, Crew
 from langchain_community.llms import Ollama
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from string import Template
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
 import logging
 import re
+import threading
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+    _XML_SYNTAX_ERROR = etree.XMLSyntaxError
+except ImportError:
+    import xml.etree.ElementTree as etree
+    LXML_AVAILABLE = False
+    _XML_SYNTAX_ERROR = etree.ParseError
 
 logger = logging.getLogger(__name__)
 
+# lxml parsers must not be shared between threads, so each analysis worker keeps its own
+_xml_parser_local = threading.local()
+
+# Fixes for malformed markdown emitted by the LLM, matched in a single pass
+_MD_FIXES = re.compile(
+    r'(?P<h2>(?P<dash>-\s*)?\*\*(?P<h2_text>[^*]+)\*\*\s*\*\*)'
+    r'|(?P<h3_hash>##\s*-\s*\*(?P<h3_hash_text>[^*]+)\*\*)'
+    r'|(?P<h3_bold>-\s*\*\*(?P<h3_bold_text>[^*]+)\*\*)'
+    r'|(?P<h3_dash>-\s*##)'
+)
+_WS_RE = re.compile(r'\n{3,}')
+
+# draw.io XML blocks, optionally fenced as xml or drawio, matched in a single pass
+_DIAGRAM_RE = re.compile(r'(?:```(?:xml|drawio)\s*)?(<mxfile\b[^>]*?>[\s\S]*?</mxfile>)', re.IGNORECASE)
+
+# User stories spelled out in full in one analysis prompt
+STORY_BATCH_SIZE = 6
+
+# Completed analyses kept per requirements digest
+ANALYSIS_CACHE_SIZE = 32
+
+# Elements every draw.io document needs, checked before paying for a parse
+_DRAWIO_MARKERS = (b'<mxfile', b'</mxfile>', b'<mxGraphModel', b'<root', b'<mxCell')
+
+# Simple system diagram used when the analysis contains no valid diagrams
+_FALLBACK_DRAWIO_XML = '''<?xml version="1.0" encoding="UTF-8"?>
+<mxfile host="app.diagrams.net">
+  <diagram name="System Architecture">
+    <mxGraphModel dx="1422" dy="794" grid="1" gridSize="10" guides="1" tooltips="1" connect="1" arrows="1" fold="1" page="1" pageScale="1" pageWidth="827" pageHeight="1169">
+      <root>
+        <mxCell id="0"/>
+        <mxCell id="1" parent="0"/>
+        <mxCell id="2" value="User Interface" style="rounded=1;whiteSpace=wrap;html=1;fillColor=#dae8fc;strokeColor=#6c8ebf;shadow=1;" vertex="1" parent="1">
+          <mxGeometry x="100" y="100" width="120" height="60" as="geometry"/>
+        </mxCell>
+        <mxCell id="3" value="Business Logic" style="rounded=1;whiteSpace=wrap;html=1;fillColor=#d5e8d4;strokeColor=#82b366;shadow=1;" vertex="1" parent="1">
+          <mxGeometry x="300" y="100" width="120" height="60" as="geometry"/>
+        </mxCell>
+        <mxCell id="4" value="Data Layer" style="rounded=1;whiteSpace=wrap;html=1;fillColor=#fff2cc;strokeColor=#d6b656;shadow=1;" vertex="1" parent="1">
+          <mxGeometry x="500" y="100" width="120" height="60" as="geometry"/>
+        </mxCell>
+        <mxCell id="5" value="" style="endArrow=classic;html=1;exitX=1;exitY=0.5;entryX=0;entryY=0.5;" edge="1" parent="1" source="2" target="3">
+          <mxGeometry width="50" height="50" relative="1" as="geometry"/>
+        </mxCell>
+        <mxCell id="6" value="" style="endArrow=classic;html=1;exitX=1;exitY=0.5;entryX=0;entryY=0.5;" edge="1" parent="1" source="3" target="4">
+          <mxGeometry width="50" height="50" relative="1" as="geometry"/>
+        </mxCell>
+      </root>
+    </mxGraphModel>
+  </diagram>
+</mxfile>'''
+
+
+def _fix_markdown(match: re.Match) -> str:
+    """Rewrite one malformed heading matched by _MD_FIXES."""
+    kind = match.lastgroup
+    if kind == 'h2':
+        # A dashed bold heading used to become "- ## x" and then "### x"
+        return ('### ' if match.group('dash') is not None else '## ') + match.group('h2_text')
+    if kind == 'h3_hash':
+        return '### ' + match.group('h3_hash_text')
+    if kind == 'h3_bold':
+        return '### ' + match.group('h3_bold_text')
+    return '###'
+
+
 def format_analysis_as_markdown(text: str) -> str:
     """Format analysis text as proper markdown."""
     # Clean up the text and ensure proper markdown formatting
     formatted = text.strip()
     
     # Fix malformed markdown patterns
-    formatted = re.sub(r'\*\*([^*]+)\*\*\s*\*\*', r'## \1', formatted)
-    formatted = re.sub(r'##\s*-\s*\*([^*]+)\*\*', r'### \1', formatted)
-    formatted = re.sub(r'-\s*\*\*([^*]+)\*\*', r'### \1', formatted)
-    formatted = re.sub(r'-\s*##', r'###', formatted)
-    formatted = re.sub(r'\*\*([^*]+)\*\*', r'**\1**', formatted)
+    formatted = _MD_FIXES.sub(_fix_markdown, formatted)
     
     # Clean up excessive whitespace
-    formatted = re.sub(r'\n{3,}', '\n\n', formatted)
+    formatted = _WS_RE.sub('\n\n', formatted)
     
     return formatted
 
+
+def _xml_parser():
+    """Return this thread's lxml parser, which never loads entities or network resources."""
+    parser = getattr(_xml_parser_local, 'parser', None)
+    if parser is None:
+        parser = _xml_parser_local.parser = etree.XMLParser(
+            recover=False, huge_tree=False, resolve_entities=False, no_network=True
+        )
+    return parser
+
+
+def _output_text(result) -> str:
+    """Return the raw text of a crew result without stringifying the whole CrewOutput."""
+    raw = getattr(result, 'raw', None)
+    return raw if isinstance(raw, str) else str(result)
+
+
+def _requirements_key(requirements: dict) -> str:
+    """Build a stable digest of a requirements dict for caching."""
+    payload = json.dumps(requirements, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
 class AnalysisCrew:
     """CrewAI-based analysis crew for requirements processing."""
     
-    def __init__(self, model_name: str = "ollama/llama3.1:8b"):
-        from core.llm_config import get_analysis_llm
-        self.llm = get_analysis_llm()
-        self.crew = self._create_crew()
+    # Shared across instances since callers create a crew per request; holds the
+    # analysis, test plan and final review outputs so callbacks can be replayed
+    _analysis_cache: "OrderedDict[str, Tuple[str, str, str]]" = OrderedDict()
+    _analysis_cache_lock = threading.Lock()
     
-    def _create_crew(self) -> Crew:
-        """Create the analysis crew with agents and tasks."""
-        
-        # Analysis Agent
-        analysis_agent = Agent(
-            role="Requirements Analyst",
-            goal="Analyze project requirements and create comprehensive technical specifications",
-            backstory="You are an expert software architect with 15+ years of experience in analyzing requirements and designing scalable systems.",
-            llm=self.llm,
-            verbose=True
-        )
-        
-        # Architecture Review Agent
-        review_agent = Agent(
-            role="Architecture Reviewer",
-            goal="Review and refine technical analysis to ensure best practices and optimal design",
-            backstory="You are a senior technical reviewer who specializes in identifying potential issues and suggesting improvements in system architecture.",
-            llm=self.llm,
-            verbose=True
-        )
-        
-        return Crew(
-            agents=[analysis_agent, review_agent],
-            tasks=[],
-            verbose=True
-        )
-    
-    def analyze_requirements(self, requirements: dict) -> str:
-        """Analyze project requirements using CrewAI."""
-        try:
-            # Create analysis task with story-first approach
-            analysis_task = Task(
-                description=f"""
-                PRIMARY OBJECTIVE: Analyze requirements to fulfill this JIRA story:
-                {self._extract_primary_story_requirement(requirements)}
-                
-                CONSTRAINT: All recommendations must support the story objective above.
+    # Project context shared by the analysis, test plan and rework prompts, so every task
+    # reads the stories and project values in the same form
+    _CONTEXT_PREFIX = """
+                JIRA STORIES:
+                $story_requirements
                 
                 Project Context:
-                - Project: {requirements.get('project_name', 'Unknown')}
-                - Description: {requirements.get('description', 'No description')}
-                - Target Users: {requirements.get('target_users', 'Not specified')}
-                - Scale: {requirements.get('scale', 'Not specified')}
-                - Features: {', '.join(requirements.get('features', []))}
-                - Constraints: {requirements.get('constraints', 'None specified')}
+                - Project: $project_name
+                - Description: $description
+                - Target Users: $target_users
+                - Scale: $scale
+                - Features: $features
+                - Constraints: $constraints
                 
-                {self._format_jira_context(requirements)}
+                $jira_context
+                """
+    
+    # Prompt bodies are built once; only the per-request values are substituted
+    _ANALYSIS_PROMPT_TEMPLATE = Template(_CONTEXT_PREFIX + """
+                PRIMARY OBJECTIVE: Analyze requirements to fulfill the JIRA stories above.
+                
+                CONSTRAINT: All recommendations must support the story objectives above.
                 
                 Provide (only if they support the story objective):
                 1. Technology stack recommendations
@@ -110,18 +187,11 @@ class AnalysisCrew:
                 ```
                 
                 Format the response as a detailed technical analysis with embedded diagram.
-                """,
-                agent=self.crew.agents[0],
-                expected_output="Comprehensive technical analysis with recommendations"
-            )
-            
-            # Create test planning task (parallel to analysis)
-            test_planning_task = Task(
-                description=f"""
-                Based on JIRA story requirements, define test strategy:
-                
-                Story Requirements:
-                {self._extract_primary_story_requirement(requirements)}
+                Label the story-specific parts of the analysis [STORY <key>] for each story.
+                """)
+    
+    _TEST_PLAN_PROMPT_TEMPLATE = Template(_CONTEXT_PREFIX + """
+                Based on the JIRA story requirements above, define test strategy:
                 
                 Generate:
                 1. Test scenarios that prove story acceptance criteria
@@ -132,16 +202,17 @@ class AnalysisCrew:
                 
                 Focus on story validation, not comprehensive testing.
                 Ensure tests can demonstrate the story is fulfilled.
-                """,
-                agent=self.crew.agents[1],
-                expected_output="Test plan aligned with story requirements"
-            )
-            
-            # Create review task
-            review_task = Task(
-                description="""
+                """)
+    
+    _REVIEW_PROMPT_TEMPLATE = Template("""
                 Review the technical analysis and test plan, ensuring both support the JIRA story:
                 
+                TECHNICAL ANALYSIS:
+                $analysis_output
+                
+                TEST PLAN:
+                $test_plan_output
+                
                 PRIORITY: Validate that analysis and tests fulfill the story requirements.
                 
                 Provide:
@@ -165,37 +236,143 @@ class AnalysisCrew:
                 - Data Flow Diagram  
                 - Component Interaction Diagram
                 
-                XML Structure Requirements:
-                ```xml
-                <mxfile host="app.diagrams.net">
-                  <diagram name="Diagram Name">
-                    <mxGraphModel>
-                      <root>
-                        <mxCell id="0"/>
-                        <mxCell id="1" parent="0"/>
-                        <mxCell id="2" value="Component" style="rounded=1;fillColor=#dae8fc;strokeColor=#6c8ebf;" vertex="1" parent="1">
-                          <mxGeometry x="100" y="100" width="120" height="60" as="geometry"/>
-                        </mxCell>
-                      </root>
-                    </mxGraphModel>
-                  </diagram>
-                </mxfile>
-                ```
+                XML Structure Requirements (same shape as the diagram in the technical analysis):
+                <mxfile><diagram><mxGraphModel><root> with <mxCell id="0"/> and <mxCell id="1" parent="0"/>
+                first, then vertex and edge mxCells with parent="1", each vertex holding an mxGeometry.
                 
                 Validate each XML diagram can be imported into draw.io without errors.
-                """,
+                Keep the [STORY <key>] labels from the technical analysis.
+                """)
+    
+    _REWORK_PROMPT_TEMPLATE = Template(_CONTEXT_PREFIX + """
+                Rework the previous analysis of the requirements above based on the following feedback:
+                
+                FEEDBACK: $feedback
+                
+                Address the feedback specifically and provide a revised analysis that:
+                1. Incorporates the feedback requirements
+                2. Adjusts technology recommendations accordingly
+                3. Modifies architecture patterns as needed
+                4. Updates deployment strategy based on constraints
+                5. Explains how the feedback has been addressed
+                6. Updated draw.io XML diagrams reflecting changes
+                
+                IMPORTANT: Update all draw.io XML diagrams to reflect the feedback.
+                Generate revised system architecture, data flow, and component diagrams.
+                Maintain professional aesthetics with gradients, shadows, and consistent styling.
+                
+                Format as a comprehensive revised technical analysis with updated diagrams.
+                """)
+    
+    def __init__(self):
+        from core.llm_config import get_analysis_llm, get_review_llm
+        self.llm = get_analysis_llm()
+        self.review_llm = get_review_llm()
+        self.crew = self._create_crew()
+    
+    def _create_crew(self) -> Crew:
+        """Create the analysis crew with agents and tasks."""
+        
+        # Analysis Agent
+        analysis_agent = Agent(
+            role="Requirements Analyst",
+            goal="Analyze project requirements and create comprehensive technical specifications",
+            backstory="You are an expert software architect with 15+ years of experience in analyzing requirements and designing scalable systems.",
+            llm=self.llm,
+            verbose=True
+        )
+        
+        # Architecture Review Agent
+        review_agent = Agent(
+            role="Architecture Reviewer",
+            goal="Review and refine technical analysis to ensure best practices and optimal design",
+            backstory="You are a senior technical reviewer who specializes in identifying potential issues and suggesting improvements in system architecture.",
+            llm=self.review_llm,
+            verbose=True
+        )
+        
+        return Crew(
+            agents=[analysis_agent, review_agent],
+            tasks=[],
+            verbose=True
+        )
+    
+    def analyze_requirements(self, requirements: dict,
+                             on_task_output: Optional[Callable[[str, str], None]] = None) -> str:
+        """Analyze project requirements using CrewAI.
+        
+        on_task_output, if given, is called with a stage name ("analysis",
+        "test_plan", "review") and its output as soon as each stage finishes;
+        cached analyses replay the stored stage outputs in that order.
+        """
+        cache_key = _requirements_key(requirements)
+        with self._analysis_cache_lock:
+            cached = self._analysis_cache.get(cache_key)
+            if cached is not None:
+                self._analysis_cache.move_to_end(cache_key)
+        if cached is not None:
+            logger.info("Returning cached analysis for unchanged requirements")
+            if on_task_output:
+                for stage, output in zip(("analysis", "test_plan", "review"), cached):
+                    on_task_output(stage, output)
+            return cached[2]
+        
+        try:
+            prompt_context = self._prompt_context(requirements)
+            batches = self._story_batches(requirements)
+            
+            # Create analysis tasks with story-first approach, one per story batch
+            analysis_tasks = [
+                Task(
+                    description=self._ANALYSIS_PROMPT_TEMPLATE.substitute(prompt_context, story_requirements=batch),
+                    agent=self.crew.agents[0],
+                    expected_output="Comprehensive technical analysis with recommendations, labeled [STORY <key>] for each story"
+                )
+                for batch in batches
+            ]
+            
+            # Create test planning tasks (run in parallel with analysis)
+            test_planning_tasks = [
+                Task(
+                    description=self._TEST_PLAN_PROMPT_TEMPLATE.substitute(prompt_context, story_requirements=batch),
+                    agent=self.crew.agents[1],
+                    expected_output="Test plan aligned with story requirements"
+                )
+                for batch in batches
+            ]
+            
+            # Analysis and test planning only depend on the requirements, so run every batch side by side;
+            # a stage is reported once all of its batches are done
+            stages = ("analysis", "test_plan")
+            stage_outputs = ({}, {})
+            
+            def report(i: int, output: str) -> None:
+                stage, batch = divmod(i, len(batches))
+                stage_outputs[stage][batch] = output
+                if len(stage_outputs[stage]) == len(batches):
+                    on_task_output(stages[stage], "\n\n".join(stage_outputs[stage][b] for b in range(len(batches))))
+            
+            outputs = self._run_parallel_tasks(
+                analysis_tasks + test_planning_tasks, on_output=report if on_task_output else None
+            )
+            analysis_output = "\n\n".join(outputs[:len(batches)])
+            test_plan_output = "\n\n".join(outputs[len(batches):])
+            
+            # Create review task over both results
+            review_task = Task(
+                description=self._REVIEW_PROMPT_TEMPLATE.substitute(
+                    analysis_output=analysis_output, test_plan_output=test_plan_output
+                ),
                 agent=self.crew.agents[1],
                 expected_output="Reviewed technical analysis with validated draw.io XML diagrams"
             )
             
-            # Update crew with tasks (analysis + test planning + review)
-            self.crew.tasks = [analysis_task, test_planning_task, review_task]
-            
-            # Execute the crew
+            # Review runs once both inputs are available
+            self.crew.tasks = [review_task]
             result = self.crew.kickoff()
             
             logger.info("Analysis crew completed successfully")
-            analysis_text = format_analysis_as_markdown(str(result))
+            analysis_text = format_analysis_as_markdown(_output_text(result))
             
             # Extract and store diagrams
             diagrams = self._extract_diagrams(analysis_text)
@@ -205,45 +382,39 @@ class AnalysisCrew:
                 for i, diagram in enumerate(diagrams):
                     analysis_text += f"### Diagram {i+1}\n```xml\n{diagram}\n```\n\n"
             
+            if on_task_output:
+                on_task_output("review", analysis_text)
+            
+            with self._analysis_cache_lock:
+                self._analysis_cache[cache_key] = (analysis_output, test_plan_output, analysis_text)
+                if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                    self._analysis_cache.popitem(last=False)
+            
             return analysis_text
             
         except Exception as e:
             logger.error(f"Analysis crew failed: {str(e)}")
             return f"Analysis failed: {str(e)}"
     
+    async def analyze_requirements_async(self, requirements: dict) -> str:
+        """Analyze requirements without blocking the event loop."""
+        return await asyncio.to_thread(self.analyze_requirements, requirements)
+    
+    async def rework_analysis_async(self, requirements: dict, feedback: str) -> str:
+        """Rework an analysis without blocking the event loop."""
+        return await asyncio.to_thread(self.rework_analysis, requirements, feedback)
+    
     def rework_analysis(self, requirements: dict, feedback: str) -> str:
         """Rework analysis based on feedback."""
         try:
+            prompt_context = self._prompt_context(requirements)
+            # A rework revises the whole analysis, so it sees every story batch at once
             rework_task = Task(
-                description=f"""
-                Rework the previous analysis based on the following feedback:
-                
-                FEEDBACK: {feedback}
-                
-                Original Requirements:
-                Project: {requirements.get('project_name', 'Unknown')}
-                Description: {requirements.get('description', 'No description')}
-                Target Users: {requirements.get('target_users', 'Not specified')}
-                Scale: {requirements.get('scale', 'Not specified')}
-                Features: {', '.join(requirements.get('features', []))}
-                Constraints: {requirements.get('constraints', 'None specified')}
-                
-                {self._format_jira_context(requirements)}
-                
-                Address the feedback specifically and provide a revised analysis that:
-                1. Incorporates the feedback requirements
-                2. Adjusts technology recommendations accordingly
-                3. Modifies architecture patterns as needed
-                4. Updates deployment strategy based on constraints
-                5. Explains how the feedback has been addressed
-                6. Updated draw.io XML diagrams reflecting changes
-                
-                IMPORTANT: Update all draw.io XML diagrams to reflect the feedback.
-                Generate revised system architecture, data flow, and component diagrams.
-                Maintain professional aesthetics with gradients, shadows, and consistent styling.
-                
-                Format as a comprehensive revised technical analysis with updated diagrams.
-                """,
+                description=self._REWORK_PROMPT_TEMPLATE.substitute(
+                    prompt_context,
+                    story_requirements="".join(self._story_batches(requirements)),
+                    feedback=feedback
+                ),
                 agent=self.crew.agents[0],
                 expected_output="Revised technical analysis incorporating feedback"
             )
@@ -252,7 +423,7 @@ class AnalysisCrew:
             result = self.crew.kickoff()
             
             logger.info("Analysis rework completed successfully")
-            analysis_text = format_analysis_as_markdown(str(result))
+            analysis_text = format_analysis_as_markdown(_output_text(result))
             
             # Extract and store diagrams
             diagrams = self._extract_diagrams(analysis_text)
@@ -268,88 +439,89 @@ class AnalysisCrew:
             logger.error(f"Analysis rework failed: {str(e)}")
             return f"Rework failed: {str(e)}"
     
+    def _run_parallel_tasks(self, tasks: list,
+                            on_output: Optional[Callable[[int, str], None]] = None) -> list:
+        """Run independent tasks as single-task crews concurrently and return their outputs."""
+        crews = [Crew(agents=[task.agent], tasks=[task], verbose=True) for task in tasks]
+        outputs = [None] * len(crews)
+        
+        # Threads rather than asyncio.run so callers already inside an event loop still work
+        with ThreadPoolExecutor(max_workers=len(crews)) as executor:
+            futures = {executor.submit(crew.kickoff): i for i, crew in enumerate(crews)}
+            # Hand each output on as it completes instead of waiting for the slowest task
+            for future in as_completed(futures):
+                index = futures[future]
+                outputs[index] = _output_text(future.result())
+                if on_output:
+                    on_output(index, outputs[index])
+        
+        return outputs
+    
     def _extract_diagrams(self, analysis_text: str) -> list:
         """Extract draw.io XML diagrams from analysis text."""
-        import re
-        
-        # Look for draw.io XML patterns
-        xml_patterns = [
-            r'```xml\s*(<mxfile[^>]*>.*?</mxfile>)\s*```',
-            r'```drawio\s*(<mxfile[^>]*>.*?</mxfile>)\s*```',
-            r'(<mxfile[^>]*>.*?</mxfile>)',
-        ]
+        # Nothing to extract; the validator needs this exact tag anyway
+        if '<mxfile' not in analysis_text:
+            logger.warning("No draw.io diagrams found in analysis")
+            return [_FALLBACK_DRAWIO_XML]
         
-        diagrams = []
-        for pattern in xml_patterns:
-            matches = re.findall(pattern, analysis_text, re.DOTALL | re.IGNORECASE)
-            diagrams.extend(matches)
+        # Ordered de-duplication so each diagram is validated exactly once
+        diagrams = dict.fromkeys(match.group(1) for match in _DIAGRAM_RE.finditer(analysis_text))
         
         # Clean up and validate diagrams
         valid_diagrams = []
         for diagram in diagrams:
-            if '<mxfile' in diagram and '</mxfile>' in diagram and '<mxGraphModel>' in diagram:
-                # Clean up the XML
-                cleaned = diagram.strip()
-                # Ensure proper XML declaration if missing
-                if not cleaned.startswith('<?xml'):
-                    cleaned = '<?xml version="1.0" encoding="UTF-8"?>\n' + cleaned
-                
-                # Validate XML structure
-                if self._validate_drawio_xml(cleaned):
-                    valid_diagrams.append(cleaned)
-                else:
-                    logger.warning(f"Invalid draw.io XML structure detected, skipping diagram")
+            # Clean up the XML
+            cleaned = diagram.strip()
+            # Ensure proper XML declaration if missing
+            if not cleaned.startswith('<?xml'):
+                cleaned = '<?xml version="1.0" encoding="UTF-8"?>\n' + cleaned
+            
+            # Validate XML structure
+            if self._validate_drawio_xml(cleaned):
+                valid_diagrams.append(cleaned)
+            else:
+                logger.warning(f"Invalid draw.io XML structure detected, skipping diagram")
         
         # If no valid diagrams found, create a simple fallback
         if not valid_diagrams:
             logger.warning("No valid draw.io diagrams found in analysis")
-            # Create a simple system diagram as fallback
-            fallback_diagram = '''<?xml version="1.0" encoding="UTF-8"?>
-<mxfile host="app.diagrams.net">
-  <diagram name="System Architecture">
-    <mxGraphModel dx="1422" dy="794" grid="1" gridSize="10" guides="1" tooltips="1" connect="1" arrows="1" fold="1" page="1" pageScale="1" pageWidth="827" pageHeight="1169">
-      <root>
-        <mxCell id="0"/>
-        <mxCell id="1" parent="0"/>
-        <mxCell id="2" value="User Interface" style="rounded=1;whiteSpace=wrap;html=1;fillColor=#dae8fc;strokeColor=#6c8ebf;shadow=1;" vertex="1" parent="1">
-          <mxGeometry x="100" y="100" width="120" height="60" as="geometry"/>
-        </mxCell>
-        <mxCell id="3" value="Business Logic" style="rounded=1;whiteSpace=wrap;html=1;fillColor=#d5e8d4;strokeColor=#82b366;shadow=1;" vertex="1" parent="1">
-          <mxGeometry x="300" y="100" width="120" height="60" as="geometry"/>
-        </mxCell>
-        <mxCell id="4" value="Data Layer" style="rounded=1;whiteSpace=wrap;html=1;fillColor=#fff2cc;strokeColor=#d6b656;shadow=1;" vertex="1" parent="1">
-          <mxGeometry x="500" y="100" width="120" height="60" as="geometry"/>
-        </mxCell>
-        <mxCell id="5" value="" style="endArrow=classic;html=1;exitX=1;exitY=0.5;entryX=0;entryY=0.5;" edge="1" parent="1" source="2" target="3">
-          <mxGeometry width="50" height="50" relative="1" as="geometry"/>
-        </mxCell>
-        <mxCell id="6" value="" style="endArrow=classic;html=1;exitX=1;exitY=0.5;entryX=0;entryY=0.5;" edge="1" parent="1" source="3" target="4">
-          <mxGeometry width="50" height="50" relative="1" as="geometry"/>
-        </mxCell>
-      </root>
-    </mxGraphModel>
-  </diagram>
-</mxfile>'''
-            valid_diagrams.append(fallback_diagram)
+            # Use a simple system diagram as fallback
+            valid_diagrams.append(_FALLBACK_DRAWIO_XML)
         
         return valid_diagrams
     
-    def _extract_primary_story_requirement(self, requirements: dict) -> str:
-        """Extract the core story requirement without hard-coding patterns."""
+    def _prompt_context(self, requirements: dict) -> Dict[str, str]:
+        """Collect the project values shared by the analysis and rework prompts."""
+        return {
+            'project_name': requirements.get('project_name', 'Unknown'),
+            'description': requirements.get('description', 'No description'),
+            'target_users': requirements.get('target_users', 'Not specified'),
+            'scale': requirements.get('scale', 'Not specified'),
+            'features': ', '.join(requirements.get('features', [])),
+            'constraints': requirements.get('constraints', 'None specified'),
+            'jira_context': self._format_jira_context(requirements),
+        }
+    
+    def _story_batches(self, requirements: dict) -> List[str]:
+        """Describe the stories in groups of STORY_BATCH_SIZE so each crew run covers one group together."""
         stories = requirements.get('user_stories', {}).get('user_stories', [])
         if not stories:
-            return f"Project Requirement: {requirements.get('description', 'No specific story requirements')}"
-        
-        # Take the first story as primary (or combine if multiple)
-        primary_story = stories[0]
-        
-        return f"""
-        Story: {primary_story.get('key', 'N/A')}
-        Requirement: {primary_story.get('summary', 'N/A')}
-        Details: {primary_story.get('description', 'N/A')}
+            return [f"Project Requirement: {requirements.get('description', 'No specific story requirements')}"]
         
-        ACCEPTANCE CRITERIA: All technical decisions must directly enable this user story.
+        batches = []
+        for start in range(0, len(stories), STORY_BATCH_SIZE):
+            story_lines = [
+                f"""
+        {i}. [STORY {story.get('key', 'N/A')}]
+        Requirement: {story.get('summary', 'N/A')}
+        Details: {story.get('description', 'N/A')}
         """
+                for i, story in enumerate(stories[start:start + STORY_BATCH_SIZE], start + 1)
+            ]
+            batches.append("".join(story_lines) + """
+        ACCEPTANCE CRITERIA: All technical decisions must directly enable these user stories.
+        """)
+        return batches
     
     def _format_jira_context(self, requirements: dict) -> str:
         """Format JIRA user stories context for analysis."""
@@ -357,68 +529,62 @@ class AnalysisCrew:
             return ""
         
         stories = requirements['user_stories']['user_stories']
-        context = f"\n\n## JIRA User Stories Context ({len(stories)} stories):\n"
-        context += "This project is based on JIRA user stories. Each story represents a specific feature requirement:\n\n"
+        parts = [
+            f"\n\n## JIRA User Stories Context ({len(stories)} stories):\n",
+            "This project is based on JIRA user stories. Each story represents a specific feature requirement:\n\n",
+        ]
         
         for i, story in enumerate(stories, 1):
-            context += f"{i}. **{story.get('key', 'N/A')}**: {story.get('summary', 'N/A')}\n"
+            parts.append(f"{i}. **{story.get('key', 'N/A')}**: {story.get('summary', 'N/A')}\n")
             if story.get('description'):
-                context += f"   - Description: {story['description']}\n"
-            context += f"   - Status: {story.get('status', 'Unknown')}\n\n"
+                parts.append(f"   - Description: {story['description']}\n")
+            parts.append(f"   - Status: {story.get('status', 'Unknown')}\n\n")
         
-        context += "\n**Analysis Instructions for JIRA Projects:**\n"
-        context += "- PRIMARY: Fulfill the story requirements exactly\n"
-        context += "- Consider story dependencies and integration points\n"
-        context += "- Design architecture to support the specific story needs\n"
-        context += "- Avoid over-engineering beyond story scope\n"
+        parts.append(
+            "\n**Analysis Instructions for JIRA Projects:**\n"
+            "- PRIMARY: Fulfill the story requirements exactly\n"
+            "- Consider story dependencies and integration points\n"
+            "- Design architecture to support the specific story needs\n"
+            "- Avoid over-engineering beyond story scope\n"
+        )
         
-        return context
+        return ''.join(parts)
     
     def _validate_drawio_xml(self, xml_content: str) -> bool:
         """Validate draw.io XML structure."""
+        data = xml_content.encode('utf-8')
+        if not all(marker in data for marker in _DRAWIO_MARKERS):
+            return False
+        
         try:
-            import xml.etree.ElementTree as ET
-            
-            # Parse XML to check basic structure
-            root = ET.fromstring(xml_content)
-            
-            # Check required elements
-            if root.tag != 'mxfile':
-                return False
-            
-            diagram = root.find('diagram')
-            if diagram is None:
-                return False
-            
-            model = diagram.find('mxGraphModel')
-            if model is None:
-                return False
-            
-            root_elem = model.find('root')
-            if root_elem is None:
-                return False
-            
-            # Check for required root cells
-            cells = root_elem.findall('mxCell')
-            if len(cells) < 2:  # Should have at least cells with id="0" and id="1"
-                return False
-            
-            # Validate cell structure
-            cell_ids = set()
-            for cell in cells:
-                cell_id = cell.get('id')
-                if not cell_id:
-                    return False
-                cell_ids.add(cell_id)
-                
-                # Check parent references are valid
-                parent = cell.get('parent')
-                if parent and parent not in ['0'] and parent not in cell_ids:
-                    # Parent should exist or be root
-                    continue
-            
-            return True
-            
-        except Exception as e:
+            if LXML_AVAILABLE:
+                root = etree.fromstring(data, parser=_xml_parser())
+            else:
+                root = etree.fromstring(data)
+        except _XML_SYNTAX_ERROR as e:
             logger.warning(f"XML validation failed: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+        
+        # Collect the cells of the first diagram's graph model
+        if LXML_AVAILABLE:
+            cells = root.xpath('/mxfile/diagram[1]/mxGraphModel[1]/root[1]/mxCell')
+        else:
+            cells = root.findall('diagram[1]/mxGraphModel[1]/root[1]/mxCell') if root.tag == 'mxfile' else []
+        
+        # Should have at least cells with id="0" and id="1", and every cell needs an id
+        return len(cells) >= 2 and all(cell.get('id') for cell in cells)
+
+
+async def analyze_many(requirements_list: List[dict], concurrency: int = 4) -> List[str]:
+    """Analyze several projects at once, at most `concurrency` crews in flight.
+    
+    Each project gets its own crew since a crew's task list is set per run.
+    Keep concurrency in line with OLLAMA_NUM_PARALLEL on the Ollama server.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def bounded(requirements: dict) -> str:
+        async with semaphore:
+            return await AnalysisCrew().analyze_requirements_async(requirements)
+    
+    return await asyncio.gather(*(bounded(requirements) for requirements in requirements_list))
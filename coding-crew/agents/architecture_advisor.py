@@ -1,52 +1,245 @@
 """AI architecture advisor for system design recommendations."""
 
 from crewai import Agent, Task, Crew
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, List, Optional, Union
 from loguru import logger
+from core.agent_pool import thread_agent
+from collections import Counter
+from contextlib import suppress
+from dataclasses import dataclass, field
+from functools import cached_property
+from itertools import islice
+from pathlib import Path
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Review outputs are kept on disk by prompt digest so unchanged inputs skip the LLM
+RESPONSE_CACHE_DIR = Path("coding-crew/data/architecture_cache")
+RESPONSE_CACHE_TTL = 24 * 60 * 60
+RESPONSE_CACHE_MAX_FILES = 256
+# Temp files a crashed writer left behind are swept once they are this old
+RESPONSE_TMP_MAX_AGE = 60 * 60
+
+# "Recommendation:", "Suggest" or "Should" followed by text up to the next paragraph or capitalised line
+_RECOMMENDATION_RE = re.compile(
+    r'(?:Recommendation|Suggest|Should)[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)', re.DOTALL | re.IGNORECASE
+)
+
+# Fenced JSON summary the analysis prompt asks the model to close with
+_JSON_SUMMARY_RE = re.compile(r'```json\s*(\{[\s\S]*?\})\s*```', re.IGNORECASE)
+
+# Score adjustment per occurrence of each quality indicator
+_SCORE_WEIGHTS = {
+    'good': 3, 'excellent': 5, 'well-designed': 4, 'scalable': 3,
+    'poor': -5, 'problematic': -4, 'issue': -2, 'concern': -2
+}
+
+_DESIGN_PATTERN_KEYWORDS = (
+    'singleton', 'factory', 'observer', 'strategy', 'decorator',
+    'adapter', 'facade', 'mvc', 'mvp', 'mvvm', 'repository',
+    'unit of work', 'dependency injection', 'builder'
+)
+
+_COMPONENT_KEYWORDS = (
+    'frontend', 'backend', 'database', 'api gateway', 'load balancer',
+    'cache', 'message queue', 'authentication service', 'user service',
+    'notification service', 'file storage', 'monitoring'
+)
+
+_TECH_KEYWORDS = (
+    'react', 'angular', 'vue', 'node.js', 'python', 'java',
+    'postgresql', 'mongodb', 'redis', 'nginx', 'docker',
+    'kubernetes', 'aws', 'azure', 'gcp'
+)
+
+# Lines worth surfacing as scalability suggestions or roadmap steps
+_SCALABILITY_LINE_RE = re.compile(r'scalability|scale|performance|optimization', re.IGNORECASE)
+_ROADMAP_LINE_RE = re.compile(r'phase|step|stage|milestone', re.IGNORECASE)
+
+# Words that open a refactoring task, checked as plain substrings of the lowercased line
+_REFACTORING_TASK_KEYWORDS = ('refactor', 'extract', 'improve')
+
+# Every keyword above in one alternation, longest first, so content is scanned once
+_KEYWORD_RE = re.compile('|'.join(
+    re.escape(keyword) for keyword in sorted(
+        {*_SCORE_WEIGHTS, *_DESIGN_PATTERN_KEYWORDS, *_COMPONENT_KEYWORDS, *_TECH_KEYWORDS},
+        key=len, reverse=True
+    )
+))
+
+
+def _extract_first_n_matching(content: str, pattern: re.Pattern, n: int, min_len: int) -> List[str]:
+    """Return up to n cleaned lines matching pattern and longer than min_len, stopping at the nth."""
+    cleaned = (line.strip('- *').strip() for line in content.splitlines() if pattern.search(line))
+    return list(islice((line for line in cleaned if len(line) > min_len), n))
+
+
+def _truncate_code(code_content: str, limit: int) -> str:
+    """Trim code to at most limit characters, ending on a whole line."""
+    if len(code_content) <= limit:
+        return code_content
+    cut = code_content.rfind('\n', 0, limit)
+    return code_content[:cut if cut > 0 else limit] + "\n..."
+
+
+def _recommendation(text: str) -> Dict[str, Any]:
+    """Build a recommendation entry from its text."""
+    return {
+        "title": text[:100] + "..." if len(text) > 100 else text,
+        "description": text,
+        "priority": "Medium",
+        "category": "Architecture"
+    }
+
+
+def _load_json_summary(content: str) -> Optional[Dict[str, Any]]:
+    """Return the fenced JSON summary object in content, or None if absent or malformed."""
+    match = _JSON_SUMMARY_RE.search(content)
+    if not match:
+        return None
+    try:
+        data = orjson.loads(match.group(1)) if ORJSON_AVAILABLE else json.loads(match.group(1))
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _keyword_counts(content: str) -> Counter:
+    """Count occurrences of every known keyword in a single pass over the content."""
+    return Counter(match.group() for match in _KEYWORD_RE.finditer(content.lower()))
+
+
+@dataclass
+class ArchitectureResult:
+    """Architecture analysis whose derived fields are parsed on first access.
+    
+    Supports result["field"] and get() like the plain dict analyze_architecture
+    returns; to_dict() parses everything for storing or serving the result.
+    """
+    
+    FIELDS = ("architecture_score", "recommendations", "design_patterns", "scalability_suggestions")
+    
+    analysis_content: str
+    advisor: "ArchitectureAdvisor" = field(repr=False, compare=False)
+    
+    @classmethod
+    def failed(cls, message: str, advisor: "ArchitectureAdvisor") -> "ArchitectureResult":
+        """Build a result for a failed analysis with every field empty."""
+        result = cls(message, advisor)
+        result.__dict__.update(
+            architecture_score=0, recommendations=[], design_patterns=[], scalability_suggestions=[]
+        )
+        return result
+    
+    @cached_property
+    def _summary_fields(self) -> Optional[Dict[str, Any]]:
+        """Fields from the model's JSON summary, or None to fall back to scanning the prose."""
+        summary = _load_json_summary(self.analysis_content)
+        if summary is None:
+            return None
+        try:
+            return {
+                "architecture_score": max(0, min(100, int(summary["score"]))),
+                "recommendations": [_recommendation(str(text)) for text in summary.get("recommendations", [])[:8]],
+                "design_patterns": [str(pattern) for pattern in summary.get("design_patterns", [])],
+                "scalability_suggestions": [str(line) for line in summary.get("scalability", [])[:6]]
+            }
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Ignoring malformed architecture JSON summary")
+            return None
+    
+    @cached_property
+    def _keyword_counts(self) -> Counter:
+        """Keyword counts shared by the score and design-pattern fields."""
+        return _keyword_counts(self.analysis_content)
+    
+    @cached_property
+    def architecture_score(self) -> int:
+        """Architecture quality score from 0 to 100."""
+        if self._summary_fields is not None:
+            return self._summary_fields["architecture_score"]
+        return self.advisor._calculate_architecture_score(self.analysis_content, self._keyword_counts)
+    
+    @cached_property
+    def recommendations(self) -> List[Dict[str, Any]]:
+        """Structured recommendations, at most eight."""
+        if self._summary_fields is not None:
+            return self._summary_fields["recommendations"]
+        return self.advisor._extract_recommendations(self.analysis_content)
+    
+    @cached_property
+    def design_patterns(self) -> List[str]:
+        """Recommended design patterns."""
+        if self._summary_fields is not None:
+            return self._summary_fields["design_patterns"]
+        return self.advisor._extract_design_patterns(self.analysis_content, self._keyword_counts)
+    
+    @cached_property
+    def scalability_suggestions(self) -> List[str]:
+        """Scalability improvement suggestions, at most six."""
+        if self._summary_fields is not None:
+            return self._summary_fields["scalability_suggestions"]
+        return self.advisor._extract_scalability_suggestions(self.analysis_content)
+    
+    def __getitem__(self, key: str) -> Any:
+        """Return a field by name, parsing it if needed."""
+        if key != "analysis_content" and key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a field by name, or default if it is not one."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the analysis with every field parsed."""
+        return {"analysis_content": self.analysis_content, **{name: getattr(self, name) for name in self.FIELDS}}
 
 
 class ArchitectureAdvisor:
     """AI agent for system architecture analysis and recommendations."""
     
     def __init__(self):
-        from core.llm_config import get_analysis_llm
+        from core.llm_config import get_analysis_llm, prewarm_llm
         self.llm = get_analysis_llm()
-        self.crew = self._create_crew()
+        prewarm_llm(self.llm)
+        self.cache_dir = RESPONSE_CACHE_DIR
     
-    def _create_crew(self) -> Crew:
-        """Create architecture advisory crew."""
-        
-        architect = Agent(
+    def _create_architect(self) -> Agent:
+        """Return this thread's architect agent on the shared LLM client."""
+        return thread_agent("architect", self.llm, lambda: Agent(
             role="Senior Software Architect",
             goal="Analyze system architecture and provide expert recommendations for scalability, maintainability, and best practices",
             backstory="You are a distinguished software architect with 20+ years of experience designing large-scale systems, microservices, and distributed architectures across various industries.",
             llm=self.llm,
             verbose=True
-        )
-        
-        return Crew(
-            agents=[architect],
-            tasks=[],
-            verbose=True
-        )
+        ))
     
-    def analyze_architecture(self, code_content: str, requirements: Dict[str, Any], tech_stack: List[str]) -> Dict[str, Any]:
-        """Analyze current architecture and provide recommendations."""
+    def analyze_architecture(self, code_content: str, requirements: Dict[str, Any], tech_stack: List[str],
+                             lazy: bool = False) -> Union[Dict[str, Any], ArchitectureResult]:
+        """Analyze current architecture and provide recommendations.
+        
+        With lazy=True an ArchitectureResult is returned and each derived field
+        is only parsed when read, for callers that just need analysis_content.
+        """
         try:
             analysis_task = Task(
                 description=f"""
-                Analyze the system architecture based on the following information:
-                
-                Technology Stack: {', '.join(tech_stack)}
-                
-                Requirements:
-                - Project: {requirements.get('project_name', 'Unknown')}
-                - Scale: {requirements.get('scale', 'Medium')}
-                - Target Users: {requirements.get('target_users', 'General')}
-                - Features: {requirements.get('features', [])}
-                
-                Current Code Structure:
-                {code_content[:3000]}...
+                Analyze the system architecture described at the end of this task.
                 
                 Provide comprehensive architecture analysis:
                 
@@ -87,46 +280,40 @@ class ArchitectureAdvisor:
                    - Performance optimization opportunities
                 
                 Provide specific, actionable recommendations with implementation priorities.
+                
+                End with a ```json fenced block summarising the analysis as:
+                {{"score": <0-100>, "recommendations": ["..."], "design_patterns": ["..."], "scalability": ["..."]}}
+                
+                Technology Stack: {', '.join(tech_stack)}
+                
+                Requirements:
+                - Project: {requirements.get('project_name', 'Unknown')}
+                - Scale: {requirements.get('scale', 'Medium')}
+                - Target Users: {requirements.get('target_users', 'General')}
+                - Features: {requirements.get('features', [])}
+                
+                Current Code Structure:
+                {_truncate_code(code_content, 3000)}
                 """,
-                agent=self.crew.agents[0],
                 expected_output="Comprehensive architecture analysis with specific recommendations"
             )
             
-            self.crew.tasks = [analysis_task]
-            result = self.crew.kickoff()
-            
-            analysis_content = str(result)
+            analysis_content = self._kickoff(analysis_task)
             
-            return {
-                "analysis_content": analysis_content,
-                "architecture_score": self._calculate_architecture_score(analysis_content),
-                "recommendations": self._extract_recommendations(analysis_content),
-                "design_patterns": self._extract_design_patterns(analysis_content),
-                "scalability_suggestions": self._extract_scalability_suggestions(analysis_content)
-            }
+            result = ArchitectureResult(analysis_content, self)
+            return result if lazy else result.to_dict()
             
         except Exception as e:
-            logger.error(f"Architecture analysis failed: {e}")
-            return {
-                "analysis_content": f"Architecture analysis failed: {str(e)}",
-                "architecture_score": 0,
-                "recommendations": [],
-                "design_patterns": [],
-                "scalability_suggestions": []
-            }
+            logger.opt(exception=True).error("Architecture analysis failed")
+            result = ArchitectureResult.failed(f"Architecture analysis failed: {str(e)}", self)
+            return result if lazy else result.to_dict()
     
     def suggest_refactoring(self, code_content: str, architecture_issues: List[str]) -> Dict[str, Any]:
         """Suggest specific refactoring strategies."""
         try:
             refactoring_task = Task(
                 description=f"""
-                Analyze the following code for refactoring opportunities:
-                
-                Current Issues Identified:
-                {', '.join(architecture_issues)}
-                
-                Code:
-                {code_content[:2000]}...
+                Analyze the code at the end of this task for refactoring opportunities.
                 
                 Provide specific refactoring recommendations:
                 
@@ -160,21 +347,25 @@ class ArchitectureAdvisor:
                 - Implementation steps
                 - Expected benefits
                 - Risk assessment and mitigation
+                
+                Current Issues Identified:
+                {', '.join(architecture_issues)}
+                
+                Code:
+                {_truncate_code(code_content, 2000)}
                 """,
-                agent=self.crew.agents[0],
                 expected_output="Detailed refactoring recommendations with implementation guidance"
             )
             
-            self.crew.tasks = [refactoring_task]
-            result = self.crew.kickoff()
+            refactoring_content = self._kickoff(refactoring_task)
             
             return {
-                "refactoring_content": str(result),
-                "refactoring_tasks": self._extract_refactoring_tasks(str(result))
+                "refactoring_content": refactoring_content,
+                "refactoring_tasks": self._extract_refactoring_tasks(refactoring_content)
             }
             
         except Exception as e:
-            logger.error(f"Refactoring analysis failed: {e}")
+            logger.opt(exception=True).error("Refactoring analysis failed")
             return {
                 "refactoring_content": f"Refactoring analysis failed: {str(e)}",
                 "refactoring_tasks": []
@@ -185,15 +376,7 @@ class ArchitectureAdvisor:
         try:
             design_task = Task(
                 description=f"""
-                Design an optimal system architecture based on these requirements:
-                
-                Project Requirements:
-                - Name: {requirements.get('project_name', 'Unknown')}
-                - Description: {requirements.get('description', '')}
-                - Scale: {requirements.get('scale', 'Medium')}
-                - Target Users: {requirements.get('target_users', 'General')}
-                - Features: {requirements.get('features', [])}
-                - Constraints: {requirements.get('constraints', '')}
+                Design an optimal system architecture for the requirements at the end of this task.
                 
                 Design a comprehensive system architecture including:
                 
@@ -228,23 +411,31 @@ class ArchitectureAdvisor:
                    - Message queue and communication patterns
                 
                 Provide detailed architecture diagrams in text format and implementation roadmap.
+                
+                Project Requirements:
+                - Name: {requirements.get('project_name', 'Unknown')}
+                - Description: {requirements.get('description', '')}
+                - Scale: {requirements.get('scale', 'Medium')}
+                - Target Users: {requirements.get('target_users', 'General')}
+                - Features: {requirements.get('features', [])}
+                - Constraints: {requirements.get('constraints', '')}
                 """,
-                agent=self.crew.agents[0],
                 expected_output="Complete system architecture design with implementation guidance"
             )
             
-            self.crew.tasks = [design_task]
-            result = self.crew.kickoff()
+            design_content = self._kickoff(design_task)
+            
+            keyword_counts = _keyword_counts(design_content)
             
             return {
-                "architecture_design": str(result),
-                "components": self._extract_components(str(result)),
-                "tech_recommendations": self._extract_tech_recommendations(str(result)),
-                "implementation_roadmap": self._extract_roadmap(str(result))
+                "architecture_design": design_content,
+                "components": self._extract_components(design_content, keyword_counts),
+                "tech_recommendations": self._extract_tech_recommendations(design_content, keyword_counts),
+                "implementation_roadmap": self._extract_roadmap(design_content)
             }
             
         except Exception as e:
-            logger.error(f"Architecture design failed: {e}")
+            logger.opt(exception=True).error("Architecture design failed")
             return {
                 "architecture_design": f"Architecture design failed: {str(e)}",
                 "components": [],
@@ -252,82 +443,139 @@ class ArchitectureAdvisor:
                 "implementation_roadmap": []
             }
     
-    def _calculate_architecture_score(self, analysis_content: str) -> int:
+    async def run_all(self, code_content: str, requirements: Dict[str, Any], tech_stack: List[str],
+                      architecture_issues: List[str],
+                      on_review: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Dict[str, Any]]:
+        """Run architecture analysis, refactoring and design reviews concurrently.
+        
+        on_review, if given, receives each review's name and result as soon as
+        that review finishes rather than when the slowest one does.
+        """
+        async def run(name: str, method: Callable[..., Dict[str, Any]], *args) -> Dict[str, Any]:
+            result = await asyncio.to_thread(method, *args)
+            if on_review:
+                on_review(name, result)
+            return result
+        
+        analysis, refactoring, design = await asyncio.gather(
+            run("architecture_analysis", self.analyze_architecture, code_content, requirements, tech_stack),
+            run("refactoring_suggestions", self.suggest_refactoring, code_content, architecture_issues),
+            run("architecture_design", self.design_system_architecture, requirements)
+        )
+        return {
+            "architecture_analysis": analysis,
+            "refactoring_suggestions": refactoring,
+            "architecture_design": design
+        }
+    
+    async def analyze_architectures(self, items: List[Dict[str, Any]], concurrency: int = 4) -> List[Dict[str, Any]]:
+        """Analyze several codebases at once, at most `concurrency` reviews in flight.
+        
+        Each item holds the keyword arguments analyze_architecture takes. Keep
+        concurrency in line with OLLAMA_NUM_PARALLEL so the server can batch the prompts.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def bounded(item: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await asyncio.to_thread(self.analyze_architecture, **item)
+        
+        return await asyncio.gather(*(bounded(item) for item in items))
+    
+    def _kickoff(self, task: Task) -> str:
+        """Run a task in its own crew, reusing a cached response while it is fresh."""
+        prompt = f"{getattr(self.llm, 'model', '')}\n{task.description}"
+        cache_file = self.cache_dir / f"{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}.txt"
+        try:
+            if time.time() - cache_file.stat().st_mtime < RESPONSE_CACHE_TTL:
+                return cache_file.read_text(encoding='utf-8')
+        except OSError:
+            pass
+        
+        architect = self._create_architect()
+        task.agent = architect
+        crew = Crew(agents=[architect], tasks=[task], verbose=True)
+        content = str(crew.kickoff())
+        
+        # A cache that can't be written must not fail the review that was just produced
+        try:
+            self._store_response(cache_file, content)
+        except OSError:
+            logger.opt(exception=True).warning("Could not cache architecture review")
+        return content
+    
+    def _store_response(self, cache_file: Path, content: str) -> None:
+        """Write a response beside its target and swap it in, then prune the cache."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # A unique temp file per writer so concurrent readers never see a partial file
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_name, cache_file)
+        finally:
+            with suppress(OSError):
+                os.unlink(tmp_name)
+        self._prune_cache()
+    
+    def _prune_cache(self) -> None:
+        """Drop expired responses and stale temp files, then keep the newest RESPONSE_CACHE_MAX_FILES."""
+        now = time.time()
+        responses = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                with suppress(OSError):
+                    age = now - entry.stat().st_mtime
+                    if entry.name.endswith('.tmp'):
+                        if age > RESPONSE_TMP_MAX_AGE:
+                            os.unlink(entry.path)
+                    elif age > RESPONSE_CACHE_TTL:
+                        os.unlink(entry.path)
+                    else:
+                        responses.append((age, entry.path))
+        responses.sort()
+        for _, path in responses[RESPONSE_CACHE_MAX_FILES:]:
+            with suppress(OSError):
+                os.unlink(path)
+    
+    def _calculate_architecture_score(self, analysis_content: str, keyword_counts: Optional[Counter] = None) -> int:
         """Calculate architecture quality score."""
-        content_lower = analysis_content.lower()
+        if keyword_counts is None:
+            keyword_counts = _keyword_counts(analysis_content)
         
         score = 70  # Base score
         
-        # Positive indicators
-        score += content_lower.count('good') * 3
-        score += content_lower.count('excellent') * 5
-        score += content_lower.count('well-designed') * 4
-        score += content_lower.count('scalable') * 3
-        
-        # Negative indicators
-        score -= content_lower.count('poor') * 5
-        score -= content_lower.count('problematic') * 4
-        score -= content_lower.count('issue') * 2
-        score -= content_lower.count('concern') * 2
+        # Positive indicators add to the score, negative ones subtract
+        for keyword, weight in _SCORE_WEIGHTS.items():
+            score += keyword_counts[keyword] * weight
         
         return max(0, min(100, score))
     
     def _extract_recommendations(self, analysis_content: str) -> List[Dict[str, Any]]:
         """Extract structured recommendations."""
-        import re
-        
         recommendations = []
         
-        # Look for recommendation patterns
-        patterns = [
-            r'Recommendation[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)',
-            r'Suggest[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)',
-            r'Should[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)'
-        ]
+        # Look for recommendation patterns in a single scan
+        for match in _RECOMMENDATION_RE.finditer(analysis_content):
+            text = match.group(1).strip()
+            if text:
+                recommendations.append(_recommendation(text))
+                if len(recommendations) == 8:
+                    break
         
-        for pattern in patterns:
-            matches = re.findall(pattern, analysis_content, re.DOTALL | re.IGNORECASE)
-            for match in matches:
-                if match.strip():
-                    recommendations.append({
-                        "title": match.strip()[:100] + "..." if len(match.strip()) > 100 else match.strip(),
-                        "description": match.strip(),
-                        "priority": "Medium",
-                        "category": "Architecture"
-                    })
-        
-        return recommendations[:8]
+        return recommendations
     
-    def _extract_design_patterns(self, analysis_content: str) -> List[str]:
+    def _extract_design_patterns(self, analysis_content: str, keyword_counts: Optional[Counter] = None) -> List[str]:
         """Extract recommended design patterns."""
-        patterns = []
-        content_lower = analysis_content.lower()
-        
-        pattern_keywords = [
-            'singleton', 'factory', 'observer', 'strategy', 'decorator',
-            'adapter', 'facade', 'mvc', 'mvp', 'mvvm', 'repository',
-            'unit of work', 'dependency injection', 'builder'
-        ]
+        if keyword_counts is None:
+            keyword_counts = _keyword_counts(analysis_content)
         
-        for keyword in pattern_keywords:
-            if keyword in content_lower:
-                patterns.append(keyword.title())
-        
-        return list(set(patterns))
+        # Keywords are distinct, so the matches need no de-duplication
+        return [keyword.title() for keyword in _DESIGN_PATTERN_KEYWORDS if keyword in keyword_counts]
     
     def _extract_scalability_suggestions(self, analysis_content: str) -> List[str]:
         """Extract scalability improvement suggestions."""
-        suggestions = []
-        lines = analysis_content.split('\n')
-        
-        for line in lines:
-            line_lower = line.lower()
-            if any(word in line_lower for word in ['scalability', 'scale', 'performance', 'optimization']):
-                cleaned = line.strip('- *').strip()
-                if cleaned and len(cleaned) > 20:
-                    suggestions.append(cleaned)
-        
-        return suggestions[:6]
+        return _extract_first_n_matching(analysis_content, _SCALABILITY_LINE_RE, 6, 20)
     
     def _extract_refactoring_tasks(self, refactoring_content: str) -> List[Dict[str, Any]]:
         """Extract structured refactoring tasks."""
@@ -337,7 +585,8 @@ class ArchitectureAdvisor:
         current_task = {}
         for line in lines:
             line = line.strip()
-            if 'refactor' in line.lower() or 'extract' in line.lower() or 'improve' in line.lower():
+            lowered = line.lower()
+            if any(keyword in lowered for keyword in _REFACTORING_TASK_KEYWORDS):
                 if current_task:
                     tasks.append(current_task)
                 current_task = {
@@ -354,50 +603,20 @@ class ArchitectureAdvisor:
         
         return tasks[:5]
     
-    def _extract_components(self, architecture_design: str) -> List[str]:
+    def _extract_components(self, architecture_design: str, keyword_counts: Optional[Counter] = None) -> List[str]:
         """Extract system components from architecture design."""
-        components = []
-        content_lower = architecture_design.lower()
+        if keyword_counts is None:
+            keyword_counts = _keyword_counts(architecture_design)
         
-        component_keywords = [
-            'frontend', 'backend', 'database', 'api gateway', 'load balancer',
-            'cache', 'message queue', 'authentication service', 'user service',
-            'notification service', 'file storage', 'monitoring'
-        ]
-        
-        for keyword in component_keywords:
-            if keyword in content_lower:
-                components.append(keyword.title())
-        
-        return list(set(components))
+        return [keyword.title() for keyword in _COMPONENT_KEYWORDS if keyword in keyword_counts]
     
-    def _extract_tech_recommendations(self, architecture_design: str) -> List[str]:
+    def _extract_tech_recommendations(self, architecture_design: str, keyword_counts: Optional[Counter] = None) -> List[str]:
         """Extract technology recommendations."""
-        recommendations = []
-        content_lower = architecture_design.lower()
-        
-        tech_keywords = [
-            'react', 'angular', 'vue', 'node.js', 'python', 'java',
-            'postgresql', 'mongodb', 'redis', 'nginx', 'docker',
-            'kubernetes', 'aws', 'azure', 'gcp'
-        ]
+        if keyword_counts is None:
+            keyword_counts = _keyword_counts(architecture_design)
         
-        for keyword in tech_keywords:
-            if keyword in content_lower:
-                recommendations.append(keyword.upper())
-        
-        return list(set(recommendations))
+        return [keyword.upper() for keyword in _TECH_KEYWORDS if keyword in keyword_counts]
     
     def _extract_roadmap(self, architecture_design: str) -> List[str]:
         """Extract implementation roadmap steps."""
-        roadmap = []
-        lines = architecture_design.split('\n')
-        
-        for line in lines:
-            line_lower = line.lower()
-            if any(word in line_lower for word in ['phase', 'step', 'stage', 'milestone']):
-                cleaned = line.strip('- *').strip()
-                if cleaned and len(cleaned) > 15:
-                    roadmap.append(cleaned)
-        
-        return roadmap[:6]
\ No newline at end of file
+        return _extract_first_n_matching(architecture_design, _ROADMAP_LINE_RE, 6, 15)
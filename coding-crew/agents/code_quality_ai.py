@@ -1,48 +1,29 @@
 """AI-powered code review and optimization suggestions."""
 
 from crewai import Agent, Task, Crew
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from loguru import logger
+from core.agent_pool import thread_agent
+from collections import Counter, OrderedDict
+from itertools import islice
+import copy
+import hashlib
+import json
+import re
+import threading
 
+# Completed reviews and optimization reports kept per input digest
+REVIEW_CACHE_SIZE = 64
 
-class CodeQualityAI:
-    """AI agent for automated code review and quality suggestions."""
-    
-    def __init__(self):
-        from core.llm_config import get_analysis_llm
-        self.llm = get_analysis_llm()
-        self.crew = self._create_crew()
-    
-    def _create_crew(self) -> Crew:
-        """Create code quality review crew."""
-        
-        code_reviewer = Agent(
-            role="Senior Code Reviewer",
-            goal="Analyze code for quality issues, security vulnerabilities, and optimization opportunities",
-            backstory="You are an expert code reviewer with 15+ years of experience in software engineering best practices, security, and performance optimization.",
-            llm=self.llm,
-            verbose=True
-        )
-        
-        return Crew(
-            agents=[code_reviewer],
-            tasks=[],
-            verbose=True
-        )
-    
-    def review_code(self, code_content: str, tech_stack: List[str]) -> Dict[str, Any]:
-        """Perform comprehensive code review."""
-        try:
-            review_task = Task(
-                description=f"""
-                Perform a comprehensive code review of the following code:
-                
-                Technology Stack: {', '.join(tech_stack)}
-                
-                Code to Review:
-                {code_content}
-                
-                Analyze for:
+
+def _review_key(*parts: Any) -> str:
+    """Build a stable digest of review inputs for caching."""
+    payload = json.dumps(parts, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+# Review criteria shared by single-file and multi-file review prompts
+_REVIEW_CHECKLIST = """Analyze for:
                 1. **Code Quality Issues**:
                    - Naming conventions and readability
                    - Function/class complexity
@@ -74,21 +55,108 @@ class CodeQualityAI:
                    - Configuration management
                 
                 Provide specific, actionable recommendations with code examples where applicable.
-                Format as structured analysis with severity levels (Critical, High, Medium, Low).
+                Format as structured analysis with severity levels (Critical, High, Medium, Low)."""
+
+# "## FILE: <path>" headings that open each file's section of a multi-file review
+_FILE_SECTION_RE = re.compile(r'^#+\s*FILE:\s*(.+?)\s*$', re.MULTILINE)
+
+# Text after a severity label, up to the next label
+_ISSUE_RE = re.compile(
+    r'(Critical|High|Medium|Low)[:\s]+(.*?)(?=Critical|High|Medium|Low|$)', re.DOTALL | re.IGNORECASE
+)
+_SEVERITY_RANK = {'Critical': 0, 'High': 1, 'Medium': 2, 'Low': 3}
+
+# Score adjustment per mention of each severity or praise word
+_SCORE_WEIGHTS = {
+    'critical': -20, 'high': -10, 'medium': -5, 'low': -2,
+    'good': 2, 'excellent': 3, 'well': 1
+}
+_SCORE_WORD_RE = re.compile(r'\b(?:%s)\b' % '|'.join(_SCORE_WEIGHTS), re.IGNORECASE)
+
+# "Recommendation:", "Suggest" or "Should" followed by text up to the next paragraph or capitalised line
+_RECOMMENDATION_RE = re.compile(
+    r'(?:Recommendation|Suggest|Should)[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)', re.DOTALL | re.IGNORECASE
+)
+
+# Optimization report line markers, matched in place instead of lowercasing every line
+_OPTIMIZATION_TITLE_RE = re.compile(r'optimization|improvement', re.IGNORECASE)
+_COMPLEXITY_RE = re.compile(r'(low|high) complexity', re.IGNORECASE)
+
+
+class CodeQualityAI:
+    """AI agent for automated code review and quality suggestions."""
+    
+    _review_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    _review_cache_lock = threading.Lock()
+    
+    def __init__(self):
+        from core.llm_config import get_analysis_llm
+        self.llm = get_analysis_llm()
+    
+    def _create_reviewer(self) -> Agent:
+        """Return this thread's code reviewer agent on the shared LLM client."""
+        return thread_agent("code_reviewer", self.llm, lambda: Agent(
+            role="Senior Code Reviewer",
+            goal="Analyze code for quality issues, security vulnerabilities, and optimization opportunities",
+            backstory="You are an expert code reviewer with 15+ years of experience in software engineering best practices, security, and performance optimization.",
+            llm=self.llm,
+            verbose=True
+        ))
+    
+    def _kickoff(self, task: Task) -> str:
+        """Run a task in its own single-task crew."""
+        reviewer = self._create_reviewer()
+        task.agent = reviewer
+        crew = Crew(agents=[reviewer], tasks=[task], verbose=True)
+        return str(crew.kickoff())
+    
+    def _cached(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return a deep copy of a cached result, marking it recently used."""
+        with self._review_cache_lock:
+            cached = self._review_cache.get(cache_key)
+            if cached is None:
+                return None
+            self._review_cache.move_to_end(cache_key)
+        return copy.deepcopy(cached)
+    
+    def _store(self, cache_key: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Cache a successful result, evicting the least recently used beyond REVIEW_CACHE_SIZE."""
+        snapshot = copy.deepcopy(result)
+        with self._review_cache_lock:
+            self._review_cache[cache_key] = snapshot
+            if len(self._review_cache) > REVIEW_CACHE_SIZE:
+                self._review_cache.popitem(last=False)
+        return result
+    
+    def review_code(self, code_content: str, tech_stack: List[str], force: bool = False) -> Dict[str, Any]:
+        """Perform comprehensive code review.
+        
+        Reviews of unchanged code and tech stack are served from cache unless force is set.
+        """
+        cache_key = _review_key("review", getattr(self.llm, 'model', ''), code_content, sorted(tech_stack))
+        cached = None if force else self._cached(cache_key)
+        if cached is not None:
+            logger.info("Returning cached code review for unchanged code")
+            return cached
+        
+        try:
+            review_task = Task(
+                description=f"""
+                Perform a comprehensive code review of the following code:
+                
+                Technology Stack: {', '.join(tech_stack)}
+                
+                Code to Review:
+                {code_content}
+                
+                {_REVIEW_CHECKLIST}
                 """,
-                agent=self.crew.agents[0],
                 expected_output="Detailed code quality analysis with specific recommendations"
             )
             
-            self.crew.tasks = [review_task]
-            result = self.crew.kickoff()
+            review_content = self._kickoff(review_task)
             
-            return {
-                "review_content": str(result),
-                "issues_found": self._extract_issues(str(result)),
-                "recommendations": self._extract_recommendations(str(result)),
-                "quality_score": self._calculate_quality_score(str(result))
-            }
+            return self._store(cache_key, self._review_result(review_content))
             
         except Exception as e:
             logger.error(f"Code quality review failed: {e}")
@@ -99,8 +167,59 @@ class CodeQualityAI:
                 "quality_score": 0
             }
     
-    def suggest_optimizations(self, code_content: str, performance_metrics: Dict[str, Any]) -> Dict[str, Any]:
-        """Suggest specific code optimizations based on performance data."""
+    def review_codebase(self, files: Dict[str, str], tech_stack: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Review several files in a single crew run, returning each file's review by path.
+        
+        The agent is asked to open each file's review with a "## FILE: <path>"
+        heading; files it leaves out get an empty review with a zero score.
+        """
+        try:
+            code_blocks = ''.join(f"\n\n=== FILE: {path} ===\n{code}" for path, code in files.items())
+            review_task = Task(
+                description=f"""
+                Perform a comprehensive code review of each of the following files:
+                
+                Technology Stack: {', '.join(tech_stack)}
+                
+                Files to Review:{code_blocks}
+                
+                {_REVIEW_CHECKLIST}
+                Start each file's review with a line "## FILE: <path>" and review every file listed.
+                """,
+                expected_output="Code quality analysis for each file under its own FILE heading"
+            )
+            
+            sections = self._split_file_sections(self._kickoff(review_task))
+            
+        except Exception as e:
+            logger.error(f"Codebase review failed: {e}")
+            sections = {}
+            missing = f"Code review failed: {str(e)}"
+        else:
+            missing = "No review returned for this file"
+        
+        return {
+            path: self._review_result(sections[path]) if path in sections else {
+                "review_content": missing,
+                "issues_found": [],
+                "recommendations": [],
+                "quality_score": 0
+            }
+            for path in files
+        }
+    
+    def suggest_optimizations(self, code_content: str, performance_metrics: Dict[str, Any],
+                              force: bool = False) -> Dict[str, Any]:
+        """Suggest specific code optimizations based on performance data.
+        
+        Suggestions for unchanged code and metrics are served from cache unless force is set.
+        """
+        cache_key = _review_key("optimize", getattr(self.llm, 'model', ''), code_content, performance_metrics)
+        cached = None if force else self._cached(cache_key)
+        if cached is not None:
+            logger.info("Returning cached optimizations for unchanged code")
+            return cached
+        
         try:
             optimization_task = Task(
                 description=f"""
@@ -125,17 +244,15 @@ class CodeQualityAI:
                 - Expected performance improvement
                 - Implementation complexity (Low/Medium/High)
                 """,
-                agent=self.crew.agents[0],
                 expected_output="Specific performance optimization recommendations"
             )
             
-            self.crew.tasks = [optimization_task]
-            result = self.crew.kickoff()
+            optimization_content = self._kickoff(optimization_task)
             
-            return {
-                "optimization_content": str(result),
-                "optimizations": self._extract_optimizations(str(result))
-            }
+            return self._store(cache_key, {
+                "optimization_content": optimization_content,
+                "optimizations": self._extract_optimizations(optimization_content)
+            })
             
         except Exception as e:
             logger.error(f"Code optimization analysis failed: {e}")
@@ -144,94 +261,86 @@ class CodeQualityAI:
                 "optimizations": []
             }
     
+    def _review_result(self, review_content: str) -> Dict[str, Any]:
+        """Build the structured review for one piece of review text."""
+        return {
+            "review_content": review_content,
+            "issues_found": self._extract_issues(review_content),
+            "recommendations": self._extract_recommendations(review_content),
+            "quality_score": self._calculate_quality_score(review_content)
+        }
+    
+    def _split_file_sections(self, review_content: str) -> Dict[str, str]:
+        """Split a multi-file review into its sections, keyed by the path in each FILE heading."""
+        headings = list(_FILE_SECTION_RE.finditer(review_content))
+        ends = [heading.start() for heading in headings[1:]] + [len(review_content)]
+        return {
+            heading.group(1).strip('`*\'" '): review_content[heading.end():end].strip()
+            for heading, end in zip(headings, ends)
+        }
+    
     def _extract_issues(self, review_content: str) -> List[Dict[str, Any]]:
         """Extract structured issues from review content."""
-        import re
-        
         issues = []
-        # Look for severity patterns
-        severity_patterns = [
-            (r'Critical[:\s]+(.*?)(?=High|Medium|Low|$)', 'Critical'),
-            (r'High[:\s]+(.*?)(?=Critical|Medium|Low|$)', 'High'),
-            (r'Medium[:\s]+(.*?)(?=Critical|High|Low|$)', 'Medium'),
-            (r'Low[:\s]+(.*?)(?=Critical|High|Medium|$)', 'Low')
-        ]
-        
-        for pattern, severity in severity_patterns:
-            matches = re.findall(pattern, review_content, re.DOTALL | re.IGNORECASE)
-            for match in matches:
-                if match.strip():
-                    issues.append({
-                        "severity": severity,
-                        "description": match.strip()[:200] + "..." if len(match.strip()) > 200 else match.strip(),
-                        "category": "code_quality"
-                    })
+        # One scan finds every severity section in text order
+        for match in _ISSUE_RE.finditer(review_content):
+            text = match.group(2).strip()
+            if text:
+                issues.append({
+                    "severity": match.group(1).title(),
+                    "description": text[:200] + "..." if len(text) > 200 else text,
+                    "category": "code_quality"
+                })
         
+        # Most severe first; sort is stable so text order holds within a severity
+        issues.sort(key=lambda issue: _SEVERITY_RANK[issue["severity"]])
         return issues[:10]  # Limit to top 10 issues
     
     def _extract_recommendations(self, review_content: str) -> List[str]:
         """Extract actionable recommendations."""
-        import re
-        
-        # Look for recommendation patterns
-        rec_patterns = [
-            r'Recommendation[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)',
-            r'Suggest[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)',
-            r'Should[:\s]+(.*?)(?=\n\n|\n[A-Z]|$)'
-        ]
-        
-        recommendations = []
-        for pattern in rec_patterns:
-            matches = re.findall(pattern, review_content, re.DOTALL | re.IGNORECASE)
-            recommendations.extend([match.strip() for match in matches if match.strip()])
-        
-        return recommendations[:5]  # Top 5 recommendations
+        # Look for recommendation patterns, stopping at the fifth
+        texts = (match.group(1).strip() for match in _RECOMMENDATION_RE.finditer(review_content))
+        return list(islice((text for text in texts if text), 5))
     
     def _extract_optimizations(self, optimization_content: str) -> List[Dict[str, Any]]:
         """Extract structured optimizations."""
-        import re
-        
         optimizations = []
         # Simple pattern matching for optimization suggestions
         lines = optimization_content.split('\n')
         current_opt = {}
+        description_parts = []
         
         for line in lines:
             line = line.strip()
-            if 'optimization' in line.lower() or 'improvement' in line.lower():
+            if _OPTIMIZATION_TITLE_RE.search(line):
                 if current_opt:
+                    current_opt["description"] = " ".join(description_parts)
                     optimizations.append(current_opt)
                 current_opt = {
                     "title": line,
                     "description": "",
                     "complexity": "Medium"
                 }
+                description_parts = []
             elif current_opt and line:
-                current_opt["description"] += line + " "
-                if 'low complexity' in line.lower():
-                    current_opt["complexity"] = "Low"
-                elif 'high complexity' in line.lower():
-                    current_opt["complexity"] = "High"
+                description_parts.append(line)
+                complexity = _COMPLEXITY_RE.search(line)
+                if complexity:
+                    current_opt["complexity"] = complexity.group(1).capitalize()
         
         if current_opt:
+            current_opt["description"] = " ".join(description_parts)
             optimizations.append(current_opt)
         
         return optimizations[:5]  # Top 5 optimizations
     
     def _calculate_quality_score(self, review_content: str) -> int:
         """Calculate overall code quality score (0-100)."""
-        content_lower = review_content.lower()
+        counts = Counter(word.lower() for word in _SCORE_WORD_RE.findall(review_content))
         
-        # Deduct points for issues
+        # Issues deduct points, good practices mentioned add them
         score = 100
-        score -= content_lower.count('critical') * 20
-        score -= content_lower.count('high') * 10
-        score -= content_lower.count('medium') * 5
-        score -= content_lower.count('low') * 2
-        
-        # Add points for good practices mentioned
-        score += content_lower.count('good') * 2
-        score += content_lower.count('excellent') * 3
-        score += content_lower.count('well') * 1
+        for word, weight in _SCORE_WEIGHTS.items():
+            score += counts[word] * weight
         
         return max(0, min(100, score))
\ No newline at end of file
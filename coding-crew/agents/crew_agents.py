@@ -4,96 +4,109 @@ import os
 from crewai import Agent
 from core.llm_config import get_analysis_llm, get_coding_llm, get_review_llm, get_testing_llm, get_documentation_llm
 
-# Configure environment for CrewAI + Ollama
-os.environ["OPENAI_API_KEY"] = "sk-fake-key-for-ollama"
-os.environ["OLLAMA_BASE_URL"] = "http://localhost:11434"
+# Configure environment for CrewAI + Ollama, keeping any values the deployment already set
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake-key-for-ollama")
+os.environ.setdefault("OLLAMA_BASE_URL", "http://localhost:11434")
 
 
-def create_analysis_agent() -> Agent:
-    """Create analysis agent for requirements parsing and architecture design."""
-    return Agent(
-        role='Requirements Analyst & System Architect',
-        goal='Parse markdown requirements and create comprehensive system architecture with aesthetic diagrams',
-        backstory="""You are an expert system architect with 15+ years of experience in software design.
+# Role, goal, backstory, LLM accessor and iteration limit for each agent
+_AGENT_SPECS = {
+    'analysis': (
+        'Requirements Analyst & System Architect',
+        'Parse markdown requirements and create comprehensive system architecture with aesthetic diagrams',
+        """You are an expert system architect with 15+ years of experience in software design.
         You excel at understanding complex requirements and translating them into clear, actionable system designs.
         You create beautiful, professional diagrams that stakeholders love to review.""",
-        verbose=True,
-        allow_delegation=False,
-        llm=get_analysis_llm(),
-        max_iter=5
+        get_analysis_llm,
+        5
+    ),
+    'architecture_review': (
+        'Senior Architecture Reviewer',
+        'Review system architecture and provide constructive feedback for improvements',
+        """You are a senior technical architect who specializes in reviewing system designs.
+        You have a keen eye for potential issues, scalability concerns, and design improvements.
+        You provide clear, actionable feedback that helps create robust, maintainable systems.""",
+        get_review_llm,
+        5
+    ),
+    'coding': (
+        'Senior Software Developer',
+        'Generate high-quality, well-structured code based on approved architecture designs',
+        """You are a senior software developer with expertise in multiple programming languages.
+        You write clean, maintainable code following best practices and design patterns.
+        You pay attention to performance, security, and code quality standards.""",
+        get_coding_llm,
+        5
+    ),
+    'code_review': (
+        'Code Quality Specialist',
+        'Review code for quality, security, performance, and maintainability issues',
+        """You are a code quality specialist who ensures all code meets high standards.
+        You identify potential bugs, security vulnerabilities, performance issues, and maintainability concerns.
+        You provide specific, actionable feedback to improve code quality.""",
+        get_review_llm,
+        5
+    ),
+    'unit_test': (
+        'Test Automation Specialist',
+        'Generate comprehensive unit tests and identify code issues through testing',
+        """You are a test automation specialist who creates thorough test suites.
+        You understand testing best practices, edge cases, and how to achieve high code coverage.
+        You write clear, maintainable tests that catch bugs and ensure code reliability.""",
+        get_testing_llm,
+        5
+    ),
+    'documentation': (
+        'Technical Documentation Specialist',
+        'Create comprehensive, clear documentation for the entire system',
+        """You are a technical writer who creates excellent documentation.
+        You understand how to explain complex technical concepts clearly and create documentation
+        that helps developers, users, and stakeholders understand and use the system effectively.""",
+        get_documentation_llm,
+        1
     )
+}
 
 
-def create_architecture_review_agent() -> Agent:
-    """Create architecture review agent for reviewing and refining designs."""
+def _build_agent(name: str) -> Agent:
+    """Build the named agent from its spec; get_llm already shares one client per model."""
+    role, goal, backstory, get_agent_llm, max_iter = _AGENT_SPECS[name]
     return Agent(
-        role='Senior Architecture Reviewer',
-        goal='Review system architecture and provide constructive feedback for improvements',
-        backstory="""You are a senior technical architect who specializes in reviewing system designs.
-        You have a keen eye for potential issues, scalability concerns, and design improvements.
-        You provide clear, actionable feedback that helps create robust, maintainable systems.""",
+        role=role,
+        goal=goal,
+        backstory=backstory,
         verbose=True,
         allow_delegation=False,
-        llm=get_review_llm(),
-        max_iter=5
+        llm=get_agent_llm(),
+        max_iter=max_iter
     )
 
 
+def create_analysis_agent() -> Agent:
+    """Create analysis agent for requirements parsing and architecture design."""
+    return _build_agent('analysis')
+
+
+def create_architecture_review_agent() -> Agent:
+    """Create architecture review agent for reviewing and refining designs."""
+    return _build_agent('architecture_review')
+
+
 def create_coding_agent() -> Agent:
     """Create coding agent for generating code from architecture."""
-    return Agent(
-        role='Senior Software Developer',
-        goal='Generate high-quality, well-structured code based on approved architecture designs',
-        backstory="""You are a senior software developer with expertise in multiple programming languages.
-        You write clean, maintainable code following best practices and design patterns.
-        You pay attention to performance, security, and code quality standards.""",
-        verbose=True,
-        allow_delegation=False,
-        llm=get_coding_llm(),
-        max_iter=5
-    )
+    return _build_agent('coding')
 
 
 def create_code_review_agent() -> Agent:
     """Create code review agent for reviewing and improving code quality."""
-    return Agent(
-        role='Code Quality Specialist',
-        goal='Review code for quality, security, performance, and maintainability issues',
-        backstory="""You are a code quality specialist who ensures all code meets high standards.
-        You identify potential bugs, security vulnerabilities, performance issues, and maintainability concerns.
-        You provide specific, actionable feedback to improve code quality.""",
-        verbose=True,
-        allow_delegation=False,
-        llm=get_review_llm(),
-        max_iter=5
-    )
+    return _build_agent('code_review')
 
 
 def create_unit_test_agent() -> Agent:
     """Create unit test agent for generating comprehensive test cases."""
-    return Agent(
-        role='Test Automation Specialist',
-        goal='Generate comprehensive unit tests and identify code issues through testing',
-        backstory="""You are a test automation specialist who creates thorough test suites.
-        You understand testing best practices, edge cases, and how to achieve high code coverage.
-        You write clear, maintainable tests that catch bugs and ensure code reliability.""",
-        verbose=True,
-        allow_delegation=False,
-        llm=get_testing_llm(),
-        max_iter=5
-    )
+    return _build_agent('unit_test')
 
 
 def create_documentation_agent() -> Agent:
     """Create documentation agent for generating comprehensive documentation."""
-    return Agent(
-        role='Technical Documentation Specialist',
-        goal='Create comprehensive, clear documentation for the entire system',
-        backstory="""You are a technical writer who creates excellent documentation.
-        You understand how to explain complex technical concepts clearly and create documentation
-        that helps developers, users, and stakeholders understand and use the system effectively.""",
-        verbose=True,
-        allow_delegation=False,
-        llm=get_documentation_llm(),
-        max_iter=1
-    )
\ No newline at end of file
+    return _build_agent('documentation')
@@ -3,13 +3,55 @@
 import json
 import re
 import traceback
-from typing import Dict, List, Optional, Any
-from crewai import Agent, Task, Crew
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
+from crewai import Agent, Task, Crew, Process
 from langchain_ollama import ChatOllama
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Python traceback frame: File "<path>", line <n>
+_TRACE_RE = re.compile(r'File "([^"]+)", line (\d+)')
+
+# First log line carrying an "...Error:" or "...Exception:" marker
+_ERROR_LINE_RE = re.compile(r'^.*(?:Error|Exception):.*$', re.MULTILINE)
+
+# Fixed opening of every error-analysis prompt; only the error details after it vary
+_ANALYSIS_INSTRUCTIONS = """
+            Analyze the error below and provide debugging assistance.
+            
+            Provide:
+            1. Root cause analysis
+            2. Specific fix suggestions
+            3. Prevention strategies
+            4. Related code improvements
+            
+            Format as JSON with keys: root_cause, fix_suggestions, prevention, improvements
+            """
+
+@lru_cache(maxsize=4)
+def _get_llm(model_name: str) -> ChatOllama:
+    """Return the shared Ollama client for model_name so assistants reuse its connections."""
+    return ChatOllama(model=model_name, temperature=0.1)
+
+@lru_cache(maxsize=64)
+def _line_offsets(text: str) -> Tuple[int, ...]:
+    """Start offset of each line in text, followed by len(text) + 1 so line i ends at offsets[i + 1] - 1."""
+    offsets = [0]
+    index = text.find('\n')
+    while index != -1:
+        offsets.append(index + 1)
+        index = text.find('\n', index + 1)
+    offsets.append(len(text) + 1)
+    return tuple(offsets)
+
 class DebuggingAssistant:
     def __init__(self, model_name: str = "llama3.1:8b"):
-        self.llm = ChatOllama(model=model_name, temperature=0.1)
+        self.llm = _get_llm(model_name)
         self.agent = Agent(
             role="AI Debugging Specialist",
             goal="Analyze errors, interpret stack traces, and provide intelligent fix suggestions",
@@ -20,57 +62,64 @@ class DebuggingAssistant:
 
     def analyze_error(self, error_info: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze error and provide intelligent debugging suggestions."""
-        task = Task(
-            description=f"""
-            Analyze this error and provide debugging assistance:
-            
+        return self.analyze_errors_batch([error_info])[0]
+
+    def analyze_errors_batch(self, error_infos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Analyze several errors in one crew run, returning an analysis per error in order."""
+        if not error_infos:
+            return []
+        
+        # context=[] keeps each analysis from being fed the previous errors' outputs
+        tasks = [
+            Task(
+                description=f"""{_ANALYSIS_INSTRUCTIONS}
             Error Type: {error_info.get('error_type', 'Unknown')}
             Error Message: {error_info.get('error_message', '')}
             Stack Trace: {error_info.get('stack_trace', '')}
             Code Context: {error_info.get('code_context', '')}
             File Path: {error_info.get('file_path', '')}
-            
-            Provide:
-            1. Root cause analysis
-            2. Specific fix suggestions
-            3. Prevention strategies
-            4. Related code improvements
-            
-            Format as JSON with keys: root_cause, fix_suggestions, prevention, improvements
             """,
-            agent=self.agent,
-            expected_output="JSON analysis with debugging recommendations"
-        )
+                agent=self.agent,
+                expected_output="JSON analysis with debugging recommendations",
+                context=[]
+            )
+            for error_info in error_infos
+        ]
         
-        crew = Crew(agents=[self.agent], tasks=[task])
+        crew = Crew(agents=[self.agent], tasks=tasks, process=Process.sequential)
         result = crew.kickoff()
         
+        return [self._parse_analysis(output.raw) for output in result.tasks_output]
+
+    def _parse_analysis(self, output: str) -> Dict[str, Any]:
+        """Parse an analysis task's JSON output, wrapping free text if it isn't JSON."""
         try:
-            return json.loads(str(result))
+            return orjson.loads(output) if ORJSON_AVAILABLE else json.loads(output)
         except:
             return {
                 "root_cause": "Error analysis completed",
-                "fix_suggestions": [str(result)],
+                "fix_suggestions": [output],
                 "prevention": ["Review code patterns"],
                 "improvements": ["Apply suggested fixes"]
             }
 
     def interpret_stack_trace(self, stack_trace: str, code_files: Dict[str, str]) -> Dict[str, Any]:
         """Interpret stack trace with code context."""
-        # Extract file paths and line numbers from stack trace
-        trace_pattern = r'File "([^"]+)", line (\d+)'
-        matches = re.findall(trace_pattern, stack_trace)
+        # Extract file paths and line numbers from stack trace; non-Python traces have no frames to match
+        matches = _TRACE_RE.findall(stack_trace) if 'File "' in stack_trace else []
         
         context_info = []
         for file_path, line_num in matches:
             if file_path in code_files:
-                lines = code_files[file_path].split('\n')
+                text = code_files[file_path]
+                offsets = _line_offsets(text)
                 line_idx = int(line_num) - 1
                 
-                # Get context around error line
+                # Get context around error line: slice those lines out as one block, then number them
                 start = max(0, line_idx - 3)
-                end = min(len(lines), line_idx + 4)
-                context = '\n'.join(f"{i+1}: {lines[i]}" for i in range(start, end))
+                end = min(len(offsets) - 1, line_idx + 4)
+                block = text[offsets[start]:offsets[end] - 1] if start < end else ''
+                context = '\n'.join(map('{}: {}'.format, range(start + 1, end + 1), block.split('\n')))
                 
                 context_info.append({
                     "file": file_path,
@@ -108,31 +157,31 @@ class DebuggingAssistant:
         )
         
         crew = Crew(agents=[self.agent], tasks=[task])
-        result = crew.kickoff()
+        content = str(crew.kickoff())
         
         try:
-            return json.loads(str(result))
+            return orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
         except:
             return [{
                 "description": "Apply suggested fix",
                 "fixed_code": code_snippet,
-                "explanation": str(result)
+                "explanation": content
             }]
 
     def debug_workflow(self, project_path: str, error_log: str) -> Dict[str, Any]:
         """Complete debugging workflow for a project."""
-        # Parse error log
-        lines = error_log.strip().split('\n')
+        # Parse error log: the first marker line gives the error, everything above it the trace
+        log = error_log.strip()
         error_type = "Runtime Error"
         error_message = ""
         stack_trace = ""
         
-        for i, line in enumerate(lines):
-            if "Error:" in line or "Exception:" in line:
-                error_type = line.split(':')[0].strip()
-                error_message = ':'.join(line.split(':')[1:]).strip()
-                stack_trace = '\n'.join(lines[:i])
-                break
+        match = _ERROR_LINE_RE.search(log)
+        if match:
+            error_type, _, error_message = match.group().partition(':')
+            error_type = error_type.strip()
+            error_message = error_message.strip()
+            stack_trace = log[:max(match.start() - 1, 0)]
         
         # Analyze and provide comprehensive debugging assistance
         analysis = self.analyze_error({
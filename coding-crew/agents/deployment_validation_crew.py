@@ -1,20 +1,209 @@
 """Deployment validation crew for testing actual project execution."""
 
+import asyncio
 import subprocess
-import os
 import json
+import os
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, FrozenSet, List, Optional
 import tempfile
 import shutil
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Static files written into generated projects when missing
+_CSPROJ_BYTES = b'''<Project Sdk="Microsoft.NET.Sdk.Web">
+  <PropertyGroup>
+    <TargetFramework>net6.0</TargetFramework>
+  </PropertyGroup>
+</Project>'''
+
+_GITIGNORE_BYTES = b"""# Dependencies
+node_modules/
+__pycache__/
+*.pyc
+bin/
+obj/
+
+# Build outputs
+build/
+dist/
+*.dll
+*.exe
+
+# IDE files
+.vscode/
+.idea/
+*.swp
+*.swo
+
+# OS files
+.DS_Store
+Thumbs.db
+
+# Logs
+*.log
+logs/
+
+# Environment
+.env
+.env.local
+"""
+
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    """Write data to path unless it already holds exactly those bytes; return whether it wrote.
+    
+    The bytes go to a sibling temp file, unique to this writer, that is moved
+    into place, so readers never see a partial file.
+    """
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp creates the file 0o600; generated project files should read like any other
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_name, path)
+    finally:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+    return True
+
+
+# Only the end of a command's output is reported, so longer output is not kept in memory
+OUTPUT_TAIL_BYTES = 64 * 1024
+
+
+async def _read_tail(stream: asyncio.StreamReader, limit: int) -> bytes:
+    """Read a stream to EOF, keeping only its last limit bytes."""
+    tail = bytearray()
+    while chunk := await stream.read(65536):
+        tail += chunk
+        del tail[:-limit]
+    return bytes(tail)
+
+
+async def _run_command(cmd: List[str], cwd: Path, timeout: float,
+                       tail_bytes: int = OUTPUT_TAIL_BYTES) -> subprocess.CompletedProcess:
+    """Run a command without blocking the event loop, killing it if it outlives timeout.
+    
+    stdout and stderr are drained as the command runs and only their last
+    tail_bytes are returned.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd, cwd=cwd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr, _ = await asyncio.wait_for(
+            asyncio.gather(
+                _read_tail(process.stdout, tail_bytes), _read_tail(process.stderr, tail_bytes), process.wait()
+            ),
+            timeout
+        )
+    except asyncio.TimeoutError:
+        # The command may have exited between the timeout and the kill
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    return subprocess.CompletedProcess(
+        cmd, process.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+    )
+
+
+def _read_json(path: Path) -> Dict:
+    """Read a JSON file, using orjson when it is installed."""
+    data = path.read_bytes()
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+# Keep installs quiet and use the local npm cache where it can
+_NPM_INSTALL_FLAGS = ("--no-audit", "--no-fund", "--prefer-offline")
+
+_JS_TECHS = frozenset({"javascript", "react", "node.js"})
+_NET_TECHS = frozenset({"c#", ".net", "asp.net"})
+
+
+def _tech_set(tech_stack: List[str]) -> FrozenSet[str]:
+    """Lowercased tech names, so every stack check is case-insensitive."""
+    return frozenset(tech.lower() for tech in tech_stack)
+
+
+def _tech_flags(tech_stack: List[str]) -> Dict[str, bool]:
+    """Classify a tech stack once, case-insensitively, for the validation stages."""
+    techs = _tech_set(tech_stack)
+    return {
+        "is_js": not techs.isdisjoint(_JS_TECHS),
+        "is_py": "python" in techs,
+        "is_net": not techs.isdisjoint(_NET_TECHS),
+    }
+
+
+def _entry_names(directory: Path) -> FrozenSet[str]:
+    """Names of everything directly inside directory, empty if it doesn't exist."""
+    try:
+        with os.scandir(directory) as entries:
+            return frozenset(entry.name for entry in entries)
+    except FileNotFoundError:
+        return frozenset()
+
+
+@dataclass
+class _ProjectSnapshot:
+    """Names in a project's code and tests directories, each listed with a single scandir."""
+    code_files: FrozenSet[str]
+    test_files: FrozenSet[str]
+    package_json: Optional[Dict] = None
+    
+    @classmethod
+    def scan(cls, project_path: Path) -> "_ProjectSnapshot":
+        return cls(_entry_names(project_path / "code"), _entry_names(project_path / "tests"))
+    
+    @property
+    def has_csproj(self) -> bool:
+        return any(name.endswith(".csproj") for name in self.code_files)
+    
+    @property
+    def py_mains(self) -> List[str]:
+        return [name for name in ("main.py", "app.py") if name in self.code_files]
+    
+    @property
+    def py_tests(self) -> List[str]:
+        return [name for name in self.test_files if name.startswith("test_") and name.endswith(".py")]
+
+
 class DeploymentValidationCrew:
     """Validates that generated projects can actually run locally."""
     
     def __init__(self):
         self.validation_results = {}
+        # Directory snapshot per project, shared by the stages of one validation
+        self._project_cache: Dict[Path, _ProjectSnapshot] = {}
     
     def validate_project_deployment(self, project_path: Path, tech_stack: List[str]) -> Dict:
+        """Validate that project can be deployed and run locally.
+        
+        Blocking wrapper for callers outside an event loop; async callers should
+        await validate_project_deployment_async instead.
+        """
+        return asyncio.run(self.validate_project_deployment_async(project_path, tech_stack))
+    
+    async def validate_project_deployment_async(self, project_path: Path, tech_stack: List[str]) -> Dict:
         """Validate that project can be deployed and run locally."""
         
         validation_results = {
@@ -27,25 +216,31 @@ class DeploymentValidationCrew:
             "errors": []
         }
         
+        self._project_cache.pop(project_path, None)
+        flags = _tech_flags(tech_stack)
+        
         try:
             # 1. Validate project structure
             structure_result = self._validate_project_structure(project_path)
             validation_results["validations"]["structure"] = structure_result
             
             # 2. Generate missing dependencies
-            deps_result = self._generate_dependencies(project_path, tech_stack)
+            deps_result = self._generate_dependencies(project_path, tech_stack, **flags)
             validation_results["validations"]["dependencies"] = deps_result
+            if deps_result["files_created"]:
+                self._project_cache.pop(project_path, None)
             
-            # 3. Test local execution
-            execution_result = self._test_local_execution(project_path, tech_stack)
-            validation_results["validations"]["execution"] = execution_result
+            # 3-5. Execution, git readiness and tests run together; the tests only
+            # wait for execution to finish installing dependencies, not for the build
+            deps_installed = asyncio.Event()
+            execution_result, git_result, functionality_result = await asyncio.gather(
+                self._test_local_execution(project_path, deps_installed, **flags),
+                asyncio.to_thread(self._validate_git_readiness, project_path),
+                self._test_basic_functionality(project_path, deps_installed, **flags),
+            )
             
-            # 4. Validate git readiness
-            git_result = self._validate_git_readiness(project_path)
+            validation_results["validations"]["execution"] = execution_result
             validation_results["validations"]["git"] = git_result
-            
-            # 5. Test basic functionality
-            functionality_result = self._test_basic_functionality(project_path, tech_stack)
             validation_results["validations"]["functionality"] = functionality_result
             
             # Determine overall status
@@ -73,112 +268,138 @@ class DeploymentValidationCrew:
         """Validate basic project structure."""
         result = {"status": "PASS", "issues": [], "fixes_applied": []}
         
+        present = _entry_names(project_path)
         required_dirs = ["code", "tests", "docs"]
         for dir_name in required_dirs:
-            dir_path = project_path / dir_name
-            if not dir_path.exists():
+            if dir_name not in present:
                 result["issues"].append(f"Missing {dir_name} directory")
-                dir_path.mkdir(exist_ok=True)
+                (project_path / dir_name).mkdir(exist_ok=True)
                 result["fixes_applied"].append(f"Created {dir_name} directory")
         
-        code_dir = project_path / "code"
-        if code_dir.exists() and not any(code_dir.iterdir()):
+        if not self._snapshot(project_path).code_files:
             result["issues"].append("Code directory is empty")
             result["status"] = "FAIL"
         
         return result
     
-    def _generate_dependencies(self, project_path: Path, tech_stack: List[str]) -> Dict:
+    def _snapshot(self, project_path: Path) -> _ProjectSnapshot:
+        """Return the project's directory snapshot, scanning it once per validation."""
+        snapshot = self._project_cache.get(project_path)
+        if snapshot is None:
+            snapshot = self._project_cache[project_path] = _ProjectSnapshot.scan(project_path)
+        return snapshot
+    
+    def _package_json(self, project_path: Path) -> Dict:
+        """Return the project's parsed package.json, reading it at most once per validation."""
+        snapshot = self._snapshot(project_path)
+        if snapshot.package_json is None:
+            snapshot.package_json = _read_json(project_path / "code" / "package.json")
+        return snapshot.package_json
+    
+    def _generate_dependencies(self, project_path: Path, tech_stack: List[str], *,
+                               is_js: bool = False, is_py: bool = False, is_net: bool = False) -> Dict:
         """Generate missing dependency files based on tech stack."""
         result = {"status": "PASS", "files_created": [], "issues": []}
         
         code_dir = project_path / "code"
+        snapshot = self._snapshot(project_path)
         
         # JavaScript/React projects
-        if any(tech in tech_stack for tech in ["JavaScript", "React", "Node.js"]):
-            package_json = code_dir / "package.json"
-            if not package_json.exists():
+        if is_js:
+            if "package.json" not in snapshot.code_files:
                 self._create_package_json(code_dir, tech_stack)
                 result["files_created"].append("package.json")
         
         # Python projects
-        if "Python" in tech_stack:
-            requirements_txt = code_dir / "requirements.txt"
-            if not requirements_txt.exists():
+        if is_py:
+            if "requirements.txt" not in snapshot.code_files:
                 self._create_requirements_txt(code_dir, tech_stack)
                 result["files_created"].append("requirements.txt")
         
         # .NET projects
-        if any(tech in tech_stack for tech in ["C#", ".NET", "ASP.NET"]):
-            csproj_files = list(code_dir.glob("*.csproj"))
-            if not csproj_files:
+        if is_net:
+            if not snapshot.has_csproj:
                 self._create_csproj_file(code_dir)
                 result["files_created"].append("project.csproj")
         
         return result
     
-    def _test_local_execution(self, project_path: Path, tech_stack: List[str]) -> Dict:
-        """Test if project can actually run locally."""
-        result = {"status": "UNKNOWN", "output": "", "errors": [], "commands_tested": []}
+    async def _test_local_execution(self, project_path: Path, deps_installed: Optional[asyncio.Event] = None, *,
+                                    is_js: bool = False, is_py: bool = False, is_net: bool = False) -> Dict:
+        """Test if project can actually run locally.
         
-        code_dir = project_path / "code"
-        original_cwd = os.getcwd()
+        deps_installed, if given, is set once dependency installation is over,
+        whether it succeeded or not.
+        """
+        result = {"status": "UNKNOWN", "output": "", "errors": [], "commands_tested": []}
         
         try:
-            os.chdir(code_dir)
-            
             # Test JavaScript/React projects
-            if any(tech in tech_stack for tech in ["JavaScript", "React", "Node.js"]):
-                result = self._test_js_execution(code_dir, result)
+            if is_js:
+                result = await self._test_js_execution(project_path, result, deps_installed)
             
             # Test Python projects
-            elif "Python" in tech_stack:
-                result = self._test_python_execution(code_dir, result)
+            elif is_py:
+                result = await self._test_python_execution(project_path, result, deps_installed)
             
             # Test .NET projects
-            elif any(tech in tech_stack for tech in ["C#", ".NET"]):
-                result = self._test_dotnet_execution(code_dir, result)
+            elif is_net:
+                result = await self._test_dotnet_execution(project_path, result)
             
             else:
                 result["status"] = "SKIP"
                 result["errors"].append("Unknown tech stack for execution testing")
         
         finally:
-            os.chdir(original_cwd)
+            if deps_installed is not None:
+                deps_installed.set()
         
         return result
     
-    def _test_js_execution(self, code_dir: Path, result: Dict) -> Dict:
+    async def _test_js_execution(self, project_path: Path, result: Dict,
+                                 deps_installed: Optional[asyncio.Event] = None) -> Dict:
         """Test JavaScript/React project execution."""
+        code_dir = project_path / "code"
+        snapshot = self._snapshot(project_path)
+        has_package_json = "package.json" in snapshot.code_files
         try:
-            # Install dependencies
-            if (code_dir / "package.json").exists():
-                install_result = subprocess.run(
-                    ["npm", "install"], 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=60
+            # Install dependencies, reading package.json while the install runs;
+            # a lockfile allows the faster, reproducible npm ci
+            if has_package_json:
+                install_cmd = [
+                    "npm", "ci" if "package-lock.json" in snapshot.code_files else "install", *_NPM_INSTALL_FLAGS
+                ]
+                install_result, package_data = await asyncio.gather(
+                    _run_command(install_cmd, code_dir, timeout=60),
+                    asyncio.to_thread(self._package_json, project_path),
+                    return_exceptions=True
                 )
-                result["commands_tested"].append("npm install")
+                if isinstance(install_result, BaseException):
+                    raise install_result
+                result["commands_tested"].append(" ".join(install_cmd))
+                
+                # npm ci rejects a lockfile that is out of sync with package.json,
+                # which generated projects often have; npm install reconciles them
+                if install_result.returncode != 0 and install_cmd[1] == "ci":
+                    install_cmd = ["npm", "install", *_NPM_INSTALL_FLAGS]
+                    install_result = await _run_command(install_cmd, code_dir, timeout=60)
+                    result["commands_tested"].append(" ".join(install_cmd))
                 
                 if install_result.returncode != 0:
-                    result["errors"].append(f"npm install failed: {install_result.stderr}")
+                    result["errors"].append(f"npm {install_cmd[1]} failed: {install_result.stderr}")
                     result["status"] = "FAIL"
                     return result
             
+            if deps_installed is not None:
+                deps_installed.set()
+            
             # Test build (if build script exists)
-            package_json_path = code_dir / "package.json"
-            if package_json_path.exists():
-                with open(package_json_path) as f:
-                    package_data = json.load(f)
+            if has_package_json:
+                if isinstance(package_data, BaseException):
+                    raise package_data
                 
                 if "build" in package_data.get("scripts", {}):
-                    build_result = subprocess.run(
-                        ["npm", "run", "build"], 
-                        capture_output=True, 
-                        text=True, 
-                        timeout=120
-                    )
+                    build_result = await _run_command(["npm", "run", "build"], code_dir, timeout=120)
                     result["commands_tested"].append("npm run build")
                     
                     if build_result.returncode == 0:
@@ -200,17 +421,15 @@ class DeploymentValidationCrew:
         
         return result
     
-    def _test_python_execution(self, code_dir: Path, result: Dict) -> Dict:
+    async def _test_python_execution(self, project_path: Path, result: Dict,
+                                     deps_installed: Optional[asyncio.Event] = None) -> Dict:
         """Test Python project execution."""
+        code_dir = project_path / "code"
+        snapshot = self._snapshot(project_path)
         try:
             # Install dependencies
-            if (code_dir / "requirements.txt").exists():
-                install_result = subprocess.run(
-                    ["pip", "install", "-r", "requirements.txt"], 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=60
-                )
+            if "requirements.txt" in snapshot.code_files:
+                install_result = await _run_command(["pip", "install", "-r", "requirements.txt"], code_dir, timeout=60)
                 result["commands_tested"].append("pip install -r requirements.txt")
                 
                 if install_result.returncode != 0:
@@ -218,16 +437,14 @@ class DeploymentValidationCrew:
                     result["status"] = "FAIL"
                     return result
             
+            if deps_installed is not None:
+                deps_installed.set()
+            
             # Test syntax by importing main module
-            main_files = list(code_dir.glob("main.py")) + list(code_dir.glob("app.py"))
+            main_files = snapshot.py_mains
             if main_files:
-                syntax_result = subprocess.run(
-                    ["python", "-m", "py_compile", str(main_files[0])], 
-                    capture_output=True, 
-                    text=True, 
-                    timeout=30
-                )
-                result["commands_tested"].append(f"python -m py_compile {main_files[0].name}")
+                syntax_result = await _run_command(["python", "-m", "py_compile", main_files[0]], code_dir, timeout=30)
+                result["commands_tested"].append(f"python -m py_compile {main_files[0]}")
                 
                 if syntax_result.returncode == 0:
                     result["status"] = "PASS"
@@ -245,16 +462,12 @@ class DeploymentValidationCrew:
         
         return result
     
-    def _test_dotnet_execution(self, code_dir: Path, result: Dict) -> Dict:
+    async def _test_dotnet_execution(self, project_path: Path, result: Dict) -> Dict:
         """Test .NET project execution."""
+        code_dir = project_path / "code"
         try:
             # Test build
-            build_result = subprocess.run(
-                ["dotnet", "build"], 
-                capture_output=True, 
-                text=True, 
-                timeout=60
-            )
+            build_result = await _run_command(["dotnet", "build"], code_dir, timeout=60)
             result["commands_tested"].append("dotnet build")
             
             if build_result.returncode == 0:
@@ -288,30 +501,30 @@ class DeploymentValidationCrew:
         
         return result
     
-    def _test_basic_functionality(self, project_path: Path, tech_stack: List[str]) -> Dict:
-        """Test basic functionality using generated tests."""
+    async def _test_basic_functionality(self, project_path: Path, deps_installed: Optional[asyncio.Event] = None, *,
+                                        is_js: bool = False, is_py: bool = False, is_net: bool = False) -> Dict:
+        """Test basic functionality using generated tests.
+        
+        If deps_installed is given, the tests wait for it before running.
+        """
         result = {"status": "SKIP", "test_output": "", "errors": []}
         
-        tests_dir = project_path / "tests"
-        if not tests_dir.exists() or not any(tests_dir.iterdir()):
+        snapshot = self._snapshot(project_path)
+        if not snapshot.test_files:
             result["errors"].append("No tests found")
             return result
         
+        tests_dir = project_path / "tests"
         code_dir = project_path / "code"
-        original_cwd = os.getcwd()
+        
+        if deps_installed is not None:
+            await deps_installed.wait()
         
         try:
-            os.chdir(code_dir)
-            
             # Run JavaScript tests
-            if any(tech in tech_stack for tech in ["JavaScript", "React"]):
-                if (code_dir / "package.json").exists():
-                    test_result = subprocess.run(
-                        ["npm", "test", "--", "--watchAll=false"], 
-                        capture_output=True, 
-                        text=True, 
-                        timeout=60
-                    )
+            if is_js:
+                if "package.json" in snapshot.code_files:
+                    test_result = await _run_command(["npm", "test", "--", "--watchAll=false"], code_dir, timeout=60)
                     
                     if test_result.returncode == 0:
                         result["status"] = "PASS"
@@ -321,15 +534,9 @@ class DeploymentValidationCrew:
                         result["errors"].append(f"Tests failed: {test_result.stderr}")
             
             # Run Python tests
-            elif "Python" in tech_stack:
-                test_files = list(tests_dir.glob("test_*.py"))
-                if test_files:
-                    test_result = subprocess.run(
-                        ["python", "-m", "pytest", str(tests_dir)], 
-                        capture_output=True, 
-                        text=True, 
-                        timeout=60
-                    )
+            elif is_py:
+                if snapshot.py_tests:
+                    test_result = await _run_command(["python", "-m", "pytest", str(tests_dir.resolve())], code_dir, timeout=60)
                     
                     if test_result.returncode == 0:
                         result["status"] = "PASS"
@@ -342,9 +549,6 @@ class DeploymentValidationCrew:
             result["status"] = "ERROR"
             result["errors"].append(f"Test execution failed: {str(e)}")
         
-        finally:
-            os.chdir(original_cwd)
-        
         return result
     
     def _create_package_json(self, code_dir: Path, tech_stack: List[str]):
@@ -362,75 +566,38 @@ class DeploymentValidationCrew:
             }
         }
         
-        if "React" in tech_stack:
+        if "react" in _tech_set(tech_stack):
             package_data["dependencies"].update({
                 "react": "^18.2.0",
                 "react-dom": "^18.2.0",
                 "react-scripts": "5.0.1"
             })
         
-        with open(code_dir / "package.json", "w") as f:
-            json.dump(package_data, f, indent=2)
+        if ORJSON_AVAILABLE:
+            payload = orjson.dumps(package_data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(package_data, indent=2).encode()
+        _write_if_changed(code_dir / "package.json", payload)
     
     def _create_requirements_txt(self, code_dir: Path, tech_stack: List[str]):
         """Create requirements.txt for Python projects."""
         requirements = []
+        techs = _tech_set(tech_stack)
         
-        if "FastAPI" in tech_stack:
+        if "fastapi" in techs:
             requirements.extend(["fastapi", "uvicorn"])
-        elif "Flask" in tech_stack:
+        elif "flask" in techs:
             requirements.append("flask")
-        elif "Django" in tech_stack:
+        elif "django" in techs:
             requirements.append("django")
         
         if requirements:
-            with open(code_dir / "requirements.txt", "w") as f:
-                f.write("\n".join(requirements))
+            _write_if_changed(code_dir / "requirements.txt", "\n".join(requirements).encode())
     
     def _create_csproj_file(self, code_dir: Path):
         """Create .csproj file for .NET projects."""
-        csproj_content = '''<Project Sdk="Microsoft.NET.Sdk.Web">
-  <PropertyGroup>
-    <TargetFramework>net6.0</TargetFramework>
-  </PropertyGroup>
-</Project>'''
-        
-        with open(code_dir / "project.csproj", "w") as f:
-            f.write(csproj_content)
+        _write_if_changed(code_dir / "project.csproj", _CSPROJ_BYTES)
     
     def _create_gitignore(self, project_path: Path):
         """Create appropriate .gitignore file."""
-        gitignore_content = """# Dependencies
-node_modules/
-__pycache__/
-*.pyc
-bin/
-obj/
-
-# Build outputs
-build/
-dist/
-*.dll
-*.exe
-
-# IDE files
-.vscode/
-.idea/
-*.swp
-*.swo
-
-# OS files
-.DS_Store
-Thumbs.db
-
-# Logs
-*.log
-logs/
-
-# Environment
-.env
-.env.local
-"""
-        
-        with open(project_path / ".gitignore", "w") as f:
-            f.write(gitignore_content)
\ No newline at end of file
+        _write_if_changed(project_path / ".gitignore", _GITIGNORE_BYTES)
\ No newline at end of file
@@ -3,6 +3,7 @@
 from crewai import Agent, Task, Crew
 from typing import Dict, List, Any
 from loguru import logger
+import re
 
 
 class IntelligentTestGenerator:
@@ -310,8 +311,6 @@ class IntelligentTestGenerator:
     
     def _extract_missing_tests(self, coverage_report: str) -> List[str]:
         """Extract missing test suggestions."""
-        import re
-        
         missing = []
         lines = coverage_report.split('\n')
         
@@ -6,9 +6,9 @@ from core.llm_config import get_analysis_llm, get_coding_llm
 from core.mcp_manager import MCPManager
 from typing import Dict, Any, Optional
 
-# Configure environment for CrewAI + Ollama
-os.environ["OPENAI_API_KEY"] = "sk-fake-key-for-ollama"
-os.environ["OLLAMA_BASE_URL"] = "http://localhost:11434"
+# Configure environment for CrewAI + Ollama, keeping any values the deployment already set
+os.environ.setdefault("OPENAI_API_KEY", "sk-fake-key-for-ollama")
+os.environ.setdefault("OLLAMA_BASE_URL", "http://localhost:11434")
 
 
 class MCPEnhancedAnalysisAgent:
@@ -0,0 +1,23 @@
+"""Per-thread CrewAI agents reused across the single-task crews of one worker thread."""
+
+from typing import Any, Callable, Hashable
+import threading
+
+_local = threading.local()
+
+
+def thread_agent(key: Hashable, llm: Any, build: Callable[[], Any]) -> Any:
+    """Return this thread's agent for key, building it once per thread and LLM client.
+
+    CrewAI keeps the running task, prompt and executor on the agent, so an
+    agent must not be shared by reviews running at the same time. Keeping
+    one per thread lets sequential reviews reuse it while concurrent ones,
+    which always run on different threads, each get their own.
+    """
+    agents = getattr(_local, 'agents', None)
+    if agents is None:
+        agents = _local.agents = {}
+    cached = agents.get(key)
+    if cached is None or cached[0] is not llm:
+        cached = agents[key] = (llm, build())
+    return cached[1]
@@ -1,13 +1,10 @@
 """Enhanced prompts for generating aesthetic diagrams with AI."""
 
 
-def get_analysis_prompt_with_diagrams(requirements: str) -> str:
-    """Get enhanced analysis prompt that generates proper diagram data."""
-    return f"""
-Analyze the following markdown requirements and create a comprehensive system design:
-
-Requirements:
-{requirements}
+# Fixed instructions opening every analysis prompt, so Ollama can reuse the cached prefix;
+# the requirements follow them as the only varying part
+_ANALYSIS_INSTRUCTIONS = """
+Analyze the markdown requirements given at the end of this prompt and create a comprehensive system design.
 
 Your analysis should include:
 
@@ -50,6 +47,14 @@ The diagram data will be used to generate professional draw.io XML diagrams with
 """
 
 
+def get_analysis_prompt_with_diagrams(requirements: str) -> str:
+    """Get enhanced analysis prompt that generates proper diagram data."""
+    return f"""{_ANALYSIS_INSTRUCTIONS}
+Requirements:
+{requirements}
+"""
+
+
 def get_review_prompt_with_diagram_feedback() -> str:
     """Get enhanced review prompt that provides diagram improvement feedback."""
     return """
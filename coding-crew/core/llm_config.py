@@ -3,12 +3,20 @@
 from langchain_ollama import ChatOllama
 from langchain_huggingface import HuggingFacePipeline
 from typing import Dict, Any, Union
+import logging
+import threading
 import yaml
 import os
 
+logger = logging.getLogger(__name__)
 
 _config_cache = None
 
+# One client per provider/model so every crew shares the already-loaded model
+_llm_cache: Dict[str, Any] = {}
+_llm_lock = threading.Lock()
+_warmed_llms: set = set()
+
 def load_config() -> Dict[str, Any]:
     """Load configuration from settings.yaml with caching."""
     global _config_cache
@@ -30,11 +38,19 @@ def get_llm(model_name: str) -> Union[ChatOllama, HuggingFacePipeline]:
     """Get configured LLM instance (Ollama or Hugging Face)."""
     config = load_config()
     provider = config.get('llm_provider', 'ollama')
+    cache_key = f"{provider}:{model_name}"
+    
+    llm = _llm_cache.get(cache_key)
+    if llm is not None:
+        return llm
     
-    if provider == 'huggingface':
-        return get_huggingface_llm(model_name)
-    else:
-        return get_ollama_llm(model_name)
+    with _llm_lock:
+        if cache_key not in _llm_cache:
+            if provider == 'huggingface':
+                _llm_cache[cache_key] = get_huggingface_llm(model_name)
+            else:
+                _llm_cache[cache_key] = get_ollama_llm(model_name)
+        return _llm_cache[cache_key]
 
 def get_ollama_llm(model_name: str) -> ChatOllama:
     """Get configured Ollama LLM instance."""
@@ -63,7 +79,7 @@ def get_huggingface_llm(model_name: str) -> HuggingFacePipeline:
 
 # Pre-configured LLM instances
 def get_analysis_llm():
-    """Get LLM for analysis tasks."""
+    """Get LLM for analysis tasks; ANALYSIS_MODEL overrides the configured Ollama model."""
     config = load_config()
     provider = config.get('llm_provider', 'ollama')
     model_key = 'analysis'
@@ -75,6 +91,9 @@ def get_analysis_llm():
                 raise KeyError(f"Model '{model_key}' not found in huggingface config")
             return get_llm(models[model_key])
         else:
+            override = os.getenv('ANALYSIS_MODEL')
+            if override:
+                return get_llm(override)
             models = config.get('ollama', {}).get('models', {})
             if model_key not in models:
                 raise KeyError(f"Model '{model_key}' not found in ollama config")
@@ -82,6 +101,34 @@ def get_analysis_llm():
     except KeyError as e:
         raise ValueError(f"Configuration error: {e}")
 
+def _warm_once(llm) -> None:
+    """Send a throwaway request through llm unless that client was already warmed."""
+    with _llm_lock:
+        if id(llm) in _warmed_llms:
+            return
+        _warmed_llms.add(id(llm))
+    llm.invoke("ping")
+
+def _start_prewarm(resolve_llm) -> threading.Thread:
+    """Warm the LLM returned by resolve_llm on a daemon thread."""
+    def _warm():
+        try:
+            _warm_once(resolve_llm())
+        except Exception as e:
+            logger.warning(f"LLM pre-warm failed: {e}")
+    
+    thread = threading.Thread(target=_warm, name="llm-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+def prewarm_llm(llm) -> threading.Thread:
+    """Load llm's model and open its connection in the background, once per client."""
+    return _start_prewarm(lambda: llm)
+
+def prewarm_analysis_llm() -> threading.Thread:
+    """Load the analysis model in the background so the first request skips the cold start."""
+    return _start_prewarm(get_analysis_llm)
+
 def get_coding_llm():
     """Get LLM for coding tasks."""
     config = load_config()
@@ -31,6 +31,7 @@ docker-compose -f docker-compose.prod.yml ps
 # Pull Ollama models
 echo "📥 Pulling required Ollama models..."
 docker-compose -f docker-compose.prod.yml exec ollama ollama pull llama3.1:8b
+docker-compose -f docker-compose.prod.yml exec ollama ollama pull llama3.1:8b-instruct-q4_K_M
 docker-compose -f docker-compose.prod.yml exec ollama ollama pull qwen2.5-coder:1.5b-base
 
 echo "✅ Deployment complete!"
@@ -19,11 +19,16 @@ fi
 
 # Pull required models if not present
 echo "📥 Checking required models..."
-if ! ollama list | grep -q "llama3.1:8b"; then
+if ! ollama list | grep -qE '^llama3\.1:8b\s'; then
     echo "📥 Pulling llama3.1:8b..."
     ollama pull llama3.1:8b
 fi
 
+if ! ollama list | grep -q "llama3.1:8b-instruct-q4_K_M"; then
+    echo "📥 Pulling llama3.1:8b-instruct-q4_K_M..."
+    ollama pull llama3.1:8b-instruct-q4_K_M
+fi
+
 if ! ollama list | grep -q "qwen2.5-coder:1.5b-base"; then
     echo "📥 Pulling qwen2.5-coder:1.5b-base..."
     ollama pull qwen2.5-coder:1.5b-base
@@ -0,0 +1,262 @@
+"""Tests for adaptive technology agents."""
+
+import os
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from agents.adaptive_tech_agent import (
+    AdaptiveTechAgentFactory,
+    BestPracticesEvolution,
+    TechnologyDiscoveryAgent,
+    _extract_first_json_object,
+    _load_json_object,
+    _load_cached_json,
+    normalize_tech_name,
+)
+
+
+@pytest.fixture
+def discovery_agent():
+    """Discovery agent with the LLM factory patched out."""
+    with patch("core.llm_config.get_analysis_llm", return_value=Mock()):
+        agent = TechnologyDiscoveryAgent()
+    TechnologyDiscoveryAgent._discovery_cache.clear()
+    yield agent
+    TechnologyDiscoveryAgent._discovery_cache.clear()
+
+
+@pytest.fixture
+def factory():
+    """Adaptive agent factory with the LLM factories patched out."""
+    with patch("core.llm_config.get_coding_llm", return_value=Mock()), \
+         patch("core.llm_config.get_analysis_llm", return_value=Mock()):
+        return AdaptiveTechAgentFactory()
+
+
+class TestTechnologyDiscoveryAgent:
+
+    def test_normalize_tech_name_variants(self):
+        """Test spelling variants map to the same key."""
+        assert normalize_tech_name("Node.js") == "nodejs"
+        assert normalize_tech_name(" nodejs ") == "nodejs"
+        assert normalize_tech_name("node") == "nodejs"
+        assert normalize_tech_name("C++") == "c++"
+        assert normalize_tech_name("C#") == "c#"
+
+    def test_discover_technology_uses_cache(self, discovery_agent):
+        """Test cached profiles skip the crew run."""
+        profile = {"name": "Node.js", "category": "framework"}
+        TechnologyDiscoveryAgent._discovery_cache["nodejs"] = (time.time(), profile)
+
+        with patch("agents.adaptive_tech_agent.Crew") as mock_crew:
+            result = discovery_agent.discover_technology("nodejs")
+
+        assert result is profile
+        mock_crew.assert_not_called()
+
+    def test_load_json_object_from_prose(self):
+        """Test JSON embedded between prose with stray braces is extracted."""
+        text = 'Profile: {"name": "Go", "patterns": ["{x}"]} and {not json}'
+        assert _load_json_object(text) == {"name": "Go", "patterns": ["{x}"]}
+        assert _load_json_object("no json here") is None
+
+    def test_extract_first_json_object_ignores_braces_in_strings(self):
+        """Test braces and escaped quotes inside strings do not affect depth."""
+        text = 'x {"a": "}", "b": "say \\"{\\"", "c": {"d": 1}} tail}'
+        assert _extract_first_json_object(text) == text[2:-6]
+        assert _extract_first_json_object("{unbalanced") is None
+
+    def test_saved_profile_served_from_memory(self, discovery_agent, tmp_path):
+        """Test saved profiles are read back without re-parsing the file."""
+        discovery_agent.knowledge_base = tmp_path / "tech_knowledge.json"
+        discovery_agent._save_tech_profile("Go", {"name": "Go"})
+
+        with patch("agents.adaptive_tech_agent._read_json") as mock_load:
+            knowledge = _load_cached_json(discovery_agent.knowledge_base)
+
+        assert knowledge["go"] == {"name": "Go"}
+        mock_load.assert_not_called()
+        assert not (tmp_path / "tech_knowledge.json.tmp").exists()
+
+    def test_unchanged_profile_is_not_rewritten(self, discovery_agent, tmp_path):
+        """Test saving an identical profile does not touch the file."""
+        discovery_agent.knowledge_base = tmp_path / "tech_knowledge.json"
+        discovery_agent._save_tech_profile("Go", {"name": "Go"})
+
+        with patch("agents.adaptive_tech_agent._save_cached_json") as mock_save:
+            discovery_agent._save_tech_profile("go", {"name": "Go"})
+
+        mock_save.assert_not_called()
+
+    def test_discover_technology_runs_single_crew(self, discovery_agent, tmp_path):
+        """Test research and JSON structuring happen in one crew run."""
+        discovery_agent.knowledge_base = tmp_path / "tech_knowledge.json"
+
+        with patch("agents.adaptive_tech_agent.Agent"), \
+             patch("agents.adaptive_tech_agent.Task"), \
+             patch("agents.adaptive_tech_agent.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.return_value = '{"name": "Zig", "category": "language"}'
+            profile = discovery_agent.discover_technology("Zig")
+
+        assert profile["category"] == "language"
+        assert mock_crew.call_count == 1
+
+    def test_unparsed_research_falls_back_without_caching(self, discovery_agent, tmp_path):
+        """Test output without a JSON object yields the empty profile, neither cached nor saved."""
+        discovery_agent.knowledge_base = tmp_path / "tech_knowledge.json"
+
+        with patch("agents.adaptive_tech_agent.Agent"), \
+             patch("agents.adaptive_tech_agent.Task"), \
+             patch("agents.adaptive_tech_agent.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.return_value = "Zig is a systems language."
+            result = discovery_agent.discover_technology("Zig")
+            discovery_agent.discover_technology("Zig")
+
+        assert result["name"] == "Zig"
+        assert result["category"] == "unknown"
+        assert mock_crew.call_count == 2
+        assert not discovery_agent.knowledge_base.exists()
+
+
+class TestAdaptiveTechAgentFactory:
+
+    @pytest.mark.asyncio
+    async def test_create_agents_for_techs_discovers_unknown_only(self, factory):
+        """Test only unknown technologies go through discovery."""
+        known = {"name": "Python", "patterns": []}
+        factory._get_tech_profile = Mock(side_effect=lambda name: known if name == "Python" else None)
+        factory.discovery_agent.discover_technology = Mock(
+            side_effect=lambda name: {"name": name, "patterns": []}
+        )
+        factory._create_specialized_agent = Mock(side_effect=lambda profile: profile["name"])
+
+        agents = await factory.create_agents_for_techs(["Python", "Elixir", "Zig"])
+
+        assert agents == {"Python": "Python", "Elixir": "Elixir", "Zig": "Zig"}
+        assert factory.discovery_agent.discover_technology.call_count == 2
+
+    def test_render_backstory_reuses_unchanged_profile(self, factory):
+        """Test the backstory is rendered once per profile object."""
+        profile = {"name": "Go", "patterns": ["interfaces"], "commands": {"test": "go test"}}
+
+        first = factory._render_backstory(profile)
+        second = factory._render_backstory(profile)
+        updated = factory._render_backstory({**profile, "patterns": ["channels"]})
+
+        assert first is second
+        assert "- interfaces" in first
+        assert "- test: go test" in first
+        assert "- channels" in updated
+
+    def test_get_tech_profile_negative_lookup_skips_file(self, factory, tmp_path):
+        """Test unknown techs are rejected without reading the knowledge base."""
+        factory.knowledge_base = tmp_path / "tech_knowledge.json"
+        factory.discovery_agent.knowledge_base = factory.knowledge_base
+        factory.discovery_agent._save_tech_profile("Go", {"name": "Go"})
+
+        with patch("agents.adaptive_tech_agent._load_cached_json") as mock_load:
+            assert factory._get_tech_profile("Elixir") is None
+        mock_load.assert_not_called()
+        assert factory._get_tech_profile("go") == {"name": "Go"}
+
+    def test_known_techs_follow_reloaded_knowledge_base(self, factory, tmp_path):
+        """Test a knowledge base changed on disk refreshes the known-tech lookup when reloaded."""
+        factory.knowledge_base = tmp_path / "tech_knowledge.json"
+        factory.discovery_agent.knowledge_base = factory.knowledge_base
+        factory.discovery_agent._save_tech_profile("Go", {"name": "Go"})
+
+        factory.knowledge_base.write_text('{"rust": {"name": "Rust"}}')
+        os.utime(factory.knowledge_base, ns=(0, 0))
+        _load_cached_json(factory.knowledge_base)
+
+        assert factory._get_tech_profile("rust") == {"name": "Rust"}
+        assert factory._get_tech_profile("go") is None
+
+    def test_persisted_profiles_use_normalized_key_and_expire(self, factory, tmp_path):
+        """Test spelling variants share one stored profile that expires with the discovery TTL."""
+        factory.knowledge_base = tmp_path / "tech_knowledge.json"
+        factory.discovery_agent.knowledge_base = factory.knowledge_base
+        profile = {"name": "Node.js", "discovered_at": time.time()}
+
+        factory.discovery_agent._save_tech_profile("Node.js", profile)
+
+        assert list(_load_cached_json(factory.knowledge_base)) == ["nodejs"]
+        assert factory._get_tech_profile("nodejs") == profile
+        with patch("agents.adaptive_tech_agent.time.time", return_value=profile["discovered_at"] + 2 * 86400):
+            assert factory._get_tech_profile("Node.js") is None
+
+
+class TestBestPracticesEvolution:
+
+    def test_record_project_success_counts_patterns(self, tmp_path):
+        """Test pattern counts accumulate per technology across projects."""
+        evolution = BestPracticesEvolution()
+        evolution.practices_file = tmp_path / "best_practices.json"
+        evolution.success_metrics_file = tmp_path / "success_metrics.json"
+
+        evolution.record_project_success(["Python", "React"], ["mvc", "tdd"], {})
+        evolution.record_project_success(["python"], ["tdd", "tdd"], {})
+
+        metrics = evolution._load_success_metrics()
+        assert metrics["python"] == {
+            "successful_patterns": {"mvc": 1, "tdd": 3},
+            "total_projects": 2,
+        }
+        assert metrics["react"]["total_projects"] == 1
+
+    def test_record_project_success_without_techs_skips_writes(self, tmp_path):
+        """Test an empty tech stack leaves the metrics files untouched."""
+        evolution = BestPracticesEvolution()
+        evolution.practices_file = tmp_path / "best_practices.json"
+        evolution.success_metrics_file = tmp_path / "success_metrics.json"
+
+        evolution.record_project_success([], ["mvc"], {})
+
+        assert not evolution.success_metrics_file.exists()
+        assert not evolution.practices_file.exists()
+
+    def test_update_best_practices_only_touches_changed_techs(self, tmp_path):
+        """Test practices are only evolved for technologies in the update."""
+        evolution = BestPracticesEvolution()
+        evolution.practices_file = tmp_path / "best_practices.json"
+        metrics = {
+            "python": {"successful_patterns": {"tdd": 2}, "total_projects": 2},
+            "react": {"successful_patterns": {"hooks": 2}, "total_projects": 2},
+        }
+
+        evolution._update_best_practices(metrics, {"python"})
+
+        practices = _load_cached_json(evolution.practices_file)
+        assert list(practices) == ["python"]
+        assert practices["python"]["evolved_practices"][0]["pattern"] == "tdd"
+
+    def test_failed_practices_write_leaves_cache_unchanged(self, tmp_path):
+        """Test a practices update that fails to save does not alter the cached store."""
+        evolution = BestPracticesEvolution()
+        evolution.practices_file = tmp_path / "best_practices.json"
+        evolution._update_best_practices({"go": {"successful_patterns": {"tdd": 1}, "total_projects": 1}}, {"go"})
+        before = _load_cached_json(evolution.practices_file)
+        metrics = {"go": {"successful_patterns": {"tdd": 2, "cli": 2}, "total_projects": 2},
+                   "rust": {"successful_patterns": {"traits": 1}, "total_projects": 1}}
+
+        with patch("agents.adaptive_tech_agent._write_json", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                evolution._update_best_practices(metrics, {"go", "rust"})
+
+        assert _load_cached_json(evolution.practices_file) == before
+        assert [p["pattern"] for p in before["go"]["evolved_practices"]] == ["tdd"]
+        assert "rust" not in before
+
+    def test_success_metrics_written_atomically(self, tmp_path):
+        """Test metrics are written via a temp file that is moved into place."""
+        evolution = BestPracticesEvolution()
+        evolution.success_metrics_file = tmp_path / "data" / "success_metrics.json"
+
+        with patch("agents.adaptive_tech_agent.os.replace", wraps=os.replace) as mock_replace:
+            evolution._save_success_metrics({"go": {"total_projects": 1}})
+
+        mock_replace.assert_called_once_with(
+            evolution.success_metrics_file.with_suffix(".json.tmp"), evolution.success_metrics_file
+        )
+        assert evolution._load_success_metrics() == {"go": {"total_projects": 1}}
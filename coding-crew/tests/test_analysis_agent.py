@@ -31,4 +31,42 @@ class TestAnalysisAgent:
         assert "parsed_requirements" in result
         assert "workload_analysis" in result
         assert "system_diagrams" in result
-        assert result["analysis_complete"] is True
\ No newline at end of file
+        assert result["analysis_complete"] is True
+
+    def test_validate_diagram_quality(self):
+        """Test diagram quality markers are detected in each diagram."""
+        agent = AnalysisAgent()
+        system = '<mxfile><root><mxCell style="fillColor=#fff"/></root></mxfile>'
+        workflow = '<mxfile><root></root></mxfile>'
+        
+        quality = agent._validate_diagram_quality(system, workflow)
+        
+        assert quality == {
+            "proper_xml_format": True,
+            "has_components": True,
+            "has_workflow_stages": False,
+            "valid_structure": True,
+            "aesthetic_styling": True
+        }
+    
+    def test_workflow_stages_by_complexity(self):
+        """Test workflow stages grow with complexity and are safe to mutate."""
+        agent = AnalysisAgent()
+        
+        low = agent._get_workflow_stages({"complexity": "low"})
+        high = agent._get_workflow_stages({"complexity": "high"})
+        low.append("Extra")
+        
+        assert agent._get_workflow_stages({"complexity": "low"}) == [
+            "Requirements Analysis", "Architecture Design", "Implementation"
+        ]
+        assert high[-1] == "Documentation"
+        assert len(agent._extract_components({"estimated_components": 5})) == 5
+
+    def test_default_components_are_safe_to_mutate(self):
+        """Test editing a returned default component leaves later defaults unchanged."""
+        agent = AnalysisAgent()
+
+        agent._extract_components({"estimated_components": 3})[0]["name"] = "Changed"
+
+        assert agent._extract_components({"estimated_components": 3})[0]["name"] == "User Interface"
@@ -0,0 +1,271 @@
+"""Tests for the CrewAI analysis crew."""
+
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from lxml import etree
+
+from agents.analysis_crew import (
+    _FALLBACK_DRAWIO_XML,
+    STORY_BATCH_SIZE,
+    AnalysisCrew,
+    analyze_many,
+    format_analysis_as_markdown,
+    _xml_parser,
+)
+
+
+VALID_DIAGRAM = '''<mxfile host="app.diagrams.net">
+  <diagram name="Test">
+    <mxGraphModel>
+      <root>
+        <mxCell id="0"/>
+        <mxCell id="1" parent="0"/>
+      </root>
+    </mxGraphModel>
+  </diagram>
+</mxfile>'''
+
+
+@pytest.fixture
+def analysis_crew():
+    """Analysis crew with the LLM and CrewAI classes patched out."""
+    with patch("core.llm_config.get_analysis_llm", return_value=Mock()), \
+         patch("core.llm_config.get_review_llm", return_value=Mock()), \
+         patch("agents.analysis_crew.Agent"), \
+         patch("agents.analysis_crew.Crew") as mock_crew:
+        mock_crew.return_value.agents = [Mock(), Mock()]
+        AnalysisCrew._analysis_cache.clear()
+        yield AnalysisCrew()
+    AnalysisCrew._analysis_cache.clear()
+
+
+class TestFormatAnalysisAsMarkdown:
+
+    def test_fixes_malformed_headings(self):
+        """Test LLM heading artifacts are normalized to markdown headings."""
+        assert format_analysis_as_markdown("**Overview** **\nText") == "## Overview\nText"
+        assert format_analysis_as_markdown(
+            "## - *Tech**\n- **Backend** stuff\n- ## Deploy\n\n\n\nEnd **bold** x"
+        ) == "### Tech\n### Backend stuff\n### Deploy\n\nEnd **bold** x"
+
+    def test_dashed_bold_heading_becomes_h3(self):
+        """Test a list-item bold heading collapses to a single h3."""
+        assert format_analysis_as_markdown("- **Risks** **\nNone") == "### Risks\nNone"
+
+    def test_strips_surrounding_whitespace(self):
+        """Test leading and trailing whitespace is removed."""
+        assert format_analysis_as_markdown("  plain  ") == "plain"
+
+
+class TestAnalysisCrew:
+
+    def test_analysis_and_test_planning_run_before_review(self, analysis_crew):
+        """Test the independent tasks run in their own crews ahead of the review."""
+        requirements = {"project_name": "Demo", "description": "Demo app"}
+
+        with patch("agents.analysis_crew.Task") as mock_task, \
+             patch("agents.analysis_crew.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.side_effect = ["analysis output", "test plan output"]
+            analysis_crew.crew.kickoff = Mock(return_value=Mock(raw="review output"))
+            result = analysis_crew.analyze_requirements(requirements)
+
+        assert mock_crew.call_count == 2
+        review_description = mock_task.call_args.kwargs["description"]
+        assert "analysis output" in review_description
+        assert "test plan output" in review_description
+        assert "<mxGeometry x=" not in review_description
+        assert result.startswith("review output")
+
+    def test_task_prompts_share_context_prefix(self, analysis_crew):
+        """Test analysis and test planning prompts open with identical context."""
+        requirements = {"project_name": "Demo", "user_stories": {"user_stories": [{"key": "AB-1"}]}}
+
+        with patch("agents.analysis_crew.Task") as mock_task, \
+             patch("agents.analysis_crew.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.return_value = "task output"
+            analysis_crew.crew.kickoff = Mock(return_value="review output")
+            analysis_crew.analyze_requirements(requirements)
+
+        analysis_prompt, test_plan_prompt = (c.kwargs["description"] for c in mock_task.call_args_list[:2])
+        prefix = analysis_prompt[:analysis_prompt.index("PRIMARY OBJECTIVE")]
+        assert "[STORY AB-1]" in prefix
+        assert test_plan_prompt.startswith(prefix)
+
+    def test_repeated_requirements_served_from_cache(self, analysis_crew):
+        """Test identical requirements skip the crew runs on the second call."""
+        with patch("agents.analysis_crew.Task"), \
+             patch("agents.analysis_crew.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.return_value = "task output"
+            analysis_crew.crew.kickoff = Mock(return_value="review output")
+            first = analysis_crew.analyze_requirements({"project_name": "Demo", "features": ["a"]})
+            second = analysis_crew.analyze_requirements({"features": ["a"], "project_name": "Demo"})
+
+        assert second == first
+        assert mock_crew.call_count == 2
+        analysis_crew.crew.kickoff.assert_called_once()
+
+    def test_stage_outputs_reported_as_they_finish(self, analysis_crew):
+        """Test the progress callback receives each stage output, review last."""
+        reported = []
+
+        with patch("agents.analysis_crew.Task"), \
+             patch("agents.analysis_crew.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.return_value = "task output"
+            analysis_crew.crew.kickoff = Mock(return_value="review output")
+            analysis_crew.analyze_requirements(
+                {"project_name": "Demo"}, on_task_output=lambda stage, output: reported.append(stage)
+            )
+
+        assert sorted(reported[:2]) == ["analysis", "test_plan"]
+        assert reported[2:] == ["review"]
+
+    def test_cached_analysis_replays_stage_outputs(self, analysis_crew):
+        """Test a cache hit still hands every stage output to the callback."""
+        reported = []
+
+        with patch("agents.analysis_crew.Task", side_effect=lambda **kw: Mock(**kw)), \
+             patch("agents.analysis_crew.Crew",
+                   side_effect=lambda agents, tasks, verbose: Mock(kickoff=Mock(return_value=tasks[0].expected_output))):
+            analysis_crew.crew.kickoff = Mock(return_value="review output")
+            first = analysis_crew.analyze_requirements({"project_name": "Demo"})
+            second = analysis_crew.analyze_requirements(
+                {"project_name": "Demo"}, on_task_output=lambda stage, output: reported.append((stage, output))
+            )
+
+        assert second == first
+        assert [stage for stage, _ in reported] == ["analysis", "test_plan", "review"]
+        assert reported[0][1].startswith("Comprehensive technical analysis")
+        assert reported[1][1] == "Test plan aligned with story requirements"
+        assert reported[2][1] == first
+
+    def test_stories_split_into_batches_of_batch_size(self, analysis_crew):
+        """Test stories past STORY_BATCH_SIZE spill into a further batch with continued numbering."""
+        stories = [{"key": f"AB-{i}", "summary": f"Story {i}"} for i in range(1, STORY_BATCH_SIZE + 2)]
+
+        first, second = analysis_crew._story_batches({"user_stories": {"user_stories": stories}})
+
+        assert first.count("[STORY ") == STORY_BATCH_SIZE
+        assert f"[STORY AB-{STORY_BATCH_SIZE}]" in first
+        assert second.count("[STORY ") == 1
+        assert f"{STORY_BATCH_SIZE + 1}. [STORY AB-{STORY_BATCH_SIZE + 1}]" in second
+
+    def test_each_story_batch_gets_its_own_tasks(self, analysis_crew):
+        """Test every batch is analyzed and planned, with the review seeing all of them."""
+        stories = [{"key": f"AB-{i}", "summary": f"Story {i}"} for i in range(1, STORY_BATCH_SIZE + 2)]
+        reported = {}
+
+        with patch("agents.analysis_crew.Task", side_effect=lambda **kw: Mock(**kw)) as mock_task, \
+             patch("agents.analysis_crew.Crew",
+                   side_effect=lambda agents, tasks, verbose: Mock(kickoff=Mock(return_value=tasks[0].description))):
+            analysis_crew.crew.kickoff = Mock(return_value="review output")
+            analysis_crew.analyze_requirements(
+                {"project_name": "Demo", "user_stories": {"user_stories": stories}},
+                on_task_output=lambda stage, output: reported.setdefault(stage, output)
+            )
+
+        assert mock_task.call_count == 5
+        review_prompt = mock_task.call_args_list[-1].kwargs["description"]
+        last_story = f"[STORY AB-{STORY_BATCH_SIZE + 1}]"
+        assert "[STORY AB-1]" in reported["analysis"] and last_story in reported["analysis"]
+        assert "[STORY AB-1]" in reported["test_plan"] and last_story in reported["test_plan"]
+        assert review_prompt.count(last_story) >= 2
+
+    def test_jira_context_lists_each_story(self, analysis_crew):
+        """Test the JIRA context numbers every story with its status."""
+        stories = {"user_stories": [{"key": "AB-1", "summary": "Login", "status": "Open"}]}
+
+        context = analysis_crew._format_jira_context({"user_stories": stories, "project_name": "A"})
+
+        assert "1. **AB-1**: Login\n   - Status: Open\n" in context
+        assert analysis_crew._format_jira_context({"user_stories": {}}) == ""
+
+    def test_validate_drawio_xml(self, analysis_crew):
+        """Test draw.io structure validation."""
+        assert analysis_crew._validate_drawio_xml(VALID_DIAGRAM)
+        assert not analysis_crew._validate_drawio_xml("<diagram><nodes/></diagram>")
+        assert not analysis_crew._validate_drawio_xml("<mxfile><diagram>")
+
+    def test_extract_diagrams_deduplicates_fenced_and_bare(self, analysis_crew):
+        """Test a fenced diagram is extracted once rather than per pattern."""
+        text = f"Intro\n```xml\n{VALID_DIAGRAM}\n```\nOutro"
+
+        diagrams = analysis_crew._extract_diagrams(text)
+
+        assert len(diagrams) == 1
+        assert diagrams[0].startswith('<?xml')
+        assert diagrams[0].endswith(VALID_DIAGRAM)
+
+    def test_extract_diagrams_validates_repeated_diagram_once(self, analysis_crew):
+        """Test a diagram emitted both fenced and raw is parsed a single time."""
+        text = f"```drawio\n{VALID_DIAGRAM}\n```\nAgain:\n{VALID_DIAGRAM}"
+
+        with patch.object(analysis_crew, "_validate_drawio_xml", return_value=True) as mock_validate:
+            diagrams = analysis_crew._extract_diagrams(text)
+
+        assert len(diagrams) == 1
+        mock_validate.assert_called_once()
+
+    def test_extract_diagrams_falls_back_without_xml(self, analysis_crew):
+        """Test text without diagrams yields the fallback architecture diagram."""
+        with patch("agents.analysis_crew._DIAGRAM_RE") as mock_pattern:
+            diagrams = analysis_crew._extract_diagrams("No diagrams here")
+
+        mock_pattern.finditer.assert_not_called()
+
+        assert diagrams == [_FALLBACK_DRAWIO_XML]
+        assert analysis_crew._validate_drawio_xml(_FALLBACK_DRAWIO_XML)
+
+    def test_xml_parser_per_thread_without_entity_expansion(self, tmp_path):
+        """Test each thread gets its own parser and external entities are not loaded."""
+        secret = tmp_path / "secret.txt"
+        secret.write_text("top secret")
+        document = (
+            f'<!DOCTYPE mxfile [<!ENTITY leak SYSTEM "{secret.as_uri()}">]>'
+            '<mxfile><diagram>&leak;</diagram></mxfile>'
+        ).encode()
+        other = []
+        worker = threading.Thread(target=lambda: other.append(_xml_parser()))
+        worker.start()
+        worker.join()
+
+        root = etree.fromstring(document, parser=_xml_parser())
+
+        assert _xml_parser() is _xml_parser()
+        assert other[0] is not _xml_parser()
+        assert "top secret" not in etree.tostring(root).decode()
+
+    def test_validate_drawio_xml_skips_parse_without_markers(self, analysis_crew):
+        """Test documents missing draw.io elements are rejected before parsing."""
+        with patch("agents.analysis_crew.etree.fromstring") as mock_parse:
+            assert not analysis_crew._validate_drawio_xml("<mxfile><diagram/></mxfile>")
+
+        mock_parse.assert_not_called()
+
+
+class TestAnalyzeMany:
+
+    @pytest.mark.asyncio
+    async def test_bounds_concurrent_analyses(self):
+        """Test no more than the requested number of analyses run at once."""
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def fake_analyze(self, requirements):
+            with lock:
+                running.append(requirements["project_name"])
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(requirements["project_name"])
+            return f"analysis of {requirements['project_name']}"
+
+        with patch.object(AnalysisCrew, "__init__", return_value=None), \
+             patch.object(AnalysisCrew, "analyze_requirements", fake_analyze):
+            results = await analyze_many([{"project_name": f"P{i}"} for i in range(5)], concurrency=2)
+
+        assert results == [f"analysis of P{i}" for i in range(5)]
+        assert max(peak) <= 2
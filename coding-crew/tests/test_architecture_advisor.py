@@ -0,0 +1,334 @@
+"""Tests for the AI architecture advisor."""
+
+import os
+import threading
+import time
+
+import pytest
+from unittest.mock import Mock, patch
+
+from agents.architecture_advisor import (
+    RESPONSE_CACHE_TTL, RESPONSE_TMP_MAX_AGE, ArchitectureAdvisor, ArchitectureResult, _keyword_counts, _truncate_code
+)
+
+
+@pytest.fixture
+def advisor(tmp_path):
+    """Architecture advisor with the LLM and CrewAI agent patched out."""
+    with patch("core.llm_config.get_analysis_llm", return_value=Mock(model="test-model")), \
+         patch("core.llm_config.prewarm_llm"):
+        advisor = ArchitectureAdvisor()
+    advisor.cache_dir = tmp_path / "architecture_cache"
+    with patch("agents.architecture_advisor.Agent"):
+        yield advisor
+
+
+def parse_fields(advisor, content):
+    """Every derived analysis field for content, as analyze_architecture returns them."""
+    result = ArchitectureResult(content, advisor)
+    return {name: result[name] for name in ArchitectureResult.FIELDS}
+
+
+class TestArchitectureAdvisor:
+
+    @pytest.mark.asyncio
+    async def test_run_all_runs_each_review_in_its_own_crew(self, advisor):
+        """Test the three reviews run as separate single-task crews."""
+        with patch("agents.architecture_advisor.Task", side_effect=lambda **kw: Mock(**kw)), \
+             patch("agents.architecture_advisor.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.return_value = "Use a scalable cache layer for sessions"
+            results = await advisor.run_all("code", {"project_name": "Demo"}, ["Python"], ["Tight coupling"])
+
+        assert mock_crew.call_count == 3
+        assert set(results) == {"architecture_analysis", "refactoring_suggestions", "architecture_design"}
+        assert results["architecture_analysis"]["analysis_content"] == "Use a scalable cache layer for sessions"
+        assert results["architecture_design"]["components"] == ["Cache"]
+
+    @pytest.mark.asyncio
+    async def test_run_all_concurrent_reviews_do_not_share_agents(self, advisor):
+        """Test reviews on different worker threads each kick off on a separate agent."""
+        kickoffs = []
+
+        def crew(agents, **kwargs):
+            kickoffs.append((threading.get_ident(), agents[0]))
+            return Mock(kickoff=Mock(return_value="ok"))
+
+        with patch("agents.architecture_advisor.Agent", side_effect=lambda **kw: Mock(**kw)), \
+             patch("agents.architecture_advisor.Task", side_effect=lambda **kw: Mock(**kw)), \
+             patch("agents.architecture_advisor.Crew", side_effect=crew):
+            await advisor.run_all("code", {}, ["Python"], [])
+
+        assert len(kickoffs) == 3
+        threads = {thread for thread, _ in kickoffs}
+        assert len({id(agent) for _, agent in kickoffs}) == len(threads)
+        assert all(agent is dict(kickoffs)[thread] for thread, agent in kickoffs)
+
+    @pytest.mark.asyncio
+    async def test_run_all_reports_each_review_when_done(self, advisor):
+        """Test every review is handed to the callback once it completes."""
+        reported = {}
+
+        with patch("agents.architecture_advisor.Task"), \
+             patch("agents.architecture_advisor.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.return_value = "ok"
+            results = await advisor.run_all(
+                "code", {}, [], [], on_review=lambda name, result: reported.setdefault(name, result)
+            )
+
+        assert reported == results
+
+    @pytest.mark.asyncio
+    async def test_analyze_architectures_bounds_concurrency(self, advisor):
+        """Test batched analyses keep input order with a capped number in flight."""
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def fake_analyze(code_content, requirements, tech_stack):
+            with lock:
+                running.append(code_content)
+                peak.append(len(running))
+            time.sleep(0.05 * (5 - int(code_content[-1])))
+            with lock:
+                running.remove(code_content)
+            return {"analysis_content": f"{code_content} on {tech_stack[0]}"}
+
+        advisor.analyze_architecture = fake_analyze
+        items = [{"code_content": f"svc{i}", "requirements": {}, "tech_stack": ["Go"]} for i in range(5)]
+        results = await advisor.analyze_architectures(items, concurrency=2)
+
+        assert [r["analysis_content"] for r in results] == [f"svc{i} on Go" for i in range(5)]
+        assert max(peak) <= 2
+
+    def test_identical_prompt_served_from_disk_cache(self, advisor):
+        """Test a repeated review reuses the stored response instead of the LLM."""
+        with patch("agents.architecture_advisor.Task") as mock_task, \
+             patch("agents.architecture_advisor.Crew") as mock_crew:
+            mock_task.return_value.description = "Review this design"
+            mock_crew.return_value.kickoff.return_value = "Use a facade"
+            first = advisor.design_system_architecture({"project_name": "Demo"})
+            second = advisor.design_system_architecture({"project_name": "Demo"})
+
+        assert mock_crew.call_count == 1
+        assert second == first
+        assert first["architecture_design"] == "Use a facade"
+
+    def test_unwritable_cache_does_not_fail_review(self, advisor, tmp_path):
+        """Test cache read and write errors fall through to the LLM result."""
+        advisor.cache_dir = tmp_path / "not_a_dir"
+        advisor.cache_dir.write_text("")
+
+        with patch("agents.architecture_advisor.Task") as mock_task, \
+             patch("agents.architecture_advisor.Crew") as mock_crew:
+            mock_task.return_value.description = "Review this design"
+            mock_crew.return_value.kickoff.return_value = "Use a facade"
+            result = advisor.design_system_architecture({"project_name": "Demo"})
+
+        assert result["architecture_design"] == "Use a facade"
+        assert list(tmp_path.iterdir()) == [advisor.cache_dir]
+
+    def test_cache_write_prunes_expired_stale_and_excess_files(self, advisor):
+        """Test storing a response drops expired entries, abandoned temp files and the oldest overflow."""
+        advisor.cache_dir.mkdir()
+        now = time.time()
+        expired = advisor.cache_dir / "expired.txt"
+        stale_tmp = advisor.cache_dir / "stale.tmp"
+        fresh_tmp = advisor.cache_dir / "fresh.tmp"
+        oldest = advisor.cache_dir / "oldest.txt"
+        for path, age in ((expired, RESPONSE_CACHE_TTL + 60), (stale_tmp, RESPONSE_TMP_MAX_AGE + 60),
+                          (fresh_tmp, 0), (oldest, 120), (advisor.cache_dir / "newer.txt", 60)):
+            path.write_text("x")
+            os.utime(path, (now - age, now - age))
+
+        with patch("agents.architecture_advisor.RESPONSE_CACHE_MAX_FILES", 2):
+            advisor._store_response(advisor.cache_dir / "latest.txt", "Use a facade")
+
+        assert sorted(p.name for p in advisor.cache_dir.iterdir()) == ["fresh.tmp", "latest.txt", "newer.txt"]
+
+    def test_prompt_static_instructions_precede_project_values(self, advisor):
+        """Test project-specific values come after the shared instruction block."""
+        with patch("agents.architecture_advisor.Task") as mock_task, \
+             patch("agents.architecture_advisor.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.return_value = "ok"
+            advisor.analyze_architecture("code A", {"project_name": "Alpha"}, ["Python"])
+            advisor.analyze_architecture("code B", {"project_name": "Beta"}, ["Go"])
+
+        first, second = (c.kwargs["description"] for c in mock_task.call_args_list)
+        static = first[:first.index("Technology Stack:")]
+        assert second.startswith(static)
+        assert "Alpha" not in static
+
+    def test_sequential_reviews_reuse_thread_agent(self, advisor):
+        """Test reviews on one thread share a single architect on the shared LLM client."""
+        with patch("agents.architecture_advisor.Agent", side_effect=lambda **kw: Mock(**kw)) as mock_agent, \
+             patch("agents.architecture_advisor.Task", side_effect=lambda **kw: Mock(**kw)), \
+             patch("agents.architecture_advisor.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.return_value = "ok"
+            advisor.design_system_architecture({"project_name": "Alpha"})
+            advisor.design_system_architecture({"project_name": "Beta"})
+
+        first, second = (c.kwargs["agents"][0] for c in mock_crew.call_args_list)
+        assert first is second
+        mock_agent.assert_called_once()
+        assert mock_agent.call_args.kwargs["llm"] is advisor.llm
+        assert [c.kwargs["tasks"][0].agent for c in mock_crew.call_args_list] == [first, first]
+
+    def test_init_prewarms_analysis_llm(self):
+        """Test constructing an advisor starts warming its LLM in the background."""
+        llm = Mock()
+        with patch("core.llm_config.get_analysis_llm", return_value=llm), \
+             patch("core.llm_config.prewarm_llm") as mock_prewarm, \
+             patch("agents.architecture_advisor.Agent"):
+            ArchitectureAdvisor()
+
+        mock_prewarm.assert_called_once_with(llm)
+
+    def test_extract_recommendations_single_pass(self, advisor):
+        """Test all recommendation phrasings are found in text order and capped at eight."""
+        content = "Should: add caching\n\nRecommendation: split services\n\nWe suggest: use queues"
+
+        titles = [r["title"] for r in advisor._extract_recommendations(content)]
+
+        assert titles == ["add caching", "split services", "use queues"]
+        assert len(advisor._extract_recommendations("Should: x\n\n" * 12)) == 8
+
+    def test_keyword_extractors_share_one_scan(self, advisor):
+        """Test scoring and keyword extraction reuse a single keyword count."""
+        content = "Excellent MVC layout with a cache, but two issues with the Java API gateway."
+        counts = _keyword_counts(content)
+
+        with patch("agents.architecture_advisor._keyword_counts") as mock_counts:
+            assert advisor._calculate_architecture_score(content, counts) == 70 + 5 - 2
+            assert advisor._extract_design_patterns(content, counts) == ["Mvc"]
+            assert sorted(advisor._extract_components(content, counts)) == ["Api Gateway", "Cache"]
+            assert advisor._extract_tech_recommendations(content, counts) == ["JAVA"]
+
+        mock_counts.assert_not_called()
+
+    def test_line_extractors_stop_after_six_matches(self, advisor):
+        """Test roadmap and scalability lines are cleaned, filtered and capped."""
+        roadmap = "\n".join(f"- **Phase {i}**: deliver increment {i}" for i in range(10))
+        content = "Scale\n* Improve performance with read replicas\n" + roadmap
+
+        assert advisor._extract_scalability_suggestions(content) == ["Improve performance with read replicas"]
+        assert advisor._extract_roadmap(content) == [f"Phase {i}**: deliver increment {i}" for i in range(6)]
+
+    def test_truncate_code_ends_on_whole_line(self):
+        """Test long code is cut at the last line break within the budget."""
+        code = "\n".join(f"line_{i} = {i}" for i in range(100))
+
+        truncated = _truncate_code(code, 50)
+
+        assert truncated.endswith("\n...")
+        assert code.startswith(truncated[:-4])
+        assert len(truncated) - 4 <= 50
+        assert truncated[:-4].split("\n")[-1] == "line_3 = 3"
+        assert _truncate_code("short", 50) == "short"
+
+    def test_result_returns_every_analysis_field(self, advisor):
+        """Test one parse yields score, recommendations, patterns and scalability lines."""
+        content = "Excellent factory usage.\nRecommendation: add a cache\n\nScale reads with replicas across regions"
+
+        with patch("agents.architecture_advisor._keyword_counts", wraps=_keyword_counts) as mock_counts:
+            parsed = parse_fields(advisor, content)
+
+        mock_counts.assert_called_once_with(content)
+        assert parsed == {
+            "architecture_score": 75,
+            "recommendations": [{
+                "title": "add a cache", "description": "add a cache", "priority": "Medium", "category": "Architecture"
+            }],
+            "design_patterns": ["Factory"],
+            "scalability_suggestions": ["Scale reads with replicas across regions"]
+        }
+
+    def test_keyword_lookup_handles_multi_word_and_dotted_terms(self, advisor):
+        """Test phrase and punctuated keywords resolve through the shared counts."""
+        counts = _keyword_counts("Put an API Gateway in front of Node.js and use a Unit of Work.")
+
+        assert advisor._extract_design_patterns("", counts) == ["Unit Of Work"]
+        assert advisor._extract_components("", counts) == ["Api Gateway"]
+        assert advisor._extract_tech_recommendations("", counts) == ["NODE.JS"]
+
+    def test_keyword_extractors_keep_declaration_order(self, advisor):
+        """Test repeated keywords are listed once, in keyword-table order."""
+        counts = _keyword_counts("Redis, Docker and Redis again; a Builder beside a Factory and a factory.")
+
+        assert advisor._extract_design_patterns("", counts) == ["Factory", "Builder"]
+        assert advisor._extract_tech_recommendations("", counts) == ["REDIS", "DOCKER"]
+
+    def test_result_prefers_json_summary(self, advisor):
+        """Test a fenced JSON summary is used instead of scanning the prose."""
+        content = (
+            "Poor layering overall.\n```json\n"
+            '{"score": 140, "recommendations": ["Split the monolith"], '
+            '"design_patterns": ["Repository"], "scalability": ["Add read replicas"]}\n```'
+        )
+
+        with patch("agents.architecture_advisor._keyword_counts") as mock_counts:
+            parsed = parse_fields(advisor, content)
+
+        mock_counts.assert_not_called()
+        assert parsed["architecture_score"] == 100
+        assert parsed["recommendations"][0]["title"] == "Split the monolith"
+        assert parsed["design_patterns"] == ["Repository"]
+        assert parsed["scalability_suggestions"] == ["Add read replicas"]
+
+    def test_result_falls_back_on_malformed_summary(self, advisor):
+        """Test an unusable JSON summary falls back to the prose extractors."""
+        content = 'Excellent factory usage.\n```json\n{"recommendations": []}\n```'
+
+        assert parse_fields(advisor, content)["architecture_score"] == 75
+        assert parse_fields(advisor, content.replace("[]}", "[}"))["design_patterns"] == ["Factory"]
+
+    def test_extract_refactoring_tasks_groups_description_lines(self, advisor):
+        """Test task titles match case-insensitively and collect the lines below them."""
+        content = "Intro\nREFACTOR the service layer\n  split module\n\n  add tests\nImprove caching\nuse redis"
+
+        tasks = advisor._extract_refactoring_tasks(content)
+
+        assert [t["title"] for t in tasks] == ["REFACTOR the service layer", "Improve caching"]
+        assert tasks[0]["description"] == "split module add tests "
+        assert tasks[1]["description"] == "use redis "
+
+    def test_failed_review_logs_traceback_without_formatting_error(self, advisor):
+        """Test review failures are logged with the exception attached, not interpolated."""
+        with patch("agents.architecture_advisor.Task", side_effect=RuntimeError("boom")), \
+             patch("agents.architecture_advisor.logger") as mock_logger:
+            result = advisor.design_system_architecture({})
+
+        mock_logger.opt.assert_called_once_with(exception=True)
+        mock_logger.opt.return_value.error.assert_called_once_with("Architecture design failed")
+        assert result["architecture_design"] == "Architecture design failed: boom"
+
+    def test_lazy_analysis_parses_fields_on_first_access(self, advisor):
+        """Test a lazy result only scans the content when a field is read."""
+        with patch("agents.architecture_advisor.Task", side_effect=lambda **kw: Mock(**kw)), \
+             patch("agents.architecture_advisor.Crew") as mock_crew, \
+             patch("agents.architecture_advisor._keyword_counts", wraps=_keyword_counts) as mock_counts:
+            mock_crew.return_value.kickoff.return_value = "Excellent factory usage."
+            result = advisor.analyze_architecture("code", {}, ["Python"], lazy=True)
+
+            assert result["analysis_content"] == "Excellent factory usage."
+            mock_counts.assert_not_called()
+            assert result["architecture_score"] == 75
+            assert result.get("design_patterns") == ["Factory"]
+            mock_counts.assert_called_once()
+
+        assert result.get("missing", []) == []
+        assert result.to_dict() == parse_fields(advisor, "Excellent factory usage.") | {
+            "analysis_content": "Excellent factory usage."
+        }
+
+    def test_failed_lazy_analysis_has_empty_fields(self, advisor):
+        """Test a failed analysis reports zero score and no findings without parsing."""
+        with patch("agents.architecture_advisor.Task", side_effect=RuntimeError("boom")):
+            result = advisor.analyze_architecture("code", {}, [], lazy=True)
+
+        assert result.to_dict() == {
+            "analysis_content": "Architecture analysis failed: boom",
+            "architecture_score": 0,
+            "recommendations": [],
+            "design_patterns": [],
+            "scalability_suggestions": []
+        }
@@ -0,0 +1,151 @@
+"""Tests for the AI chat assistant."""
+
+import pytest
+from datetime import datetime
+
+from agents.chat_assistant import _REQS_IMPROVE_MSG, _WORKFLOW_MSG, ChatAssistant, _latest_project, _match_intent, parse_created_at
+
+
+@pytest.fixture
+def assistant():
+    """Fresh chat assistant."""
+    return ChatAssistant()
+
+
+class TestIntentRouting:
+
+    def test_highest_priority_intent_wins(self):
+        """Test a message is routed by intent priority, not keyword position."""
+        assert _match_intent("hello, what tech stack suits my project?") == "project"
+        assert _match_intent("thank you for the framework advice") == "tech"
+        assert _match_intent("show workflow status") == "workflow"
+        assert _match_intent("deploy my app") is None
+
+    def test_keywords_match_inside_words(self):
+        """Test keywords still match as substrings, including overlapping ones."""
+        assert _match_intent("this") == "greeting"
+        assert _match_intent("technologyhelp") == "tech"
+
+    def test_respond_routes_to_handler(self, assistant):
+        """Test a project question is answered from the project data."""
+        response = assistant.respond("How many projects do I have?", {}, {"p1": {}, "p2": {}}, {})
+
+        assert response.startswith("You have 2 projects.")
+
+    def test_unmatched_intent_falls_back_to_default(self, assistant):
+        """Test every intent has a handler and messages without one get the default reply."""
+        assert set(assistant._dispatch) == {"project", "tech", "requirements", "workflow", "help", "greeting"}
+        assert assistant.respond("deploy my app", {}, {}, {}) == assistant._default_response()
+
+
+class TestHandlers:
+
+    def test_status_summary_counts_each_status(self, assistant):
+        """Test project statuses are tallied in first-seen order."""
+        projects = {"a": {"status": "testing"}, "b": {}, "c": {"status": "testing"}}
+
+        response = assistant.respond("project status please", {}, projects, {})
+
+        assert response.startswith("Project status summary: 2 testing, 1 unknown.")
+
+    def test_sub_intents_match_whole_words(self, assistant):
+        """Test handler keywords no longer fire inside unrelated words."""
+        assert assistant.respond("This was great, thanks!", {}, {}, {}).startswith("You're welcome!")
+        assert assistant.respond("Which tech fits a feedback form?", {}, {}, {}).startswith(
+            "I can help you choose the right technology stack!"
+        )
+
+    def test_canned_replies_are_shared_constants(self, assistant):
+        """Test fixed replies return the module constant rather than a new string."""
+        assert assistant.respond("explain the workflow", {}, {}, {}) is _WORKFLOW_MSG
+        assert assistant.respond("which phase comes next?", {}, {}, {}) is _WORKFLOW_MSG
+
+    def test_sub_intents_accept_inflections(self, assistant):
+        """Test common word forms still select the specific reply."""
+        assert assistant.respond("help me get started", {}, {}, {}).startswith("**Getting Started with AgentAI:**")
+        assert assistant.respond("any tech recommendations?", {}, {}, {}).startswith("I can recommend technology stacks")
+
+    def test_sub_intents_cover_product_names_and_past_tense(self, assistant):
+        """Test database products, .js spellings and past-tense verbs pick the specific reply."""
+        database_reply = assistant.respond("which database tech?", {}, {}, {})
+
+        assert assistant.respond("is mongodb good tech here?", {}, {}, {}) == database_reply
+        assert assistant.respond("compare mysql and postgresql as tech", {}, {}, {}) == database_reply
+        assert assistant.respond("tech: reactjs or vuejs?", {}, {}, {}) == assistant.respond(
+            "tech: react or vue?", {}, {}, {}
+        )
+        assert assistant.respond("which projects were created?", {}, {}, {}) == assistant.respond(
+            "create a project", {}, {}, {}
+        )
+
+    def test_sub_intents_match_word_stems(self, assistant):
+        """Test derived words such as nouns and -ing forms select the reply for their stem."""
+        assert assistant.respond("requirements improvement tips", {}, {}, {}) is _REQS_IMPROVE_MSG
+        response = assistant.respond("my projects progressing?", {}, {"p": {"status": "testing"}}, {})
+        assert response.startswith("Project status summary: 1 testing.")
+
+
+class TestConversationHistory:
+
+    def test_history_keeps_most_recent_turns(self, monkeypatch):
+        """Test the history is capped at CHAT_HISTORY_MAX entries, oldest dropped first."""
+        monkeypatch.setenv("CHAT_HISTORY_MAX", "4")
+        assistant = ChatAssistant()
+
+        for i in range(3):
+            assistant.respond(f"hello {i}", {}, {}, {})
+
+        history = assistant.get_conversation_history()
+        assert [turn["role"] for turn in history] == ["user", "assistant", "user", "assistant"]
+        assert history[0]["message"] == "hello 1"
+
+        assistant.clear_history()
+        assert assistant.get_conversation_history() == []
+
+    def test_history_timestamps_rendered_as_iso(self, assistant):
+        """Test stored nanosecond stamps are exported as ISO timestamps."""
+        before = datetime.now()
+        assistant.respond("hello", {}, {}, {})
+
+        history = assistant.get_conversation_history()
+
+        assert isinstance(assistant.conversation_history[0]["timestamp"], int)
+        assert all(before <= datetime.fromisoformat(turn["timestamp"]) <= datetime.now() for turn in history)
+
+
+class TestLatestProject:
+
+    def test_latest_project_reflects_current_projects(self):
+        """Test the latest project follows additions and in-place edits."""
+        projects = {
+            "a": {"project_name": "A", "created_at": "2024-01-02T00:00:00"},
+            "b": {"project_name": "B", "created_at": "2024-03-01T00:00:00"},
+        }
+
+        assert _latest_project(projects) == (projects["b"], "March 01, 2024")
+        projects["c"] = {"project_name": "C", "created_at": "2024-05-01T00:00:00"}
+        assert _latest_project(projects)[0]["project_name"] == "C"
+        projects["a"]["created_at"] = "2024-06-01T00:00:00"
+        assert _latest_project(projects) == (projects["a"], "June 01, 2024")
+
+    def test_tracked_latest_project_id_is_used(self, assistant):
+        """Test the caller's tracked latest project is reported, falling back to a scan when stale."""
+        projects = {
+            "a": {"project_name": "A", "status": "testing", "created_at": "2024-01-02T00:00:00"},
+            "b": {"project_name": "B", "status": "completed", "created_at": "2024-03-01T00:00:00"},
+        }
+
+        response = assistant.respond("show my latest project", {}, projects, {}, latest=("a", datetime(2024, 1, 2)))
+        assert "**A**" in response and response.endswith("January 02, 2024.")
+        assert _latest_project(projects, ("deleted", datetime(2024, 9, 1))) == (projects["b"], "March 01, 2024")
+
+    def test_parse_created_at_falls_back_to_min(self):
+        """Test missing or malformed timestamps sort before every real one."""
+        assert parse_created_at("2024-03-01T00:00:00") == datetime(2024, 3, 1)
+        assert parse_created_at(None) == parse_created_at("yesterday") == datetime.min
+
+    def test_latest_project_reply_without_timestamp(self, assistant):
+        """Test a project missing created_at is reported rather than raising."""
+        response = assistant.respond("show my latest project", {}, {"p": {"project_name": "Demo"}}, {})
+
+        assert response.endswith("Created on an unknown date.")
@@ -0,0 +1,146 @@
+"""Tests for the AI code quality reviewer."""
+
+import threading
+
+import pytest
+from unittest.mock import Mock, patch
+
+from agents.code_quality_ai import CodeQualityAI
+
+
+@pytest.fixture
+def reviewer():
+    """Code quality reviewer with the LLM and CrewAI agent patched out."""
+    with patch("core.llm_config.get_analysis_llm", return_value=Mock()), \
+         patch("agents.code_quality_ai.Agent"):
+        CodeQualityAI._review_cache.clear()
+        yield CodeQualityAI()
+    CodeQualityAI._review_cache.clear()
+
+
+class TestCodeQualityAI:
+
+    def test_reviews_run_in_own_crews_on_thread_agents(self, reviewer):
+        """Test reviews run in single-task crews sharing one agent per thread on the shared LLM."""
+        with patch("agents.code_quality_ai.Agent", side_effect=lambda **kw: Mock(**kw)) as mock_agent, \
+             patch("agents.code_quality_ai.Task"), \
+             patch("agents.code_quality_ai.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.return_value = "Critical: hardcoded secret"
+            result = reviewer.review_code("code", ["Python"])
+            reviewer.suggest_optimizations("code", {})
+            worker = threading.Thread(target=reviewer.suggest_optimizations, args=("other code", {}))
+            worker.start()
+            worker.join()
+
+        first, second, other = (c.kwargs["agents"][0] for c in mock_crew.call_args_list)
+        assert first is second
+        assert other is not first
+        assert mock_agent.call_count == 2
+        assert all(c.kwargs["llm"] is reviewer.llm for c in mock_agent.call_args_list)
+        assert result["review_content"] == "Critical: hardcoded secret"
+        assert result["issues_found"][0]["severity"] == "Critical"
+
+    def test_unchanged_code_review_served_from_cache(self, reviewer):
+        """Test repeat reviews skip the crew unless forced, and metrics are part of the key."""
+        with patch("agents.code_quality_ai.Task"), \
+             patch("agents.code_quality_ai.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.return_value = "High: missing retries"
+            first = reviewer.review_code("code", ["Python", "React"])
+            second = reviewer.review_code("code", ["React", "Python"])
+            assert mock_crew.call_count == 1
+
+            reviewer.review_code("code", ["Python", "React"], force=True)
+            reviewer.suggest_optimizations("code", {"p95_ms": 120})
+            reviewer.suggest_optimizations("code", {"p95_ms": 120})
+            reviewer.suggest_optimizations("code", {"p95_ms": 80})
+
+        assert second == first
+        assert mock_crew.call_count == 4
+
+    def test_cached_review_isolated_from_caller_edits(self, reviewer):
+        """Test mutating a returned review leaves the cached copy untouched."""
+        with patch("agents.code_quality_ai.Task"), \
+             patch("agents.code_quality_ai.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.return_value = "High: missing retries"
+            reviewer.review_code("code", ["Python"])["issues_found"].clear()
+            reviewer.review_code("code", ["Python"])["issues_found"][0]["severity"] = "Low"
+            cached = reviewer.review_code("code", ["Python"])
+
+        assert mock_crew.call_count == 1
+        assert cached["issues_found"][0]["severity"] == "High"
+
+    def test_extract_issues_by_severity(self, reviewer):
+        """Test each severity section becomes an issue with its label."""
+        content = "Critical: SQL built from user input\nLow: long lines"
+
+        issues = reviewer._extract_issues(content)
+
+        assert [(i["severity"], i["description"]) for i in issues] == [
+            ("Critical", "SQL built from user input"),
+            ("Low", "long lines"),
+        ]
+
+    def test_extract_issues_most_severe_first(self, reviewer):
+        """Test issues found in one scan are ordered by severity and capped at ten."""
+        content = "Low: naming\nhigh: no retries\nCritical: secrets in code\nHigh: n+1 queries"
+
+        issues = reviewer._extract_issues(content)
+
+        assert [(i["severity"], i["description"]) for i in issues] == [
+            ("Critical", "secrets in code"),
+            ("High", "no retries"),
+            ("High", "n+1 queries"),
+            ("Low", "naming"),
+        ]
+        assert len(reviewer._extract_issues("Medium: x\n" * 12)) == 10
+
+    def test_extract_recommendations_across_phrasings(self, reviewer):
+        """Test all recommendation phrasings are collected in text order and capped at five."""
+        content = "Recommendation: add tests\n\nShould: validate input\n\nSuggest: cache lookups"
+
+        assert reviewer._extract_recommendations(content) == ["add tests", "validate input", "cache lookups"]
+        assert len(reviewer._extract_recommendations("Should: x\n\n" * 8)) == 5
+
+    def test_quality_score_counts_whole_words(self, reviewer):
+        """Test severity and praise words adjust the score, ignoring words containing them."""
+        content = "HIGH: unchecked input. Low risk logging. Follow the well tested, good layout; allow highlights."
+
+        assert reviewer._calculate_quality_score(content) == 100 - 10 - 2 + 1 + 2
+        assert reviewer._calculate_quality_score("Critical " * 6) == 0
+
+    def test_extract_optimizations_joins_description_lines(self, reviewer):
+        """Test lines under each optimization heading form its description."""
+        content = "Optimization 1: cache\nAdd an LRU\nLow complexity\n\nImprovement: batch\nGroup queries"
+
+        optimizations = reviewer._extract_optimizations(content)
+
+        assert optimizations == [
+            {"title": "Optimization 1: cache", "description": "Add an LRU Low complexity", "complexity": "Low"},
+            {"title": "Improvement: batch", "description": "Group queries", "complexity": "Medium"},
+        ]
+
+    def test_review_codebase_runs_one_crew_and_splits_by_file(self, reviewer):
+        """Test several files are reviewed in one crew run and each gets its own section."""
+        output = "## FILE: `app.py`\nCritical: eval on input\n\n## FILE: db.py\nLow: long query\nShould: add an index"
+
+        with patch("agents.code_quality_ai.Task") as mock_task, \
+             patch("agents.code_quality_ai.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.return_value = output
+            results = reviewer.review_codebase(
+                {"app.py": "eval(x)", "db.py": "SELECT *", "util.py": "pass"}, ["Python"]
+            )
+
+        mock_crew.assert_called_once()
+        assert "=== FILE: db.py ===\nSELECT *" in mock_task.call_args.kwargs["description"]
+        assert results["app.py"]["issues_found"][0]["description"] == "eval on input"
+        assert results["db.py"]["recommendations"] == ["add an index"]
+        assert results["util.py"]["quality_score"] == 0
+
+    def test_extract_optimizations_matches_markers_in_any_case(self, reviewer):
+        """Test title and complexity markers are recognised regardless of case."""
+        content = "PERFORMANCE IMPROVEMENT: pool connections\nHigh Complexity rollout"
+
+        assert reviewer._extract_optimizations(content) == [
+            {"title": "PERFORMANCE IMPROVEMENT: pool connections", "description": "High Complexity rollout",
+             "complexity": "High"},
+        ]
@@ -0,0 +1,33 @@
+"""Tests for the CrewAI agent definitions."""
+
+import importlib
+from unittest.mock import patch
+
+from agents import crew_agents
+
+
+def test_agents_built_from_specs():
+    """Test each factory builds its agent from the matching spec and LLM."""
+    with patch("core.llm_config.get_llm", side_effect=lambda model: f"llm:{model}"), \
+         patch("agents.crew_agents.Agent") as mock_agent:
+        crew_agents.create_code_review_agent()
+        crew_agents.create_documentation_agent()
+
+    review, documentation = (c.kwargs for c in mock_agent.call_args_list)
+    assert review["role"] == "Code Quality Specialist"
+    assert review["max_iter"] == 5
+    assert documentation["role"] == "Technical Documentation Specialist"
+    assert documentation["max_iter"] == 1
+    assert documentation["llm"].startswith("llm:")
+    assert not documentation["allow_delegation"]
+
+
+def test_configured_environment_is_kept(monkeypatch):
+    """Test importing the module only fills in Ollama settings that are unset."""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-real-key")
+    monkeypatch.delenv("OLLAMA_BASE_URL", raising=False)
+
+    importlib.reload(crew_agents)
+
+    assert crew_agents.os.environ["OPENAI_API_KEY"] == "sk-real-key"
+    assert crew_agents.os.environ["OLLAMA_BASE_URL"] == "http://localhost:11434"
@@ -0,0 +1,19 @@
+"""Tests for the CrewAI task definitions."""
+
+from agents.crew_tasks import create_analysis_task, create_architecture_review_task
+
+
+def test_analysis_prompts_share_instruction_prefix():
+    """Test analysis prompts differ only in the requirements at their end."""
+    first = create_analysis_task("# Todo app").description
+    second = create_analysis_task("# Chat app").description
+
+    prefix = first[:first.index("Requirements:")]
+    assert second.startswith(prefix)
+    assert "Your analysis should include" in prefix
+    assert first.endswith("Requirements:\n# Todo app\n")
+
+
+def test_tasks_are_built_per_workflow():
+    """Test each call returns a new task, since workflows assign agents and context to them."""
+    assert create_architecture_review_task() is not create_architecture_review_task()
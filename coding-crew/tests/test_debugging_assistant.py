@@ -0,0 +1,130 @@
+"""Tests for the AI debugging assistant."""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from agents.debugging_assistant import DebuggingAssistant, _get_llm, _line_offsets
+
+
+TRACEBACK = '''Traceback (most recent call last):
+  File "app.py", line 3, in <module>
+    main()
+  File "lib.py", line 2, in main
+    raise ValueError("bad")
+ValueError: bad'''
+
+
+@pytest.fixture
+def assistant():
+    """Debugging assistant with the LLM and CrewAI agent patched out."""
+    _get_llm.cache_clear()
+    with patch("agents.debugging_assistant.ChatOllama"), \
+         patch("agents.debugging_assistant.Agent"):
+        assistant = DebuggingAssistant()
+    with patch.object(assistant, "analyze_error", return_value={"root_cause": "bad input"}):
+        yield assistant
+    _get_llm.cache_clear()
+
+
+class TestDebuggingAssistant:
+
+    def test_assistants_share_client_per_model(self):
+        """Test one Ollama client is created per model name and shared across assistants."""
+        _get_llm.cache_clear()
+        with patch("agents.debugging_assistant.ChatOllama", side_effect=lambda **kwargs: Mock(**kwargs)) as mock_ollama, \
+             patch("agents.debugging_assistant.Agent"):
+            first, second = DebuggingAssistant(), DebuggingAssistant()
+            other = DebuggingAssistant("qwen2.5:7b")
+        _get_llm.cache_clear()
+
+        assert first.llm is second.llm
+        assert other.llm.model == "qwen2.5:7b"
+        assert mock_ollama.call_count == 2
+
+
+class TestInterpretStackTrace:
+
+    def test_frames_in_known_files_get_context(self, assistant):
+        """Test each frame in a provided file is reported with the surrounding lines."""
+        code_files = {"app.py": "import lib\n\nmain()\n", "other.py": "x = 1"}
+
+        result = assistant.interpret_stack_trace(TRACEBACK, code_files)
+
+        assert result["stack_analysis"] == {"root_cause": "bad input"}
+        assert result["context_info"] == [{"file": "app.py", "line": "3", "context": "1: import lib\n2: \n3: main()\n4: "}]
+
+    def test_frames_in_same_file_index_it_once(self, assistant):
+        """Test repeated frames in one file reuse its line index and slice only nearby lines."""
+        source = "\n".join(f"line {i}" for i in range(1, 21))
+        trace = 'File "big.py", line 2, in a\nFile "big.py", line 20, in b'
+        _line_offsets.cache_clear()
+
+        result = assistant.interpret_stack_trace(trace, {"big.py": source})
+
+        assert [info["context"] for info in result["context_info"]] == [
+            "1: line 1\n2: line 2\n3: line 3\n4: line 4\n5: line 5",
+            "17: line 17\n18: line 18\n19: line 19\n20: line 20",
+        ]
+        assert _line_offsets.cache_info().misses == 1
+
+    def test_non_python_trace_skips_frame_matching(self, assistant):
+        """Test traces without Python frames are not run through the frame pattern."""
+        with patch("agents.debugging_assistant._TRACE_RE") as mock_pattern:
+            result = assistant.interpret_stack_trace("at Object.<anonymous> (index.js:1:1)", {})
+
+        mock_pattern.findall.assert_not_called()
+        assert result["context_info"] == []
+
+
+class TestAnalyzeErrors:
+
+    def test_batch_runs_one_crew_with_shared_prompt_prefix(self):
+        """Test every error becomes an independent task in a single crew run."""
+        _get_llm.cache_clear()
+        with patch("agents.debugging_assistant.ChatOllama"), \
+             patch("agents.debugging_assistant.Agent"):
+            assistant = DebuggingAssistant()
+        _get_llm.cache_clear()
+        outputs = [Mock(raw='{"root_cause": "typo"}'), Mock(raw="Check the config")]
+
+        with patch("agents.debugging_assistant.Task") as mock_task, \
+             patch("agents.debugging_assistant.Crew") as mock_crew:
+            mock_crew.return_value.kickoff.return_value = Mock(tasks_output=outputs)
+            results = assistant.analyze_errors_batch([
+                {"error_type": "NameError", "error_message": "x is not defined"},
+                {"error_type": "KeyError", "error_message": "'db'"},
+            ])
+
+        mock_crew.return_value.kickoff.assert_called_once()
+        first, second = (c.kwargs["description"] for c in mock_task.call_args_list)
+        prefix = first[:first.index("Error Type:")]
+        assert second.startswith(prefix) and "Format as JSON" in prefix
+        assert all(c.kwargs["context"] == [] for c in mock_task.call_args_list)
+        assert results[0] == {"root_cause": "typo"}
+        assert results[1]["fix_suggestions"] == ["Check the config"]
+        assert assistant.analyze_errors_batch([]) == []
+
+
+class TestDebugWorkflow:
+
+    def test_first_error_line_splits_type_message_and_trace(self, assistant):
+        """Test the first marker line is parsed and the lines above it become the trace."""
+        log = "\nstarting\n  File \"a.py\", line 1\nValueError: bad value: 3\nKeyError: later\n"
+
+        assistant.debug_workflow("/tmp/demo", log)
+
+        assistant.analyze_error.assert_called_once_with({
+            "error_type": "ValueError",
+            "error_message": "bad value: 3",
+            "stack_trace": 'starting\n  File "a.py", line 1',
+            "project_path": "/tmp/demo",
+        })
+
+    def test_log_without_error_marker_uses_defaults(self, assistant):
+        """Test a log with no error line is analyzed as a generic runtime error."""
+        assistant.debug_workflow("/tmp/demo", "build finished\nwarnings: 2")
+
+        error_info = assistant.analyze_error.call_args.args[0]
+        assert (error_info["error_type"], error_info["error_message"], error_info["stack_trace"]) == (
+            "Runtime Error", "", ""
+        )
@@ -0,0 +1,205 @@
+"""Tests for the deployment validation crew."""
+
+import asyncio
+import json
+import os
+import subprocess
+import pytest
+from unittest.mock import patch
+
+from agents.deployment_validation_crew import (
+    DeploymentValidationCrew,
+    _read_json,
+    _run_command,
+    _tech_flags,
+    _write_if_changed,
+)
+
+
+def make_python_project(tmp_path):
+    """Minimal Python project with code, tests and docs directories."""
+    (tmp_path / "code").mkdir()
+    (tmp_path / "code" / "requirements.txt").write_text("flask")
+    (tmp_path / "code" / "main.py").write_text("print('hi')")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_main.py").write_text("def test_ok(): pass")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "README.md").write_text("# Demo")
+    return tmp_path
+
+
+class TestDeploymentValidationCrew:
+
+    def test_stages_run_in_code_dir_with_tests_after_install(self, tmp_path):
+        """Test commands run with cwd set instead of chdir, and tests wait for the install."""
+        project = make_python_project(tmp_path)
+        calls = []
+
+        async def fake_run(cmd, cwd, timeout):
+            calls.append((cmd[:3], cwd))
+            return subprocess.CompletedProcess(cmd, 0, "ok", "")
+
+        with patch("agents.deployment_validation_crew._run_command", side_effect=fake_run), \
+             patch("os.chdir") as mock_chdir:
+            result = DeploymentValidationCrew().validate_project_deployment(project, ["Python"])
+
+        mock_chdir.assert_not_called()
+        assert calls[0] == (["pip", "install", "-r"], project / "code")
+        assert {cwd for _, cwd in calls} == {project / "code"}
+        assert (["python", "-m", "pytest"], project / "code") in calls
+        assert list(result["validations"]) == ["structure", "dependencies", "execution", "git", "functionality"]
+        assert result["overall_status"] == "READY_FOR_DEPLOYMENT"
+        assert result["validations"]["functionality"]["status"] == "PASS"
+
+    @pytest.mark.asyncio
+    async def test_run_command_kills_process_on_timeout(self, tmp_path):
+        """Test a command outliving its timeout is killed and reported like subprocess.run."""
+        completed = await _run_command(["python", "-c", "print('ok')"], tmp_path, timeout=10)
+        assert (completed.returncode, completed.stdout.strip()) == (0, "ok")
+
+        with pytest.raises(subprocess.TimeoutExpired):
+            await _run_command(["python", "-c", "import time; time.sleep(5)"], tmp_path, timeout=0.2)
+
+    def test_project_files_scanned_once_per_validation(self, tmp_path):
+        """Test each directory is listed once for all stages and package.json is parsed once."""
+        (tmp_path / "code").mkdir()
+        (tmp_path / "code" / "package.json").write_text('{"scripts": {"build": "x"}}')
+        (tmp_path / "tests").mkdir()
+        (tmp_path / "tests" / "App.test.js").write_text("test")
+        (tmp_path / "docs").mkdir()
+        crew = DeploymentValidationCrew()
+
+        async def fake_run(cmd, cwd, timeout):
+            return subprocess.CompletedProcess(cmd, 0, "ok", "")
+
+        with patch("agents.deployment_validation_crew._run_command", side_effect=fake_run), \
+             patch("agents.deployment_validation_crew.os.scandir", wraps=os.scandir) as mock_scandir, \
+             patch("agents.deployment_validation_crew._read_json", wraps=_read_json) as mock_load:
+            result = crew.validate_project_deployment(tmp_path, ["React"])
+
+        assert result["validations"]["execution"]["commands_tested"] == [
+            "npm install --no-audit --no-fund --prefer-offline", "npm run build"
+        ]
+        assert result["validations"]["functionality"]["status"] == "PASS"
+        assert [c.args[0] for c in mock_scandir.call_args_list] == [tmp_path, tmp_path / "code", tmp_path / "tests"]
+        mock_load.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_run_command_timeout_survives_process_already_gone(self, tmp_path):
+        """Test a command exiting just as it times out still raises TimeoutExpired."""
+        with patch("asyncio.subprocess.Process.kill", side_effect=ProcessLookupError):
+            with pytest.raises(subprocess.TimeoutExpired):
+                await _run_command(["python", "-c", "import time; time.sleep(0.5)"], tmp_path, timeout=0.1)
+
+    @pytest.mark.asyncio
+    async def test_run_command_keeps_only_output_tail(self, tmp_path):
+        """Test long output is drained as it arrives and only its end is returned."""
+        script = "import sys; sys.stdout.write('x' * 300000 + 'END'); sys.stderr.write('warn')"
+
+        completed = await _run_command(["python", "-c", script], tmp_path, timeout=10, tail_bytes=1024)
+
+        assert len(completed.stdout) == 1024
+        assert completed.stdout.endswith("xEND")
+        assert completed.stderr == "warn"
+
+    def test_generated_package_json_round_trips(self, tmp_path):
+        """Test the generated package.json is indented JSON that reads back unchanged."""
+        crew = DeploymentValidationCrew()
+
+        crew._create_package_json(tmp_path, ["React"])
+
+        text = (tmp_path / "package.json").read_text()
+        assert text == json.dumps(json.loads(text), indent=2)
+        assert _read_json(tmp_path / "package.json")["dependencies"]["react"] == "^18.2.0"
+
+    def test_dependency_files_match_tech_names_case_insensitively(self, tmp_path):
+        """Test lowercase tech names still pull in their framework dependencies."""
+        crew = DeploymentValidationCrew()
+
+        crew._create_package_json(tmp_path, ["react"])
+        crew._create_requirements_txt(tmp_path, ["python", "fastapi"])
+
+        assert "react" in _read_json(tmp_path / "package.json")["dependencies"]
+        assert (tmp_path / "requirements.txt").read_text() == "fastapi\nuvicorn"
+
+    def test_unchanged_files_are_not_rewritten(self, tmp_path):
+        """Test generated files are replaced atomically and skipped when already identical."""
+        crew = DeploymentValidationCrew()
+
+        with patch("agents.deployment_validation_crew.os.replace", wraps=os.replace) as mock_replace:
+            crew._create_gitignore(tmp_path)
+            crew._create_gitignore(tmp_path)
+
+        mock_replace.assert_called_once()
+        assert (tmp_path / ".gitignore").read_text().startswith("# Dependencies\nnode_modules/")
+        assert (tmp_path / ".gitignore").stat().st_mode & 0o777 == 0o644
+        assert [p.name for p in tmp_path.iterdir()] == [".gitignore"]
+
+    def test_failed_write_leaves_no_temp_file(self, tmp_path):
+        """Test the temp file is removed when it can't be moved into place."""
+        with patch("agents.deployment_validation_crew.os.replace", side_effect=OSError("busy")), \
+             pytest.raises(OSError):
+            _write_if_changed(tmp_path / "requirements.txt", b"flask")
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_js_install_uses_lockfile_and_skips_missing_build(self, tmp_path):
+        """Test npm ci is used with a lockfile and no build runs without a build script."""
+        (tmp_path / "code").mkdir()
+        (tmp_path / "code" / "package.json").write_text('{"scripts": {"start": "node index.js"}}')
+        (tmp_path / "code" / "package-lock.json").write_text("{}")
+        crew = DeploymentValidationCrew()
+        commands = []
+
+        async def fake_run(cmd, cwd, timeout):
+            commands.append(cmd[:2])
+            return subprocess.CompletedProcess(cmd, 0, "ok", "")
+
+        with patch("agents.deployment_validation_crew._run_command", side_effect=fake_run):
+            result = asyncio.run(crew._test_js_execution(tmp_path, {"commands_tested": [], "errors": []}))
+
+        assert commands == [["npm", "ci"]]
+        assert result["status"] == "PASS"
+        assert result["output"] == "No build script, dependencies installed successfully"
+
+    def test_js_install_falls_back_when_npm_ci_fails(self, tmp_path):
+        """Test an out-of-sync lockfile falls back to npm install and failures name the command run."""
+        (tmp_path / "code").mkdir()
+        (tmp_path / "code" / "package.json").write_text('{"scripts": {}}')
+        (tmp_path / "code" / "package-lock.json").write_text("{}")
+        crew = DeploymentValidationCrew()
+        returncodes = {"ci": 1, "install": 0}
+
+        async def fake_run(cmd, cwd, timeout):
+            return subprocess.CompletedProcess(cmd, returncodes[cmd[1]], "", f"{cmd[1]} error")
+
+        with patch("agents.deployment_validation_crew._run_command", side_effect=fake_run):
+            passed = asyncio.run(crew._test_js_execution(tmp_path, {"commands_tested": [], "errors": []}))
+            returncodes["install"] = 1
+            failed = asyncio.run(crew._test_js_execution(tmp_path, {"commands_tested": [], "errors": []}))
+
+        assert passed["status"] == "PASS"
+        assert [cmd.split()[:2] for cmd in passed["commands_tested"]] == [["npm", "ci"], ["npm", "install"]]
+        assert failed["status"] == "FAIL"
+        assert failed["errors"] == ["npm install failed: install error"]
+
+    def test_js_install_failure_reported_before_package_json_errors(self, tmp_path):
+        """Test a failed install is reported even when package.json cannot be parsed."""
+        (tmp_path / "code").mkdir()
+        (tmp_path / "code" / "package.json").write_text("{not json")
+        crew = DeploymentValidationCrew()
+
+        async def fake_run(cmd, cwd, timeout):
+            return subprocess.CompletedProcess(cmd, 1, "", "ERESOLVE")
+
+        with patch("agents.deployment_validation_crew._run_command", side_effect=fake_run):
+            result = asyncio.run(crew._test_js_execution(tmp_path, {"commands_tested": [], "errors": []}))
+
+        assert result["status"] == "FAIL"
+        assert result["errors"] == ["npm install failed: ERESOLVE"]
+
+    def test_tech_stack_classified_case_insensitively(self):
+        """Test each stage family is detected from any of its technology names."""
+        assert _tech_flags(["react", "Python"]) == {"is_js": True, "is_py": True, "is_net": False}
+        assert _tech_flags(["ASP.NET"]) == {"is_js": False, "is_py": False, "is_net": True}
+        assert _tech_flags(["Go"]) == {"is_js": False, "is_py": False, "is_net": False}
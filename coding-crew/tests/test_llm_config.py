@@ -0,0 +1,58 @@
+"""Tests for LLM configuration."""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from core import llm_config
+
+
+@pytest.fixture(autouse=True)
+def clear_llm_cache():
+    """Start each test without cached or warmed LLM clients."""
+    llm_config._llm_cache.clear()
+    llm_config._warmed_llms.clear()
+    yield
+    llm_config._llm_cache.clear()
+    llm_config._warmed_llms.clear()
+
+
+def test_get_llm_reuses_client_per_model():
+    """Test each model is built once and shared between callers."""
+    with patch("core.llm_config.get_ollama_llm", side_effect=lambda name: Mock(name=name)) as mock_build:
+        first = llm_config.get_llm("ollama/llama3.1:8b")
+        second = llm_config.get_llm("ollama/llama3.1:8b")
+        other = llm_config.get_llm("ollama/llama3.2:latest")
+
+    assert first is second
+    assert other is not first
+    assert mock_build.call_count == 2
+
+
+def test_prewarm_analysis_llm_invokes_model_in_background():
+    """Test pre-warming sends a request through the shared analysis LLM."""
+    llm = Mock()
+    with patch("core.llm_config.get_analysis_llm", return_value=llm):
+        llm_config.prewarm_analysis_llm().join(timeout=5)
+
+    llm.invoke.assert_called_once_with("ping")
+
+
+def test_prewarm_llm_warms_each_client_once():
+    """Test repeated pre-warms of the same client send a single request."""
+    llm = Mock()
+
+    llm_config.prewarm_llm(llm).join(timeout=5)
+    llm_config.prewarm_llm(llm).join(timeout=5)
+
+    llm.invoke.assert_called_once_with("ping")
+
+
+def test_analysis_model_env_override(monkeypatch):
+    """Test ANALYSIS_MODEL replaces the configured analysis model."""
+    monkeypatch.setenv("ANALYSIS_MODEL", "ollama/llama3.1:8b-instruct-q8_0")
+    with patch("core.llm_config.get_ollama_llm", side_effect=lambda name: name):
+        assert llm_config.get_analysis_llm() == "ollama/llama3.1:8b-instruct-q8_0"
+
+    monkeypatch.delenv("ANALYSIS_MODEL")
+    with patch("core.llm_config.get_ollama_llm", side_effect=lambda name: name):
+        assert llm_config.get_analysis_llm() == "ollama/llama3.1:8b-instruct-q4_K_M"
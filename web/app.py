@@ -49,6 +49,7 @@ def extract_test_plan_from_analysis(analysis_content: str) -> str:
     return "No test plan found in analysis"
 from utils.file_manager import ProjectFileManager
 from utils.persistence import DataStore
+from agents.chat_assistant import parse_created_at
 
 app = FastAPI(title="AgentAI - Professional Development Platform")
 
@@ -100,6 +101,8 @@ collaboration_manager = CollaborationManager()
 async def startup_event():
     await async_processor.start()
     local_metrics.start_collection()
+    from core.llm_config import prewarm_analysis_llm
+    prewarm_analysis_llm()
     logger.info("AgentAI performance systems started")
 
 @app.on_event("shutdown")
@@ -145,6 +148,11 @@ workflows = data["workflows"]
 analyses = data["analyses"]
 approvals = data["approvals"]
 
+# Parsed creation times, held in memory only, and the newest project, kept current as projects
+# are created and deleted so the chat assistant needn't scan or re-parse them
+project_created_at = {pid: parse_created_at(project.get("created_at")) for pid, project in projects.items()}
+latest_project_id = max(project_created_at, key=project_created_at.get, default=None)
+
 @app.get("/", response_class=HTMLResponse)
 async def home():
     return """
@@ -649,6 +657,7 @@ async def home():
 
 @app.post("/api/projects")
 async def create_project(requirements: ProjectRequirements):
+    global latest_project_id
     try:
         # Sanitize and validate inputs
         sanitized_data = input_sanitizer.sanitize_dict(requirements.dict())
@@ -711,6 +720,8 @@ async def create_project(requirements: ProjectRequirements):
     project_data["project_path"] = str(project_path)
     
     projects[project_id] = project_data
+    project_created_at[project_id] = parse_created_at(project_data["created_at"])
+    latest_project_id = project_id
     workflows[workflow_id] = workflow_data
     
     # Persist data immediately
@@ -860,7 +871,7 @@ async def validate_deployment(project_id: str):
         project_path = Path(project["project_path"])
         tech_stack = project.get('recommended_tech_stack', [])
         
-        validation_result = validator.validate_project_deployment(project_path, tech_stack)
+        validation_result = await validator.validate_project_deployment_async(project_path, tech_stack)
         
         # Store validation results
         projects[project_id]["deployment_validation"] = validation_result
@@ -1579,19 +1590,22 @@ async def architecture_review(project_id: str):
         raise HTTPException(status_code=400, detail="No code available for architecture review")
     
     try:
+        import asyncio
         from agents.architecture_advisor import ArchitectureAdvisor
         arch_advisor = ArchitectureAdvisor()
         
-        # Analyze current architecture
-        analysis = arch_advisor.analyze_architecture(code_content, project, tech_stack)
-        
-        # Get refactoring suggestions if there are issues
         quality_analysis = project.get("code_quality_analysis", {})
         issues = [issue["description"] for issue in quality_analysis.get("issues_found", [])]
         
+        # Analyze current architecture, with refactoring suggestions alongside if there are issues
         if issues:
-            refactoring = arch_advisor.suggest_refactoring(code_content, issues)
+            analysis, refactoring = await asyncio.gather(
+                asyncio.to_thread(arch_advisor.analyze_architecture, code_content, project, tech_stack),
+                asyncio.to_thread(arch_advisor.suggest_refactoring, code_content, issues)
+            )
             analysis["refactoring_suggestions"] = refactoring
+        else:
+            analysis = await asyncio.to_thread(arch_advisor.analyze_architecture, code_content, project, tech_stack)
         
         projects[project_id]["architecture_analysis"] = analysis
         data_store.save_projects(projects)
@@ -1984,7 +1998,8 @@ async def chat_with_ai(request: dict):
     try:
         from agents.chat_assistant import ChatAssistant
         assistant = ChatAssistant()
-        response = assistant.respond(message, context, projects, analyses)
+        latest = (latest_project_id, project_created_at[latest_project_id]) if latest_project_id else None
+        response = assistant.respond(message, context, projects, analyses, latest)
         return {"response": response}
     except Exception:
         # Fallback response
@@ -2109,6 +2124,7 @@ async def get_diagram_png(analysis_id: str, diagram_index: int):
 
 @app.delete("/api/projects/{project_id}")
 async def delete_project(project_id: str):
+    global latest_project_id
     # Validate project_id format to prevent path traversal
     if not project_id.replace('-', '').replace('_', '').isalnum():
         raise HTTPException(status_code=400, detail="Invalid project ID format")
@@ -2132,6 +2148,9 @@ async def delete_project(project_id: str):
     
     # Remove from tracking
     del projects[project_id]
+    project_created_at.pop(project_id, None)
+    if latest_project_id == project_id:
+        latest_project_id = max(project_created_at, key=project_created_at.get, default=None)
     
     if workflow_id and workflow_id in workflows:
         del workflows[workflow_id]